@@ -0,0 +1,37 @@
+"""Create idempotency keys table
+
+Revision ID: 3f6a9b1c5d27
+Revises: 8d1c4e7a2b90
+Create Date: 2026-10-18 11:02:15.560917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6a9b1c5d27"
+down_revision: Union[str, Sequence[str], None] = "8d1c4e7a2b90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table("idempotency_keys",
+    sa.Column("key", sa.String(length=255), nullable=False),
+    sa.Column("wallet_uuid", sa.String(length=36), nullable=False),
+    sa.Column("operation_type", sa.String(length=16), nullable=False),
+    sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column("balance", sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.ForeignKeyConstraint(["wallet_uuid"], ["wallets.uuid"]),
+    sa.PrimaryKeyConstraint("key")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,55 @@
+"""Create wallet ledger tables
+
+Revision ID: 8d1c4e7a2b90
+Revises: f327383f35b2
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d1c4e7a2b90"
+down_revision: Union[str, Sequence[str], None] = "f327383f35b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table("wallet_transactions",
+    sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column("wallet_uuid", sa.String(length=36), nullable=False),
+    sa.Column("operation_type", sa.String(length=16), nullable=False),
+    sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.ForeignKeyConstraint(["wallet_uuid"], ["wallets.uuid"]),
+    sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_wallet_transactions_wallet_uuid_id", "wallet_transactions", ["wallet_uuid", "id"], unique=False)
+    op.create_table("wallet_snapshots",
+    sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column("wallet_uuid", sa.String(length=36), nullable=False),
+    sa.Column("transaction_id", sa.BigInteger(), nullable=False),
+    sa.Column("balance", sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.ForeignKeyConstraint(["wallet_uuid"], ["wallets.uuid"]),
+    sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index(
+        "ix_wallet_snapshots_wallet_uuid_transaction_id",
+        "wallet_snapshots",
+        ["wallet_uuid", "transaction_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_wallet_snapshots_wallet_uuid_transaction_id", table_name="wallet_snapshots")
+    op.drop_table("wallet_snapshots")
+    op.drop_index("ix_wallet_transactions_wallet_uuid_id", table_name="wallet_transactions")
+    op.drop_table("wallet_transactions")
@@ -0,0 +1,38 @@
+"""Create wallet outbox table
+
+Revision ID: a93d5e2c7b14
+Revises: e58a2c6d1f47
+Create Date: 2026-10-18 17:46:22.381905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a93d5e2c7b14"
+down_revision: Union[str, Sequence[str], None] = "e58a2c6d1f47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table("wallet_outbox",
+    sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column("wallet_uuid", sa.Uuid(), nullable=False),
+    sa.Column("operation_type", sa.String(length=16), nullable=False),
+    sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column("balance", sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+    sa.Column("available_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.PrimaryKeyConstraint("id")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("wallet_outbox")
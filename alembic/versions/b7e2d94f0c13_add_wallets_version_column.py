@@ -0,0 +1,29 @@
+"""Add wallets version column
+
+Revision ID: b7e2d94f0c13
+Revises: 3f6a9b1c5d27
+Create Date: 2026-10-18 12:20:03.481655
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2d94f0c13"
+down_revision: Union[str, Sequence[str], None] = "3f6a9b1c5d27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant server default doesn't rewrite the table
+    op.add_column("wallets", sa.Column("version", sa.BigInteger(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("wallets", "version")
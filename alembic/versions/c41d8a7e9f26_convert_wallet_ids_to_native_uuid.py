@@ -0,0 +1,177 @@
+"""Convert wallet ids to native uuid
+
+Revision ID: c41d8a7e9f26
+Revises: b7e2d94f0c13
+Create Date: 2026-10-18 14:05:47.219384
+
+The conversion runs online, writes are only blocked by short metadata changes:
+    1. add a nullable uuid shadow column next to every text id, kept in sync by a trigger
+    2. backfill the shadow columns in batches, every batch in its own transaction
+    3. validate them and build their indexes without blocking writes
+    4. swap the columns, keys and foreign keys in one short transaction
+Every step can be re-run, so a migration that failed on lock_timeout can simply be retried.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41d8a7e9f26"
+down_revision: Union[str, Sequence[str], None] = "b7e2d94f0c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables referencing wallets.uuid, the names Postgres gave to their foreign keys and their primary keys
+REFERENCING_TABLES = (
+    ("wallet_transactions", "wallet_transactions_wallet_uuid_fkey", "id"),
+    ("wallet_snapshots", "wallet_snapshots_wallet_uuid_fkey", "id"),
+    ("idempotency_keys", "idempotency_keys_wallet_uuid_fkey", "key"),
+)
+
+# Indexes on the referencing columns: name, table, columns after wallet_uuid, unique
+REFERENCING_INDEXES = (
+    ("ix_wallet_transactions_wallet_uuid_id", "wallet_transactions", "id", False),
+    ("ix_wallet_snapshots_wallet_uuid_transaction_id", "wallet_snapshots", "transaction_id", True),
+)
+
+# Rows converted per backfill transaction
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def add_shadow_column(table: str, column: str) -> None:
+    """Add a nullable uuid copy of a text id column and keep it in sync on every write."""
+    op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}_new uuid")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {table}_{column}_shadow() RETURNS trigger AS $$
+        BEGIN
+            NEW.{column}_new := NEW.{column}::uuid;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS {table}_{column}_shadow ON {table}")
+    op.execute(
+        f"CREATE TRIGGER {table}_{column}_shadow BEFORE INSERT OR UPDATE OF {column} ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {table}_{column}_shadow()"
+    )
+
+
+def drop_shadow_trigger(table: str, column: str) -> None:
+    op.execute(f"DROP TRIGGER IF EXISTS {table}_{column}_shadow ON {table}")
+    op.execute(f"DROP FUNCTION IF EXISTS {table}_{column}_shadow()")
+
+
+def backfill(table: str, column: str, key: str) -> None:
+    """
+    Fill the shadow column of the rows written before the trigger existed,
+    walking the primary key in batches that commit one by one
+    """
+    bind = op.get_bind()
+    last = None
+    while True:
+        after = "" if last is None else f"WHERE {key} > :last"
+        keys = bind.execute(
+            sa.text(
+                f"UPDATE {table} SET {column}_new = {column}::uuid WHERE {key} IN "
+                f"(SELECT {key} FROM {table} {after} ORDER BY {key} LIMIT :limit) RETURNING {key}"
+            ),
+            {"last": last, "limit": BACKFILL_BATCH_SIZE},
+        ).scalars().all()
+        if not keys:
+            return
+        last = max(keys)
+
+
+def validate_shadow_column(table: str, column: str) -> None:
+    """
+    Check that every row was converted, then prove NOT NULL with a validated CHECK,
+    which scans the table under a lock that doesn't block writes
+    """
+    bind = op.get_bind()
+    diverged = bind.execute(
+        sa.text(f"SELECT count(*) FROM {table} WHERE {column}_new IS DISTINCT FROM {column}::uuid")
+    ).scalar_one()
+    if diverged:
+        raise RuntimeError(f"{diverged} rows of {table}.{column} were not converted, re-run the migration")
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{column}_new_not_null")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_new_not_null CHECK ({column}_new IS NOT NULL) NOT VALID")
+    op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_new_not_null")
+
+
+def swap_shadow_column(table: str, column: str) -> None:
+    """Replace a text id column with its shadow, SET NOT NULL relies on the validated CHECK and doesn't scan."""
+    drop_shadow_trigger(table, column)
+    op.drop_column(table, column)
+    op.alter_column(table, f"{column}_new", new_column_name=column, nullable=False)
+    op.drop_constraint(f"{table}_{column}_new_not_null", table, type_="check")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Short metadata changes only, fail fast instead of queueing writes behind long transactions
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    add_shadow_column("wallets", "uuid")
+    for table, _, _ in REFERENCING_TABLES:
+        add_shadow_column(table, "wallet_uuid")
+
+    with op.get_context().autocommit_block():
+        backfill("wallets", "uuid", "uuid")
+        for table, _, key in REFERENCING_TABLES:
+            backfill(table, "wallet_uuid", key)
+
+        validate_shadow_column("wallets", "uuid")
+        for table, _, _ in REFERENCING_TABLES:
+            validate_shadow_column(table, "wallet_uuid")
+
+        # The primary key already indexes uuid, the old index is a duplicate
+        op.drop_index("ix_wallets_uuid", table_name="wallets", postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            "wallets_uuid_new_key", "wallets", ["uuid_new"],
+            unique=True, postgresql_concurrently=True, if_not_exists=True,
+        )
+        for index, table, column, unique in REFERENCING_INDEXES:
+            op.create_index(
+                f"{index}_new", table, ["wallet_uuid_new", column],
+                unique=unique, postgresql_concurrently=True, if_not_exists=True,
+            )
+
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    for table, constraint, _ in REFERENCING_TABLES:
+        op.drop_constraint(constraint, table, type_="foreignkey")
+    op.drop_constraint("wallets_pkey", "wallets", type_="primary")
+    swap_shadow_column("wallets", "uuid")
+    op.execute("ALTER TABLE wallets ADD CONSTRAINT wallets_pkey PRIMARY KEY USING INDEX wallets_uuid_new_key")
+    for table, _, _ in REFERENCING_TABLES:
+        swap_shadow_column(table, "wallet_uuid")
+    for index, _, _, _ in REFERENCING_INDEXES:
+        op.execute(f"ALTER INDEX {index}_new RENAME TO {index}")
+    # Existing rows are checked below without blocking writes
+    for table, constraint, _ in REFERENCING_TABLES:
+        op.create_foreign_key(constraint, table, "wallets", ["wallet_uuid"], ["uuid"], postgresql_not_valid=True)
+
+    with op.get_context().autocommit_block():
+        for table, constraint, _ in REFERENCING_TABLES:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rewrites the tables, the way back is an offline migration
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    for table, constraint, _ in REFERENCING_TABLES:
+        op.drop_constraint(constraint, table, type_="foreignkey")
+    op.alter_column(
+        "wallets", "uuid",
+        existing_type=sa.Uuid(), type_=sa.String(length=36), existing_nullable=False, postgresql_using="uuid::text",
+    )
+    for table, constraint, _ in REFERENCING_TABLES:
+        op.alter_column(
+            table, "wallet_uuid",
+            existing_type=sa.Uuid(), type_=sa.String(length=36), existing_nullable=False,
+            postgresql_using="wallet_uuid::text",
+        )
+        op.create_foreign_key(constraint, table, "wallets", ["wallet_uuid"], ["uuid"])
+    op.create_index(op.f("ix_wallets_uuid"), "wallets", ["uuid"], unique=False)
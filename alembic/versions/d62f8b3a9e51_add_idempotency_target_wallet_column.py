@@ -0,0 +1,28 @@
+"""Add idempotency keys target wallet column
+
+Revision ID: d62f8b3a9e51
+Revises: a93d5e2c7b14
+Create Date: 2026-10-18 19:12:05.617342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d62f8b3a9e51"
+down_revision: Union[str, Sequence[str], None] = "a93d5e2c7b14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("idempotency_keys", sa.Column("target_wallet_uuid", sa.Uuid(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("idempotency_keys", "target_wallet_uuid")
@@ -0,0 +1,146 @@
+"""Partition wallets and their ledger by hash of uuid
+
+Revision ID: e58a2c6d1f47
+Revises: c41d8a7e9f26
+Create Date: 2026-10-18 15:31:09.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.schema import SchemaItem
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e58a2c6d1f47"
+down_revision: Union[str, Sequence[str], None] = "c41d8a7e9f26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Hash partitions of every table, pinned so the schema of this revision doesn't depend on
+# the configuration it runs with. A different count needs a new repartitioning migration.
+PARTITIONS = 16
+
+# Tables referencing wallets.uuid and the names of their foreign keys
+REFERENCING_TABLES = (
+    ("wallet_transactions", "wallet_transactions_wallet_uuid_fkey"),
+    ("wallet_snapshots", "wallet_snapshots_wallet_uuid_fkey"),
+    ("idempotency_keys", "idempotency_keys_wallet_uuid_fkey"),
+)
+
+
+def wallet_columns() -> list[SchemaItem]:
+    return [
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("balance", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("uuid", name="wallets_pkey"),
+    ]
+
+
+def wallet_transaction_columns(partitioned: bool) -> list[SchemaItem]:
+    return [
+        sa.Column(
+            "id", sa.BigInteger(), server_default=sa.text("nextval('wallet_transactions_id_seq')"), nullable=False,
+        ),
+        sa.Column("wallet_uuid", sa.Uuid(), nullable=False),
+        sa.Column("operation_type", sa.String(length=16), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["wallet_uuid"], ["wallets.uuid"], name="wallet_transactions_wallet_uuid_fkey"),
+        # The primary key of a partitioned table must include the partition key
+        sa.PrimaryKeyConstraint(*(("wallet_uuid", "id") if partitioned else ("id",)), name="wallet_transactions_pkey"),
+    ]
+
+
+def wallet_snapshot_columns(partitioned: bool) -> list[SchemaItem]:
+    return [
+        sa.Column("id", sa.BigInteger(), server_default=sa.text("nextval('wallet_snapshots_id_seq')"), nullable=False),
+        sa.Column("wallet_uuid", sa.Uuid(), nullable=False),
+        sa.Column("transaction_id", sa.BigInteger(), nullable=False),
+        sa.Column("balance", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["wallet_uuid"], ["wallets.uuid"], name="wallet_snapshots_wallet_uuid_fkey"),
+        sa.PrimaryKeyConstraint(*(("wallet_uuid", "id") if partitioned else ("id",)), name="wallet_snapshots_pkey"),
+    ]
+
+
+def create_hash_partitions(table: str, partitions: int) -> None:
+    """
+    Create the partitions of a table declared with PARTITION BY HASH,
+    named <table>_p<remainder>. Partitions can be moved to other tablespaces
+    one by one with ALTER TABLE ... SET TABLESPACE.
+    """
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+
+
+def rebuild_table(table: str, columns: list[SchemaItem], partition_by: str | None, id_sequence: bool = False) -> None:
+    """
+    Replace a table with a new one made of columns, partitioned by hash of partition_by
+    if given, copying every row. Indexes other than the primary key must be dropped
+    before and created again after. With id_sequence, <table>_id_seq is handed over
+    to the new table, which keeps numbering where the old one stopped.
+    """
+    op.rename_table(table, f"{table}_old")
+    op.execute(f"ALTER INDEX {table}_pkey RENAME TO {table}_old_pkey")
+
+    if partition_by:
+        op.create_table(table, *columns, postgresql_partition_by=f"HASH ({partition_by})")
+        create_hash_partitions(table, PARTITIONS)
+    else:
+        op.create_table(table, *columns)
+    names = ", ".join(column.name for column in columns if isinstance(column, sa.Column))
+    op.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {table}_old")
+    # The sequence must outlive the old table, which owns it
+    if id_sequence:
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.drop_table(f"{table}_old")
+
+
+def swap_tables(partitioned: bool) -> None:
+    """
+    Rebuild wallets and its ledger tables, hash partitioned by wallet uuid or not
+    Entries and snapshots of a wallet land in the partitions with the same remainder
+    as the wallet, so a ledger read prunes every table to a single partition.
+    """
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    for table, constraint in REFERENCING_TABLES:
+        op.drop_constraint(constraint, table, type_="foreignkey")
+    rebuild_table("wallets", wallet_columns(), "uuid" if partitioned else None)
+
+    op.drop_index("ix_wallet_snapshots_wallet_uuid_transaction_id", table_name="wallet_snapshots")
+    if partitioned:
+        # Covered by the new primary key
+        op.drop_index("ix_wallet_transactions_wallet_uuid_id", table_name="wallet_transactions")
+    ledger_partition_by = "wallet_uuid" if partitioned else None
+    rebuild_table("wallet_transactions", wallet_transaction_columns(partitioned), ledger_partition_by, id_sequence=True)
+    rebuild_table("wallet_snapshots", wallet_snapshot_columns(partitioned), ledger_partition_by, id_sequence=True)
+    op.create_index(
+        "ix_wallet_snapshots_wallet_uuid_transaction_id",
+        "wallet_snapshots",
+        ["wallet_uuid", "transaction_id"],
+        unique=True,
+    )
+    if not partitioned:
+        op.create_index(
+            "ix_wallet_transactions_wallet_uuid_id", "wallet_transactions", ["wallet_uuid", "id"], unique=False,
+        )
+
+    op.create_foreign_key(
+        "idempotency_keys_wallet_uuid_fkey", "idempotency_keys", "wallets", ["wallet_uuid"], ["uuid"],
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    swap_tables(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    swap_tables(partitioned=False)
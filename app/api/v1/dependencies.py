@@ -0,0 +1,53 @@
+from typing import Annotated
+
+from fastapi import Depends, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session, get_session
+from app.services.wallet_service import WalletService
+
+
+async def get_wallet_service(session: AsyncSession = Depends(get_session)) -> WalletService:
+    """
+    Provide a WalletService bound to a primary database session.
+
+    Returns:
+        WalletService: Service for the current request.
+
+    """
+    return WalletService(session)
+
+
+async def get_read_wallet_service(session: AsyncSession = Depends(get_read_session)) -> WalletService:
+    """
+    Provide a WalletService bound to a read-only session, for lock-free reads only.
+
+    Returns:
+        WalletService: Service for the current request.
+
+    """
+    return WalletService(session)
+
+
+async def get_client_id(
+        request: Request,
+        client_id: Annotated[
+            str | None,
+            Header(alias="X-Client-Id", max_length=255, description="Identifies the caller for rate limiting"),
+        ] = None,
+) -> str:
+    """
+    Identify the API client a request is accounted to.
+    Behind a proxy the remote address is the proxy's, which must then set X-Client-Id.
+
+    Returns:
+        str: The X-Client-Id header, or the remote address when it is missing.
+
+    """
+    if client_id:
+        return client_id
+    return request.client.host if request.client else "anonymous"
+
+
+WalletServiceDep = Annotated[WalletService, Depends(get_wallet_service)]
+ReadWalletServiceDep = Annotated[WalletService, Depends(get_read_wallet_service)]
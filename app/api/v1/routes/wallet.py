@@ -1,10 +1,30 @@
-from typing import Annotated
+import asyncio
+from contextlib import nullcontext
+from typing import Annotated, AsyncGenerator, AsyncIterator
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path, Body
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Body, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_session
-from app.schemas.wallet_schemas import OperationModel, WalletResponse, WalletCreateModel
+from app.api.v1.dependencies import ReadWalletServiceDep, WalletServiceDep, get_client_id, get_wallet_service
+from app.config import settings
+from app.db.models import Wallet
+from app.db.session import AsyncReadSessionLocal, AsyncSessionLocal, get_read_session
+from app.schemas.wallet_schemas import (
+    BatchOperationRequest,
+    BatchOperationResponse,
+    BulkWalletCreateModel,
+    ExportFormat,
+    OperationModel,
+    OperationType,
+    WalletResponse,
+    WalletCreateModel,
+)
+from app.services.admission import operation_admission
+from app.services.coalescer import wallet_coalescer
+from app.services.export_service import WalletExportService, iter_lines
+from app.services.wallet_events import BalanceEvent, wallet_event_hub
 from app.services.wallet_service import WalletService
 
 router = APIRouter(
@@ -12,7 +32,17 @@ router = APIRouter(
     tags=["wallets"],
 )
 
-WalletID = Annotated[str, Path(title="Wallet ID")]
+WalletID = Annotated[UUID, Path(title="Wallet ID")]
+
+
+def wallet_json(wallet: Wallet) -> str:
+    """Serializes a wallet read from the database, it's trusted data so validation is skipped."""
+    return WalletResponse.model_construct(wallet_id=wallet.uuid, balance=wallet.balance).model_dump_json()
+
+
+def wallet_response(wallet: Wallet) -> Response:
+    """Returns the wallet as a ready response, FastAPI doesn't re-validate a Response against response_model."""
+    return Response(wallet_json(wallet), media_type="application/json")
 
 
 @router.post(
@@ -39,20 +69,51 @@ async def create_wallet(
                 },
             ),
         ],
-        session: AsyncSession = Depends(get_session),
-) -> WalletResponse:
+        service: WalletServiceDep,
+) -> Response:
     """Create a new wallet with a specified initial amount"""
 
-    service = WalletService(session)
     wallet = await service.create_wallet(wallet_create.amount)
-    return WalletResponse(wallet_id=wallet.uuid, balance=wallet.balance)
+    return wallet_response(wallet)
+
+
+@router.post(
+    "/bulk",
+    response_class=StreamingResponse,
+    summary="Create many wallets",
+    description="Create wallets in chunks and stream them back as NDJSON, one wallet per line.",
+)
+async def create_wallets_bulk(
+        bulk_create: Annotated[
+            BulkWalletCreateModel,
+            Body(
+                examples={
+                    "normal": {
+                        "summary": "Normal example",
+                        "description": "Create 1000 wallets with initial amount",
+                        "value": {"count": 1000, "amount": 100.00},
+                    },
+                },
+            ),
+        ],
+) -> StreamingResponse:
+    """Creates `count` wallets with the same initial amount."""
+
+    async def stream() -> AsyncIterator[str]:
+        # The session must outlive the handler, so it's owned by the stream itself
+        async with AsyncSessionLocal() as session:
+            service = WalletService(session)
+            async for wallets in service.create_wallets_bulk(bulk_create.count, bulk_create.amount):
+                yield "".join(wallet_json(wallet) + "\n" for wallet in wallets)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @router.post(
     "/{wallet_id}/operation",
     response_model=WalletResponse,
     summary="Perform wallet operation",
-    description="Deposit or withdraw an amount from the wallet.",
+    description="Deposit or withdraw an amount from the wallet, or transfer it to another wallet.",
 )
 async def create_deposit(
         wallet_id: WalletID,
@@ -70,16 +131,91 @@ async def create_deposit(
                         "description": "Withdraw 20.00 from wallet",
                         "value": {"operation_type": "WITHDRAW", "amount": 20.00},
                     },
+                    "transfer": {
+                        "summary": "Transfer example",
+                        "description": "Transfer 10.00 from wallet to another wallet",
+                        "value": {
+                            "operation_type": "TRANSFER",
+                            "amount": 10.00,
+                            "target_wallet_id": "7c9e6679-7425-40de-944b-e07fc1f90ae7",
+                        },
+                    },
                 },
             ),
         ],
-        session: AsyncSession = Depends(get_session),
-) -> WalletResponse:
-    """Performs a deposit or withdrawal operation on the specified wallet."""
-    service = WalletService(session)
-    wallet = await service.perform_wallet(wallet_id, operation)
+        idempotency_key: Annotated[
+            str | None,
+            Header(
+                alias="Idempotency-Key",
+                max_length=255,
+                description="Retries with the same key return the original result instead of applying twice",
+            ),
+        ] = None,
+        service: WalletService = Depends(get_wallet_service),
+        client_id: str = Depends(get_client_id),
+) -> Response:
+    """Performs a deposit, withdrawal or transfer operation on the specified wallet."""
+    if settings.ADMISSION_ENABLED:
+        operation_admission.check_client(client_id)
+
+    # Idempotent requests take the direct path, their key is stored in the operation transaction.
+    # Transfers lock two wallets, they can't be grouped per wallet.
+    if (
+            settings.WALLET_COALESCING_ENABLED
+            and idempotency_key is None
+            and operation.operation_type is not OperationType.TRANSFER
+    ):
+        # A wallet's coalesced operations run one group at a time behind a bounded queue
+        wallet = await wallet_coalescer.submit(wallet_id, operation)
+    else:
+        slot = operation_admission.wallet_slot(wallet_id) if settings.ADMISSION_ENABLED else nullcontext()
+        async with slot:
+            wallet = await service.perform_wallet(wallet_id, operation, idempotency_key)
+
+    return wallet_response(wallet)
 
-    return WalletResponse(wallet_id=wallet.uuid, balance=wallet.balance)
+
+@router.post(
+    "/operations/batch",
+    response_model=BatchOperationResponse,
+    summary="Perform a batch of wallet operations",
+    description="Apply many deposits and withdrawals in one transaction, atomically or best-effort.",
+)
+async def create_operations_batch(
+        batch: Annotated[
+            BatchOperationRequest,
+            Body(
+                examples={
+                    "atomic": {
+                        "summary": "Atomic batch example",
+                        "description": "Credit two wallets, all or nothing",
+                        "value": {
+                            "mode": "ATOMIC",
+                            "operations": [
+                                {
+                                    "wallet_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                                    "operation_type": "DEPOSIT",
+                                    "amount": 50.00,
+                                },
+                                {
+                                    "wallet_id": "7c9e6679-7425-40de-944b-e07fc1f90ae7",
+                                    "operation_type": "DEPOSIT",
+                                    "amount": 25.00,
+                                },
+                            ],
+                        },
+                    },
+                },
+            ),
+        ],
+        service: WalletServiceDep,
+        client_id: Annotated[str, Depends(get_client_id)],
+) -> Response:
+    """Performs a list of operations and returns a result for every item."""
+    if settings.ADMISSION_ENABLED:
+        operation_admission.check_client(client_id)
+    result = await service.perform_batch(batch)
+    return Response(result.model_dump_json(), media_type="application/json")
 
 
 @router.get(
@@ -90,10 +226,127 @@ async def create_deposit(
 )
 async def get_balance_by_uuid(
         wallet_id: WalletID,
-        session: AsyncSession = Depends(get_session),
-) -> WalletResponse:
+        service: ReadWalletServiceDep,
+) -> Response:
     """Returns the current balance for the wallet identified by `wallet_id`."""
-    service = WalletService(session)
-    wallet = await service.get_wallet(wallet_id)
+    wallet = await service.read_wallet(wallet_id)
+
+    return wallet_response(wallet)
+
+
+async def current_balance_event(wallet_id: UUID) -> BalanceEvent:
+    """
+    Read the balance a feed starts from, on the primary and bypassing the balance cache
+    A replica or cache entry may predate a change committed before the subscription,
+    and a quiet wallet would then show that stale balance until its next change.
+    Args:
+        wallet_id (UUID): UUID of the wallet
+    """
+    async with AsyncSessionLocal() as session:
+        wallet = await WalletService(session, cache=None).read_wallet(wallet_id)
+    return BalanceEvent(wallet_id=wallet.uuid, balance=wallet.balance, version=wallet.version)
+
+
+@router.get(
+    "/{wallet_id}/events",
+    response_class=StreamingResponse,
+    summary="Stream wallet balance changes",
+    description=(
+        "Server-sent events with the current balance followed by every committed change. "
+        "The event id is the wallet version, comment lines are sent as keepalive."
+    ),
+)
+async def stream_balance_events(wallet_id: WalletID) -> StreamingResponse:
+    """Pushes the balance of the wallet every time an operation on it is committed."""
+    if not settings.WALLET_EVENTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Balance events are disabled")
 
-    return WalletResponse(wallet_id=wallet.uuid, balance=wallet.balance)
+    async def stream() -> AsyncGenerator[str, None]:
+        async with wallet_event_hub.subscribe(wallet_id) as events:
+            last_version = -1
+            event: BalanceEvent | None = None
+            while True:
+                if event is None:
+                    # Read after subscribing (initially and after the listener reconnected),
+                    # changes committed later arrive as events
+                    event = await current_balance_event(wallet_id)
+                # Older events were already covered by the read, equal ones are still sent
+                # because ledger mode batches don't advance the version
+                if event.version >= last_version:
+                    last_version = event.version
+                    data = WalletResponse.model_construct(wallet_id=event.wallet_id, balance=event.balance)
+                    yield f"id: {event.version}\nevent: balance\ndata: {data.model_dump_json()}\n\n"
+                while True:
+                    try:
+                        event = await asyncio.wait_for(events.get(), settings.WALLET_EVENTS_KEEPALIVE_SECONDS)
+                        break
+                    except TimeoutError:
+                        yield ": keepalive\n\n"
+
+    events = stream()
+    # Subscribe and read the current balance before the headers go out, so a busy hub
+    # or a missing wallet gets its own status code instead of an empty 200 stream.
+    # A started generator is closed by the event loop even if the body is never sent.
+    first = await anext(events)
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            yield first
+            async for chunk in events:
+                yield chunk
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export all wallets",
+    description="Stream every wallet ordered by uuid as NDJSON or CSV, without taking row locks.",
+)
+async def export_wallets(
+        export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    """Streams the uuid and balance of every wallet."""
+
+    async def stream() -> AsyncIterator[str]:
+        if export_format is ExportFormat.CSV:
+            yield "wallet_id,balance\n"
+        # The session must outlive the handler, so it's owned by the stream itself
+        async with AsyncReadSessionLocal() as session:
+            async for wallets in WalletExportService(session).export():
+                if export_format is ExportFormat.CSV:
+                    yield "".join(f"{wallet.uuid},{wallet.balance}\n" for wallet in wallets)
+                else:
+                    yield "".join(wallet_json(wallet) + "\n" for wallet in wallets)
+
+    media_type = "text/csv" if export_format is ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type)
+
+
+@router.post(
+    "/reconcile",
+    summary="Reconcile wallet balances",
+    description=(
+        "Compare expected balances, sent as NDJSON lines with wallet_id and balance, "
+        "with the stored ones and return only the mismatches as NDJSON."
+    ),
+)
+async def reconcile_wallets(
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """Returns a line for every mismatching, missing or invalid expected balance."""
+    service = WalletExportService(session)
+    # The body is consumed as it arrives, only the mismatches are kept in memory
+    mismatches = [
+        mismatch.model_dump_json() + "\n"
+        async for mismatch in service.reconcile(iter_lines(request.stream()))
+    ]
+    return Response("".join(mismatches), media_type="application/x-ndjson")
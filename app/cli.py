@@ -0,0 +1,62 @@
+"""
+Command line tools for the wallet service
+
+Usage:
+    uv run python -m app.cli create-wallets --count 100000 --amount 100.00 > wallets.ndjson
+
+Created wallets are written to stdout as NDJSON, one wallet per line, as soon as
+their chunk is committed.
+"""
+import argparse
+import asyncio
+import sys
+from decimal import Decimal
+
+from app.db.session import AsyncSessionLocal, async_engine
+from app.schemas.wallet_schemas import BulkWalletCreateModel, WalletResponse
+from app.services.wallet_service import WalletService
+
+
+async def create_wallets(count: int, amount: Decimal, chunk_size: int | None) -> int:
+    """
+    Create wallets in chunks and print them as NDJSON
+    Args:
+        count (int): Number of wallets to create
+        amount (Decimal): Initial balance of every wallet
+        chunk_size (int | None): Wallets per statement, BULK_CREATE_CHUNK_SIZE by default
+    Returns:
+        int: Number of created wallets
+    """
+    request = BulkWalletCreateModel(count=count, amount=amount)
+    created = 0
+    try:
+        async with AsyncSessionLocal() as session:
+            service = WalletService(session)
+            async for wallets in service.create_wallets_bulk(request.count, request.amount, chunk_size):
+                sys.stdout.write("".join(
+                    WalletResponse.model_construct(wallet_id=wallet.uuid, balance=wallet.balance).model_dump_json() + "\n"
+                    for wallet in wallets
+                ))
+                created += len(wallets)
+    finally:
+        await async_engine.dispose()
+    return created
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Wallet service tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create-wallets", help="Create wallets with an initial balance")
+    create.add_argument("--count", type=int, required=True, help="Number of wallets to create")
+    create.add_argument("--amount", type=Decimal, required=True, help="Initial balance of every wallet")
+    create.add_argument("--chunk-size", type=int, default=None, help="Wallets per INSERT statement")
+    args = parser.parse_args()
+
+    if args.command == "create-wallets":
+        created = asyncio.run(create_wallets(args.count, args.amount, args.chunk_size))
+        print(f"Created {created} wallets", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,11 +15,128 @@ class Settings(BaseSettings):
     DB_PORT: int = 5432
     DB_HOST: str = "localhost"
 
+    # Connection pool, per engine and per process
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Startup warm-up, connections opened and primed before the worker reports ready
+    DB_POOL_WARMUP_CONNECTIONS: int = 5
+    WARMUP_RETRY_SECONDS: float = 1.0
+
+    # Server side timeouts, 0 disables them
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_LOCK_TIMEOUT_MS: int = 1000
+
+    # Optional read replica used for lock-free balance reads.
+    # When DB_READ_HOST is not set, reads go to the primary database.
+    DB_READ_HOST: str | None = None
+    DB_READ_PORT: int | None = None
+
+    # Group commit of concurrent operations on the same wallet
+    WALLET_COALESCING_ENABLED: bool = False
+    WALLET_COALESCING_WINDOW_MS: float = 2.0
+    WALLET_COALESCING_MAX_BATCH: int = 100
+    # Operations queued per wallet behind a running flush, further ones are shed with 429
+    WALLET_COALESCING_MAX_QUEUE: int = 1000
+
+    # Concurrency control of coalesced groups and batches (single operations are one
+    # conditional UPDATE either way). "pessimistic" locks rows when reading them,
+    # "optimistic" reads without locks and writes with a version check, retrying
+    # conflicts with jittered backoff and locking after OPTIMISTIC_MAX_CONFLICTS,
+    # "adaptive" is optimistic except for wallets that conflicted recently.
+    WALLET_CONCURRENCY_MODE: Literal["pessimistic", "optimistic", "adaptive"] = "pessimistic"
+    OPTIMISTIC_MAX_CONFLICTS: int = 3
+    OPTIMISTIC_BACKOFF_MS: float = 2.0
+    OPTIMISTIC_HOT_WALLETS_SIZE: int = 10_000
+    OPTIMISTIC_HOT_WALLET_TTL_SECONDS: float = 60.0
+
+    # Append-only ledger mode, balances are materialized from snapshots
+    # plus the sum of newer ledger entries instead of a mutable column.
+    # Wallets with LEDGER_SNAPSHOT_INTERVAL newer entries are snapshotted by a
+    # background task, which retries busy wallets every LEDGER_SNAPSHOT_RETRY_SECONDS.
+    WALLET_LEDGER_ENABLED: bool = False
+    LEDGER_SNAPSHOT_INTERVAL: int = 100
+    LEDGER_SNAPSHOT_RETRY_SECONDS: float = 1.0
+
+    # In-memory cache in front of the idempotency_keys table
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 300.0
+
+    # Logging, success path INFO logs are sampled
+    LOG_LEVEL: str = "INFO"
+    LOG_SUCCESS_SAMPLE_RATE: float = 0.01
+
+    # Per-process balance read cache, entries of other processes' writes
+    # become visible after at most BALANCE_CACHE_TTL_SECONDS
+    BALANCE_CACHE_ENABLED: bool = False
+    BALANCE_CACHE_SIZE: int = 100_000
+    BALANCE_CACHE_TTL_SECONDS: float = 1.0
+
+    # Wallets inserted per statement and transaction by bulk creation
+    BULK_CREATE_CHUNK_SIZE: int = 5000
+
+    # Wallets read per keyset page by the export and per lookup by reconciliation
+    EXPORT_PAGE_SIZE: int = 10_000
+
+    # Admission control in front of wallet operations. Every client (X-Client-Id header,
+    # or the remote address) gets a token bucket, every wallet runs at most
+    # ADMISSION_WALLET_CONCURRENCY operations with a bounded queue behind them.
+    # Behind a load balancer every request has the balancer's address, so the proxy
+    # must set X-Client-Id before this is enabled, or all clients share one bucket.
+    ADMISSION_ENABLED: bool = False
+    ADMISSION_CLIENT_RATE: float = 1000.0
+    ADMISSION_CLIENT_BURST: int = 2000
+    ADMISSION_MAX_CLIENTS: int = 100_000
+    ADMISSION_WALLET_CONCURRENCY: int = 4
+    ADMISSION_WALLET_QUEUE_SIZE: int = 32
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 1.0
+
+    # Balance change feed (GET /{wallet_id}/events). Write transactions NOTIFY the
+    # new balances, every process fans them out from a single LISTEN connection.
+    # Off by default: NOTIFY costs a round trip and serializes commits on the
+    # server's notification queue lock, whether anyone listens or not.
+    WALLET_EVENTS_ENABLED: bool = False
+    WALLET_EVENTS_CHANNEL: str = "wallet_balances"
+    WALLET_EVENTS_BUFFER_SIZE: int = 16
+    WALLET_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Transactional outbox of balance changes for post-commit side effects, drained
+    # by a background dispatcher in every worker. Sinks: "file", "memory".
+    # A delivery taking longer than OUTBOX_DELIVERY_TIMEOUT_SECONDS is retried.
+    OUTBOX_ENABLED: bool = False
+    OUTBOX_SINKS: list[str] = ["file"]
+    OUTBOX_FILE_PATH: str = "outbox.ndjson"
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 0.5
+    OUTBOX_RETRY_SECONDS: float = 30.0
+    OUTBOX_DELIVERY_TIMEOUT_SECONDS: float = 10.0
+
+    # Production launcher (python -m app.server), 0 workers means one per CPU.
+    # Workers are capped so that their pools fit in the primary's max_connections
+    # minus the connections reserved for superusers, migrations and maintenance.
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    DB_MAX_CONNECTIONS: int = 100
+    DB_RESERVED_CONNECTIONS: int = 10
+
     model_config = SettingsConfigDict(env_file=PATH_ENV, env_file_encoding="utf-8")
 
     @property
     def async_database_url(self) -> str:
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def async_read_database_url(self) -> str:
+        if not self.DB_READ_HOST:
+            return self.async_database_url
+        port = self.DB_READ_PORT or self.DB_PORT
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_READ_HOST}:{port}/{self.DB_NAME}"
+
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
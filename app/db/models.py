@@ -1,7 +1,19 @@
-import uuid
+from uuid import UUID, uuid4
+from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Numeric, String
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    PrimaryKeyConstraint,
+    String,
+    Uuid,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -14,21 +26,26 @@ class Wallet(Base):
     """
     Database model represent a user`s wallet
     Attributes:
-        uuid (str): Unique UUID of the wallet
+        uuid (UUID): Unique UUID of the wallet
         balance (Decimal): Current balance of the wallet, with precision up to 2 decimal places
+        version (int): Incremented on every balance change, orders cached balances
+    The table is hash partitioned by uuid, lookups must filter on uuid to be pruned
+    to a single partition.
     """
 
     __tablename__ = "wallets"
+    __table_args__ = {"postgresql_partition_by": "HASH (uuid)"}
 
-    uuid: Mapped[str] = mapped_column(
-        String(8),
+    uuid: Mapped[UUID] = mapped_column(
+        Uuid,
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
-        index=True,
+        default=uuid4,
     )
 
     balance: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
 
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+
     def deposit(self, amount: Decimal) -> None:
         """
         Increases balance of the wallet by the specified amount
@@ -49,3 +66,126 @@ class Wallet(Base):
 
     def __repr__(self) -> str:
         return f'<Wallet(uuid="{self.uuid}", balance="{self.balance}")>'
+
+
+class WalletTransaction(Base):
+
+    """
+    Append-only ledger entry of a wallet balance change
+    Attributes:
+        id (int): Monotonic entry id, defines the order of entries
+        wallet_uuid (UUID): UUID of the wallet
+        operation_type (str): Operation which produced the entry
+        amount (Decimal): Signed balance change, negative for withdrawals
+        created_at (datetime): Time the entry was written
+    The table is hash partitioned by wallet_uuid like wallets, the primary key
+    (wallet_uuid, id) also serves the ledger reads of one wallet.
+    """
+
+    __tablename__ = "wallet_transactions"
+    __table_args__ = (
+        PrimaryKeyConstraint("wallet_uuid", "id"),
+        {"postgresql_partition_by": "HASH (wallet_uuid)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    wallet_uuid: Mapped[UUID] = mapped_column(Uuid, ForeignKey("wallets.uuid"), primary_key=True)
+    operation_type: Mapped[str] = mapped_column(String(16))
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f'<WalletTransaction(id={self.id}, wallet_uuid="{self.wallet_uuid}", amount="{self.amount}")>'
+
+
+class WalletSnapshot(Base):
+
+    """
+    Materialized wallet balance covering all ledger entries up to transaction_id
+    Attributes:
+        id (int): Snapshot id
+        wallet_uuid (UUID): UUID of the wallet
+        transaction_id (int): Id of the last ledger entry included in the balance
+        balance (Decimal): Wallet balance at that entry
+        created_at (datetime): Time the snapshot was written
+    The table is hash partitioned by wallet_uuid like wallets.
+    """
+
+    __tablename__ = "wallet_snapshots"
+    __table_args__ = (
+        PrimaryKeyConstraint("wallet_uuid", "id"),
+        Index("ix_wallet_snapshots_wallet_uuid_transaction_id", "wallet_uuid", "transaction_id", unique=True),
+        {"postgresql_partition_by": "HASH (wallet_uuid)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    wallet_uuid: Mapped[UUID] = mapped_column(Uuid, ForeignKey("wallets.uuid"), primary_key=True)
+    transaction_id: Mapped[int] = mapped_column(BigInteger)
+    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f'<WalletSnapshot(wallet_uuid="{self.wallet_uuid}", transaction_id={self.transaction_id})>'
+
+
+class IdempotencyKey(Base):
+
+    """
+    Result of an operation stored under the client supplied Idempotency-Key
+    Written in the same transaction as the balance change, so a key exists
+    if and only if its operation was committed.
+    Attributes:
+        key (str): Idempotency key sent by the client
+        wallet_uuid (UUID): UUID of the wallet the operation was applied to
+        operation_type (str): Operation type of the original request
+        amount (Decimal): Amount of the original request
+        target_wallet_uuid (UUID | None): Credited wallet of the original request, transfers only
+        balance (Decimal): Wallet balance returned to the original request
+        created_at (datetime): Time the operation was committed
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    wallet_uuid: Mapped[UUID] = mapped_column(Uuid, ForeignKey("wallets.uuid"))
+    operation_type: Mapped[str] = mapped_column(String(16))
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    target_wallet_uuid: Mapped[UUID | None] = mapped_column(Uuid, nullable=True)
+    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f'<IdempotencyKey(key="{self.key}", wallet_uuid="{self.wallet_uuid}")>'
+
+
+class OutboxEntry(Base):
+
+    """
+    Balance change waiting to be delivered to the outbox sinks
+    Written in the same transaction as the balance change and deleted once delivered,
+    the table only holds the backlog. There's no foreign key, entries are a log and
+    must not add lock or check work to the write path.
+    Attributes:
+        id (int): Monotonic entry id, deduplication key of consumers, not a delivery order
+        wallet_uuid (UUID): UUID of the wallet
+        operation_type (str): Operation which changed the balance
+        amount (Decimal): Signed balance change, negative for withdrawals
+        balance (Decimal): Wallet balance right after the change
+        attempts (int): Failed delivery attempts
+        available_at (datetime): Entry is not delivered before this time
+        created_at (datetime): Time the entry was written
+    """
+
+    __tablename__ = "wallet_outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    wallet_uuid: Mapped[UUID] = mapped_column(Uuid)
+    operation_type: Mapped[str] = mapped_column(String(16))
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f'<OutboxEntry(id={self.id}, wallet_uuid="{self.wallet_uuid}", amount="{self.amount}")>'
@@ -0,0 +1,60 @@
+import time
+from typing import cast
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool which records how long callers wait for a connection
+    Attributes:
+        wait_count (int): Number of checkouts
+        wait_seconds_total (float): Total time spent waiting for a connection
+        wait_seconds_max (float): Longest single wait
+        timeouts (int): Checkouts which gave up after the pool timeout
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_count += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+
+
+def pool_stats(pool: Pool) -> dict[str, float]:
+    """
+    Snapshot of the pool usage
+    Args:
+        pool (Pool): Pool of an engine (engine.pool), the engines of app.db.session
+            are all created with InstrumentedAsyncQueuePool
+    Returns:
+        dict: Size, checked out and overflow connections and wait time counters
+    """
+    # engine.pool is typed as the base Pool
+    instrumented = cast(InstrumentedAsyncQueuePool, pool)
+    return {
+        "size": instrumented.size(),
+        "checked_out": instrumented.checkedout(),
+        "overflow": max(instrumented.overflow(), 0),
+        "checked_in": instrumented.checkedin(),
+        "wait_count": instrumented.wait_count,
+        "wait_seconds_total": instrumented.wait_seconds_total,
+        "wait_seconds_max": instrumented.wait_seconds_max,
+        "timeouts": instrumented.timeouts,
+    }
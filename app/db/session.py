@@ -1,11 +1,52 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool
 
 
-async_engine = create_async_engine(settings.async_database_url)
+def create_engine(url: str) -> AsyncEngine:
+    """
+    Create an async engine with the pool and timeout settings from the configuration.
+
+    Lock waits and statements are bounded on the server, so a burst on one
+    wallet fails fast instead of holding pool connections indefinitely.
+
+    Args:
+        url (str): Database URL
+
+    Returns:
+        AsyncEngine: Configured engine
+
+    """
+    server_settings = {
+        "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        "lock_timeout": str(settings.DB_LOCK_TIMEOUT_MS),
+    }
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    )
+
+
+async_engine = create_engine(settings.async_database_url)
+
+# Reads share the primary engine unless a replica is configured
+async_read_engine = (
+    create_engine(settings.async_read_database_url)
+    if settings.DB_READ_HOST
+    else async_engine
+)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
@@ -13,6 +54,12 @@ AsyncSessionLocal = async_sessionmaker(
     class_=AsyncSession,
 )
 
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -27,3 +74,19 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async generator that yields a read-only SQLAlchemy AsyncSession.
+
+    The session is bound to the read replica when one is configured,
+    otherwise to the primary database. It must only be used for plain
+    snapshot reads, never for row locks or writes.
+
+    Yields:
+        AsyncSession: An asynchronous SQLAlchemy session for reads.
+
+    """
+    async with AsyncReadSessionLocal() as session:
+        yield session
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import Executable, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.config import settings
+from app.db.models import Wallet
+from app.schemas.wallet_schemas import OperationType
+from app.services.strategies.registry import STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+# Ids no wallet can have, warm-up statements match no rows and take no locks
+WARMUP_WALLET_ID = UUID(int=0)
+WARMUP_TARGET_ID = UUID(int=1)
+
+
+def read_statements() -> list[Executable]:
+    """
+    Statements of the balance read path, safe on a read replica
+    """
+    return [select(Wallet).where(Wallet.uuid == WARMUP_WALLET_ID)]
+
+
+def write_statements() -> list[Executable]:
+    """
+    Statements of the operation hot path, executed in a transaction which is rolled back
+    """
+    return read_statements() + [
+        select(Wallet).where(Wallet.uuid == WARMUP_WALLET_ID).with_for_update(),
+        select(Wallet.uuid).where(Wallet.uuid == WARMUP_WALLET_ID),
+        STRATEGIES[OperationType.DEPOSIT].statement(WARMUP_WALLET_ID, Decimal(1)),
+        STRATEGIES[OperationType.WITHDRAW].statement(WARMUP_WALLET_ID, Decimal(1)),
+        STRATEGIES[OperationType.TRANSFER].statement(WARMUP_WALLET_ID, Decimal(1), WARMUP_TARGET_ID),
+    ]
+
+
+async def warm_up_connection(engine: AsyncEngine, statements: list[Executable]) -> None:
+    """
+    Open a pool connection and run the statements on it
+    Going through an ORM session fills the same compiled cache entries as the services,
+    and asyncpg keeps the prepared statements in the cache of the connection.
+    Args:
+        engine (AsyncEngine): Engine to warm up
+        statements (list[Executable]): Statements to execute
+    """
+    async with engine.connect() as connection:
+        async with AsyncSession(bind=connection) as session:
+            for statement in statements:
+                await session.execute(statement)
+        await connection.rollback()
+
+
+async def warm_up(engine: AsyncEngine, statements: list[Executable], connections: int | None = None) -> None:
+    """
+    Pre-fill the pool of an engine with primed connections
+    Connections are checked out concurrently so that distinct ones are opened,
+    they stay in the pool when returned.
+    Args:
+        engine (AsyncEngine): Engine to warm up
+        statements (list[Executable]): Statements to execute on every connection
+        connections (int | None): Connections to open, DB_POOL_WARMUP_CONNECTIONS by default
+    """
+    if connections is None:
+        connections = settings.DB_POOL_WARMUP_CONNECTIONS
+    count = min(connections, settings.DB_POOL_SIZE)
+    started = time.perf_counter()
+    await asyncio.gather(*(warm_up_connection(engine, statements) for _ in range(count)))
+    logger.info(
+        "Warmed up %s connections in %.3fs", count, time.perf_counter() - started,
+        extra={"engine": engine.url.host},
+    )
@@ -14,3 +14,18 @@ class InvalidOperationException(HTTPException):
 class OperationExecutionException(HTTPException):
     def __init__(self, detail: str) -> None:
         super().__init__(status_code=400, detail=detail)
+
+
+class IdempotencyKeyMismatchException(HTTPException):
+    def __init__(self, detail: str = "Idempotency key was used with a different request") -> None:
+        super().__init__(status_code=422, detail=detail)
+
+
+class TooManyRequestsException(HTTPException):
+    def __init__(self, detail: str = "Too many requests, retry later", retry_after: int = 1) -> None:
+        super().__init__(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+
+
+class ServiceBusyException(HTTPException):
+    def __init__(self, detail: str = "Service is busy, retry later", retry_after: int = 1) -> None:
+        super().__init__(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
@@ -0,0 +1,74 @@
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config import settings
+
+# Attributes every LogRecord has, anything else was passed through `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    Formatter appending the structured fields passed through `extra` as key=value pairs
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = [
+            f"{key}={value}" for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES
+        ]
+        return f"{line} {' '.join(fields)}" if fields else line
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler which leaves all formatting to the listener thread
+    The stock QueueHandler merges the message and its arguments before enqueueing,
+    which would run the formatting on the event loop. Records never leave the process,
+    so they are enqueued untouched.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class LogSampler:
+    """
+    Decides whether a high volume success log is emitted
+    Attributes:
+        rate (float): Share of the calls which are logged, between 0 and 1
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+
+    def __call__(self) -> bool:
+        return self.rate >= 1 or (self.rate > 0 and random.random() < self.rate)
+
+
+success_sampler = LogSampler(settings.LOG_SUCCESS_SAMPLE_RATE)
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route all application logs through an in-memory queue
+    The event loop only enqueues records, formatting and stream writes happen
+    in the listener thread.
+    Returns:
+        QueueListener: Started listener, stop it on shutdown to flush pending records
+    """
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(KeyValueFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+    root = logging.getLogger()
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL)
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
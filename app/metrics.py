@@ -0,0 +1,176 @@
+"""
+Minimal Prometheus compatible metrics
+
+Label values are bound once with `labels(...)` and the returned child is cheap to update:
+a hot path only does float additions and a bisect, all formatting happens at scrape time.
+"""
+import bisect
+from abc import ABC, abstractmethod
+from typing import Callable, Generic, TypeVar
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+ChildT = TypeVar("ChildT", CounterChild, HistogramChild)
+
+
+class Metric(ABC):
+    """
+    Base class of a metric family with a fixed set of label names
+    Attributes:
+        name (str): Metric name
+        documentation (str): Help text
+        labelnames (tuple[str, ...]): Names of the labels
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        REGISTRY.register(self)
+
+    def _label_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        """Sample lines of the metric, without the HELP and TYPE header."""
+
+
+class ChildMetric(Metric, Generic[ChildT]):
+    """
+    Metric family whose samples are kept in one child per label values
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self._children: dict[tuple[str, ...], ChildT] = {}
+        super().__init__(name, documentation, labelnames)
+
+    def labels(self, *values: str) -> ChildT:
+        """
+        Return the child for the label values, created on first use
+        """
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> ChildT:
+        """New child holding the samples of one set of label values."""
+
+
+class Counter(ChildMetric[CounterChild]):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def _render_samples(self) -> list[str]:
+        return [f"{self.name}{self._label_text(values)} {child.value}" for values, child in self._children.items()]
+
+
+class Histogram(ChildMetric[HistogramChild]):
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def _render_samples(self) -> list[str]:
+        lines = []
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_label = 'le="' + le + '"'
+                lines.append(f"{self.name}_bucket{self._label_text(values, bucket_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(values)} {child.sum}")
+            lines.append(f"{self.name}_count{self._label_text(values)} {child.count}")
+        return lines
+
+
+class CallbackGauge(Metric):
+    """
+    Gauge whose samples are read from a callback at scrape time
+    The callback returns a mapping of label values to the current value.
+    """
+    kind = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            callback: Callable[[], dict[tuple[str, ...], float]],
+            labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.callback = callback
+        super().__init__(name, documentation, labelnames)
+
+    def _render_samples(self) -> list[str]:
+        return [f"{self.name}{self._label_text(values)} {value}" for values, value in self.callback().items()]
+
+
+class Registry:
+    """
+    Collection of metrics rendered in the Prometheus text exposition format
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
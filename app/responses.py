@@ -0,0 +1,70 @@
+"""
+JSON encoding of responses outside of the wallet fast path
+
+Wallet bodies are already serialized by pydantic-core (see wallet_json in the routes).
+Everything else FastAPI renders goes through FastJSONResponse, encoded with orjson.
+Decimals are always encoded as strings, exactly as stored, never through float.
+
+Error bodies of HTTPException (including the ones raised by routing) are encoded once
+per distinct detail and reused.
+"""
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+from starlette.exceptions import HTTPException
+
+# Details of the fixed errors are few, rare dynamic ones just fall out of the LRU
+ERROR_BODY_CACHE_SIZE = 256
+
+
+def _default(value: Any) -> Any:
+    # orjson encodes UUID and datetime natively, Decimal is left to us
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_dumps(content: Any) -> bytes:
+    """
+    Encode content as compact UTF-8 JSON
+    Args:
+        content (Any): JSON compatible value, may contain Decimal, UUID and datetime
+    Returns:
+        bytes: Encoded body
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse encoding Decimal exactly, used as the app's default response class
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+@lru_cache(maxsize=ERROR_BODY_CACHE_SIZE)
+def error_body(detail: str) -> bytes:
+    """
+    Encoded {"detail": ...} body of an error, built once per detail
+    Args:
+        detail (str): Error detail
+    """
+    return json_dumps({"detail": detail})
+
+
+async def http_exception_handler(request: Request, exc: Exception) -> Response:
+    """Renders HTTPException like FastAPI does, reusing the encoded body of string details."""
+    # Registered for HTTPException only, typed like the handlers of Starlette's ExceptionMiddleware
+    assert isinstance(exc, HTTPException)
+    headers = getattr(exc, "headers", None)
+    # Statuses that must not carry a body
+    if exc.status_code in (204, 304):
+        return Response(status_code=exc.status_code, headers=headers)
+    body = error_body(exc.detail) if isinstance(exc.detail, str) else json_dumps({"detail": exc.detail})
+    return Response(body, status_code=exc.status_code, headers=headers, media_type="application/json")
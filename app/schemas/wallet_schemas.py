@@ -1,8 +1,9 @@
 from enum import Enum
 from typing import Annotated
 from decimal import Decimal
+from uuid import UUID
 
-from pydantic import BaseModel, condecimal
+from pydantic import BaseModel, Field, condecimal, model_validator
 
 
 class OperationType(Enum):
@@ -11,13 +12,32 @@ class OperationType(Enum):
     """
     DEPOSIT = "DEPOSIT"
     WITHDRAW = "WITHDRAW"
+    TRANSFER = "TRANSFER"
+
+
+class BatchMode(Enum):
+    """
+    Enum representing how a batch of operations is committed
+    ATOMIC: all operations are applied or none of them
+    BEST_EFFORT: successful operations are applied, rejected ones are skipped
+    """
+    ATOMIC = "ATOMIC"
+    BEST_EFFORT = "BEST_EFFORT"
+
+
+class ExportFormat(Enum):
+    """
+    Enum representing the output formats of the wallet export
+    """
+    NDJSON = "NDJSON"
+    CSV = "CSV"
 
 
 class WalletResponse(BaseModel):
     """
     Response model representing a wallet`s public data
     """
-    wallet_id: str
+    wallet_id: UUID
     balance: Annotated[Decimal, condecimal(gt=0, max_digits=12, decimal_places=2)]
 
 
@@ -34,9 +54,19 @@ class BaseModelWallet(BaseModel):
 class OperationModel(BaseModelWallet):
     """
     Model representing a wallet operation request.
-    Includes the operation types and an amount value.
+    Includes the operation types and an amount value,
+    transfers also include the wallet receiving the amount.
     """
     operation_type: OperationType
+    target_wallet_id: UUID | None = None
+
+    @model_validator(mode="after")
+    def check_target_wallet(self) -> "OperationModel":
+        if self.operation_type is OperationType.TRANSFER and self.target_wallet_id is None:
+            raise ValueError("target_wallet_id is required for TRANSFER")
+        if self.operation_type is not OperationType.TRANSFER and self.target_wallet_id is not None:
+            raise ValueError("target_wallet_id is only allowed for TRANSFER")
+        return self
 
 
 class WalletCreateModel(BaseModelWallet):
@@ -44,3 +74,70 @@ class WalletCreateModel(BaseModelWallet):
     Model for creating a new wallet with an initial amount value.
     """
     pass
+
+
+class BulkWalletCreateModel(BaseModelWallet):
+    """
+    Model for creating many wallets with the same initial amount value.
+    """
+    count: int = Field(gt=0, le=1_000_000)
+
+
+class BatchOperationItem(OperationModel):
+    """
+    Model representing a single operation inside a batch request.
+    Includes the target wallet id in addition to the operation fields.
+    """
+    wallet_id: UUID
+
+
+class BatchOperationRequest(BaseModel):
+    """
+    Model for applying a list of wallet operations in one transaction.
+    Operations are applied in the order they are given.
+    """
+    model_config = {"extra": "forbid"}
+    mode: BatchMode = BatchMode.ATOMIC
+    operations: list[BatchOperationItem] = Field(min_length=1, max_length=10_000)
+
+
+class BatchOperationResult(BaseModel):
+    """
+    Result of a single batch operation, in the same position as the request item.
+    Balance is the wallet balance right after this operation was applied.
+    """
+    wallet_id: UUID
+    success: bool
+    balance: Decimal | None = None
+    detail: str | None = None
+
+
+class BatchOperationResponse(BaseModel):
+    """
+    Response model for a batch of operations
+    committed is False when an ATOMIC batch was rolled back.
+    """
+    committed: bool
+    results: list[BatchOperationResult]
+
+
+class ExpectedBalance(BaseModel):
+    """
+    Single line of a reconciliation request, the balance the caller expects for a wallet.
+    """
+    model_config = {"extra": "forbid"}
+    wallet_id: UUID
+    balance: Decimal
+
+
+class ReconcileMismatch(BaseModel):
+    """
+    Single line of a reconciliation response
+    actual is None when the wallet doesn't exist, wallet_id and expected are None
+    when the request line couldn't be parsed.
+    """
+    line: int
+    wallet_id: UUID | None = None
+    expected: Decimal | None = None
+    actual: Decimal | None = None
+    detail: str
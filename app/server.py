@@ -0,0 +1,80 @@
+"""
+Production launcher for the wallet API
+
+Usage:
+    uv run python -m app.server
+
+Starts SERVER_WORKERS uvicorn worker processes (one per CPU by default). Every
+worker imports the app on its own and builds its own engine pools in the lifespan.
+SIGTERM stops accepting connections and lets in-flight requests finish for up to
+SERVER_GRACEFUL_SHUTDOWN_SECONDS. uvloop and httptools are used when they are
+installed, otherwise the stdlib event loop and h11.
+"""
+import importlib.util
+import logging
+import os
+
+import uvicorn
+from uvicorn.config import HTTPProtocolType, LoopSetupType
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def connections_per_worker() -> int:
+    """
+    Maximum number of connections a worker may open to the primary database
+    A read replica has its own max_connections and isn't counted, the balance
+    events listener holds one connection outside of the pool.
+    """
+    listener = 1 if settings.WALLET_EVENTS_ENABLED else 0
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW + listener
+
+
+def budget_workers(requested: int) -> int:
+    """
+    Cap the number of workers so their pools fit in the connection budget of the primary
+    Args:
+        requested (int): Number of workers asked for
+    Returns:
+        int: Number of workers to start
+    Raises:
+        SystemExit: When even a single worker doesn't fit
+    """
+    budget = settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS
+    per_worker = connections_per_worker()
+    allowed = budget // per_worker
+    if allowed < 1:
+        raise SystemExit(
+            f"A worker may open {per_worker} connections but only {budget} are available, "
+            "lower DB_POOL_SIZE/DB_MAX_OVERFLOW or raise DB_MAX_CONNECTIONS"
+        )
+    if requested > allowed:
+        logger.warning(
+            "Starting %s workers instead of %s, %s connections each must fit in %s",
+            allowed, requested, per_worker, budget,
+        )
+        return allowed
+    return requested
+
+
+def main() -> None:
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    workers = budget_workers(settings.SERVER_WORKERS or os.cpu_count() or 1)
+    loop: LoopSetupType = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http: HTTPProtocolType = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info("Starting %s workers with %s loop and %s parser", workers, loop, http)
+    uvicorn.run(
+        "main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
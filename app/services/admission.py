@@ -0,0 +1,150 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID
+
+from app.config import settings
+from app.exceptions import TooManyRequestsException
+from app.services.cache import TTLCache
+from app.services.wallet_metrics import ADMISSION_REJECTIONS_TOTAL
+
+CLIENT_RATE_REJECTIONS = ADMISSION_REJECTIONS_TOTAL.labels("client_rate")
+WALLET_QUEUE_FULL_REJECTIONS = ADMISSION_REJECTIONS_TOTAL.labels("wallet_queue_full")
+WALLET_QUEUE_TIMEOUT_REJECTIONS = ADMISSION_REJECTIONS_TOTAL.labels("wallet_queue_timeout")
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a fixed rate
+    Attributes:
+        rate (float): Tokens added per second
+        burst (int): Maximum number of tokens
+    """
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def acquire(self) -> float:
+        """
+        Take a token if one is available
+        Returns:
+            float: 0 when a token was taken, otherwise seconds until the next one
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class WalletSlot:
+    """
+    Concurrency state of one wallet, dropped as soon as the wallet is idle
+    """
+    __slots__ = ("semaphore", "users")
+
+    def __init__(self, concurrency: int) -> None:
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Operations running or waiting on the semaphore
+        self.users = 0
+
+
+class AdmissionController:
+    """
+    Sheds wallet operations with 429 before they reach the database
+        A client over its token bucket rate is rejected right away. Per wallet at most
+        `concurrency` operations run at a time and at most `queue_size` wait behind them,
+        so a hammered wallet can't pin the pool connections every other wallet needs.
+        Not thread-safe, it is meant to be used from the event loop only.
+    Attributes:
+        rate (float): Operations per second allowed per client
+        burst (int): Operations a client may send at once
+        concurrency (int): Operations running at a time per wallet
+        queue_size (int): Operations waiting per wallet
+        queue_timeout (float): Seconds an operation may wait for its wallet
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            burst: int,
+            max_clients: int,
+            concurrency: int,
+            queue_size: int,
+            queue_timeout: float,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        # A bucket left idle long enough to refill completely is equivalent to a new one
+        self._buckets: TTLCache[str, TokenBucket] = TTLCache(max_clients, ttl=burst / rate)
+        self._wallets: dict[UUID, WalletSlot] = {}
+
+    def check_client(self, client: str) -> None:
+        """
+        Take a token from the bucket of a client
+        Args:
+            client (str): Client identifier
+        Raises:
+            TooManyRequestsException: When the client is over its rate
+        """
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+        self._buckets.set(client, bucket)
+        wait = bucket.acquire()
+        if wait:
+            CLIENT_RATE_REJECTIONS.inc()
+            raise TooManyRequestsException(detail="Rate limit exceeded", retry_after=math.ceil(wait))
+
+    @asynccontextmanager
+    async def wallet_slot(self, wallet_id: UUID) -> AsyncIterator[None]:
+        """
+        Hold one of the concurrency slots of a wallet for the duration of the block
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        Raises:
+            TooManyRequestsException: When the wallet queue is full or the wait times out
+        """
+        slot = self._wallets.get(wallet_id)
+        if slot is None:
+            slot = self._wallets[wallet_id] = WalletSlot(self.concurrency)
+        elif slot.users >= self.concurrency + self.queue_size:
+            WALLET_QUEUE_FULL_REJECTIONS.inc()
+            raise TooManyRequestsException(detail="Wallet is busy, retry later")
+
+        slot.users += 1
+        try:
+            try:
+                await asyncio.wait_for(slot.semaphore.acquire(), self.queue_timeout)
+            except TimeoutError:
+                WALLET_QUEUE_TIMEOUT_REJECTIONS.inc()
+                raise TooManyRequestsException(detail="Wallet is busy, retry later")
+            try:
+                yield
+            finally:
+                slot.semaphore.release()
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._wallets[wallet_id]
+
+
+operation_admission = AdmissionController(
+    rate=settings.ADMISSION_CLIENT_RATE,
+    burst=settings.ADMISSION_CLIENT_BURST,
+    max_clients=settings.ADMISSION_MAX_CLIENTS,
+    concurrency=settings.ADMISSION_WALLET_CONCURRENCY,
+    queue_size=settings.ADMISSION_WALLET_QUEUE_SIZE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+)
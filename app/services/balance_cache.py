@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+from app.config import settings
+from app.services.cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBalance:
+    """
+    Cached wallet balance together with the wallet version it was read at
+    """
+    balance: Decimal
+    version: int
+
+
+class ConfiguredCache(Enum):
+    """
+    Default of cache arguments, stands for the configured balance cache so that None can disable it
+    """
+    DEFAULT = "default"
+
+
+class BalanceCacheBackend(ABC):
+    """
+    Interface of a balance cache shared by the read and write paths
+        Implementations must never replace an entry by one with a lower version,
+        so a slow reader can't overwrite the result of a newer write.
+    """
+
+    @abstractmethod
+    async def get(self, wallet_id: UUID) -> CachedBalance | None:
+        """
+        Return the cached balance of a wallet, None on a miss
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        """
+        pass
+
+    @abstractmethod
+    async def set(self, wallet_id: UUID, entry: CachedBalance) -> None:
+        """
+        Store a balance unless a newer version is already cached
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            entry (CachedBalance): Balance and version to store
+        """
+        pass
+
+    @abstractmethod
+    async def invalidate(self, wallet_id: UUID) -> None:
+        """
+        Drop the cached balance of a wallet
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        """
+        pass
+
+
+class InMemoryBalanceCache(BalanceCacheBackend):
+    """
+    Per-process TTL/LRU balance cache
+        Also serves as the local stand-in for a shared backend in tests.
+    Attributes:
+        _entries (TTLCache): Cached balances keyed by wallet uuid
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._entries: TTLCache[UUID, CachedBalance] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, wallet_id: UUID) -> CachedBalance | None:
+        return self._entries.get(wallet_id)
+
+    async def set(self, wallet_id: UUID, entry: CachedBalance) -> None:
+        current = self._entries.get(wallet_id)
+        if current is not None and current.version > entry.version:
+            return
+        self._entries.set(wallet_id, entry)
+
+    async def invalidate(self, wallet_id: UUID) -> None:
+        self._entries.pop(wallet_id)
+
+
+balance_cache: BalanceCacheBackend | None = (
+    InMemoryBalanceCache(maxsize=settings.BALANCE_CACHE_SIZE, ttl=settings.BALANCE_CACHE_TTL_SECONDS)
+    if settings.BALANCE_CACHE_ENABLED
+    else None
+)
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.models import Wallet
+from app.db.session import AsyncSessionLocal
+from app.exceptions import TooManyRequestsException
+from app.schemas.wallet_schemas import OperationModel
+from app.services.wallet_metrics import ADMISSION_REJECTIONS_TOTAL
+from app.services.wallet_service import WalletService
+
+logger = logging.getLogger(__name__)
+
+COALESCER_QUEUE_FULL_REJECTIONS = ADMISSION_REJECTIONS_TOTAL.labels("coalescer_queue_full")
+
+
+@dataclass(slots=True)
+class PendingOperation:
+    """
+    Operation waiting in a wallet queue together with the future of its caller
+    """
+    operation: OperationModel
+    future: asyncio.Future[Wallet]
+
+
+class WalletOperationCoalescer:
+    """
+    In-process group commit for operations on the same wallet
+        Operations are queued per wallet for a short window or until the batch
+        size limit is reached, then applied in order on one locked row in a single
+        transaction. At most one flush per wallet runs at a time, operations arriving
+        meanwhile form the next group. At most max_queue operations wait per wallet,
+        so a hammered wallet can't grow its queue without bound.
+    Attributes:
+        _session_factory (async_sessionmaker): Factory for the flush sessions
+        _window (float): Seconds to wait for more operations before flushing
+        _max_batch (int): Flush immediately once this many operations are queued
+        _max_queue (int): Operations waiting per wallet before new ones are rejected
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            window: float,
+            max_batch: int,
+            max_queue: int,
+    ) -> None:
+        self._session_factory = session_factory
+        self._window = window
+        self._max_batch = max_batch
+        self._max_queue = max_queue
+        self._pending: dict[UUID, list[PendingOperation]] = {}
+        self._timers: dict[UUID, asyncio.TimerHandle] = {}
+        self._in_flight: set[UUID] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, wallet_id: UUID, operation: OperationModel) -> Wallet:
+        """
+        Queue an operation and wait for the result of its group
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            operation (OperationModel): Operation model containing type and amount
+        Returns:
+            Wallet: Wallet snapshot right after this operation was applied
+        Raises:
+            TooManyRequestsException: When the wallet queue is full
+            HTTPException: The same errors as WalletService.perform_wallet
+        """
+        queue = self._pending.setdefault(wallet_id, [])
+        if len(queue) >= self._max_queue:
+            COALESCER_QUEUE_FULL_REJECTIONS.inc()
+            raise TooManyRequestsException(detail="Wallet is busy, retry later")
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Wallet] = loop.create_future()
+        queue.append(PendingOperation(operation=operation, future=future))
+
+        if len(queue) >= self._max_batch:
+            self._schedule_flush(wallet_id)
+        elif wallet_id not in self._timers:
+            self._timers[wallet_id] = loop.call_later(self._window, self._schedule_flush, wallet_id)
+
+        return await future
+
+    def _schedule_flush(self, wallet_id: UUID) -> None:
+        """
+        Start flushing up to max_batch queued operations of a wallet unless a flush is already
+        running, in which case the running flush picks them up when it completes.
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        """
+        timer = self._timers.pop(wallet_id, None)
+        if timer is not None:
+            timer.cancel()
+
+        if wallet_id in self._in_flight:
+            return
+
+        queue = self._pending.pop(wallet_id, None)
+        if not queue:
+            return
+        # A flush never exceeds max_batch, the rest stays queued for the next one
+        group = queue[:self._max_batch]
+        if len(queue) > self._max_batch:
+            self._pending[wallet_id] = queue[self._max_batch:]
+
+        self._in_flight.add(wallet_id)
+        task = asyncio.create_task(self._flush(wallet_id, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, wallet_id: UUID, group: list[PendingOperation]) -> None:
+        """
+        Apply a group of operations and resolve the future of every caller
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            group (list[PendingOperation]): Operations in arrival order
+        """
+        try:
+            async with self._session_factory() as session:
+                outcomes = await WalletService(session).perform_wallet_group(
+                    wallet_id, [pending.operation for pending in group]
+                )
+            for pending, outcome in zip(group, outcomes):
+                if pending.future.done():
+                    continue
+                if isinstance(outcome, HTTPException):
+                    pending.future.set_exception(outcome)
+                else:
+                    pending.future.set_result(outcome)
+        except HTTPException as exp:
+            self._fail(group, exp)
+        except Exception as exp:
+            logger.error("Unexpected error during coalesced flush on wallet %s: %s", wallet_id, exp)
+        finally:
+            # Unexpected errors and a cancelled flush (shutdown) must not leave callers waiting forever
+            self._fail(group, HTTPException(status_code=500, detail="Internal Server Error"))
+            self._in_flight.discard(wallet_id)
+            if self._pending.get(wallet_id):
+                self._schedule_flush(wallet_id)
+
+    @staticmethod
+    def _fail(group: list[PendingOperation], exp: HTTPException) -> None:
+        for pending in group:
+            if not pending.future.done():
+                pending.future.set_exception(exp)
+
+
+wallet_coalescer = WalletOperationCoalescer(
+    AsyncSessionLocal,
+    window=settings.WALLET_COALESCING_WINDOW_MS / 1000,
+    max_batch=settings.WALLET_COALESCING_MAX_BATCH,
+    max_queue=settings.WALLET_COALESCING_MAX_QUEUE,
+)
@@ -0,0 +1,78 @@
+import asyncio
+import random
+from typing import Iterable
+from uuid import UUID
+
+from app.config import settings
+from app.services.cache import TTLCache
+from app.services.wallet_metrics import OPTIMISTIC_CONFLICTS_TOTAL
+
+OPTIMISTIC_CONFLICTS = OPTIMISTIC_CONFLICTS_TOTAL.labels()
+
+
+class VersionConflict(Exception):
+    """
+    Raised inside an optimistic transaction to roll it back when a wallet
+    was changed between its read and the versioned write
+    """
+
+
+class ConcurrencyPolicy:
+    """
+    Chooses between optimistic and pessimistic concurrency control for a write
+        pessimistic: rows are locked with FOR UPDATE when they are read.
+        optimistic: rows are read without locks and written with a version check,
+            a conflict rolls back and retries after a jittered backoff.
+        adaptive: optimistic, except for wallets that conflicted recently.
+        Either optimistic mode falls back to locking after max_conflicts conflicts,
+        so a hot wallet can't starve a writer.
+    Attributes:
+        mode (str): pessimistic, optimistic or adaptive
+        max_conflicts (int): Optimistic attempts before falling back to locking
+        backoff (float): Base backoff in seconds, doubled after every conflict
+    """
+
+    def __init__(self, mode: str, max_conflicts: int, backoff: float, hot_size: int, hot_ttl: float) -> None:
+        self.mode = mode
+        self.max_conflicts = max_conflicts
+        self.backoff = backoff
+        # Wallets that conflicted within the TTL are locked right away in adaptive mode
+        self._hot: TTLCache[UUID, bool] = TTLCache(hot_size, ttl=hot_ttl)
+
+    def optimistic(self, wallet_ids: Iterable[UUID], attempt: int) -> bool:
+        """
+        Decide how an attempt reads its wallets
+        Args:
+            wallet_ids (Iterable[UUID]): Wallets written by the transaction
+            attempt (int): Number of conflicts so far
+        Returns:
+            bool: True for a lock-free read with a versioned write
+        """
+        if self.mode == "pessimistic" or attempt >= self.max_conflicts:
+            return False
+        if self.mode == "adaptive":
+            return not any(self._hot.get(wallet_id) for wallet_id in wallet_ids)
+        return True
+
+    async def conflicted(self, wallet_ids: Iterable[UUID], attempt: int) -> None:
+        """
+        Record a conflict and wait before the next attempt
+        Args:
+            wallet_ids (Iterable[UUID]): Wallets written by the transaction
+            attempt (int): Number of conflicts including this one
+        """
+        OPTIMISTIC_CONFLICTS.inc()
+        if self.mode == "adaptive":
+            for wallet_id in wallet_ids:
+                self._hot.set(wallet_id, True)
+        # Full jitter, so conflicting writers don't retry in lockstep
+        await asyncio.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+
+
+concurrency_policy = ConcurrencyPolicy(
+    mode=settings.WALLET_CONCURRENCY_MODE,
+    max_conflicts=settings.OPTIMISTIC_MAX_CONFLICTS,
+    backoff=settings.OPTIMISTIC_BACKOFF_MS / 1000,
+    hot_size=settings.OPTIMISTIC_HOT_WALLETS_SIZE,
+    hot_ttl=settings.OPTIMISTIC_HOT_WALLET_TTL_SECONDS,
+)
@@ -0,0 +1,166 @@
+import logging
+from typing import AsyncIterable, AsyncIterator, Sequence
+
+from pydantic import ValidationError
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import Wallet
+from app.schemas.wallet_schemas import ExpectedBalance, ReconcileMismatch
+from app.services.ledger_service import LedgerService
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the server-side cursor of an export page
+STREAM_PARTITION_SIZE = 1000
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into non-empty text lines without reading it whole
+    Args:
+        chunks (AsyncIterable[bytes]): Body chunks as received
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line.decode()
+    if buffer.strip():
+        yield buffer.decode()
+
+
+class WalletExportService:
+    """
+    Service for reading every wallet in a single pass
+        Wallets are read in uuid order with keyset pagination, every page is a plain
+        SELECT in its own short transaction streamed through a server-side cursor,
+        so memory stays constant and no row locks are taken.
+    Attributes:
+        session AsyncSession: Asynchronous SQLAlchemy session for database operations.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def export(self, page_size: int | None = None) -> AsyncIterator[list[Wallet]]:
+        """
+        Stream all wallets ordered by uuid
+        Args:
+            page_size (int | None): Wallets per keyset page, EXPORT_PAGE_SIZE by default
+        Returns:
+            AsyncIterator: Transient wallet objects, one list per cursor partition
+        """
+        page_size = page_size or settings.EXPORT_PAGE_SIZE
+        last_uuid = None
+        while True:
+            statement = select(Wallet.uuid, Wallet.balance).order_by(Wallet.uuid).limit(page_size)
+            if last_uuid is not None:
+                statement = statement.where(Wallet.uuid > last_uuid)
+
+            fetched = 0
+            async with self.session.begin():
+                result = await self.session.stream(
+                    statement.execution_options(yield_per=STREAM_PARTITION_SIZE)
+                )
+                async for partition in result.partitions():
+                    fetched += len(partition)
+                    last_uuid = partition[-1].uuid
+                    yield await self._balances(partition)
+
+            if fetched < page_size:
+                return
+
+    async def reconcile(
+            self, lines: AsyncIterable[str], batch_size: int | None = None
+    ) -> AsyncIterator[ReconcileMismatch]:
+        """
+        Compare expected balances with the stored ones
+        Lines are looked up in batches with one query each, only mismatches,
+        missing wallets and unparsable lines are returned.
+        Args:
+            lines (AsyncIterable[str]): ExpectedBalance objects as JSON, one per line
+            batch_size (int | None): Lines per lookup, EXPORT_PAGE_SIZE by default
+        Returns:
+            AsyncIterator: Mismatches in request order
+        """
+        batch_size = batch_size or settings.EXPORT_PAGE_SIZE
+        batch: list[tuple[int, ExpectedBalance]] = []
+        # Invalid lines of the current batch, merged with its mismatches to keep request order
+        invalid: list[ReconcileMismatch] = []
+        number = 0
+        async for line in lines:
+            number += 1
+            try:
+                batch.append((number, ExpectedBalance.model_validate_json(line)))
+            except ValidationError as exp:
+                invalid.append(ReconcileMismatch(line=number, detail=f"Invalid line: {exp.errors()[0]['msg']}"))
+            if len(batch) + len(invalid) >= batch_size:
+                for mismatch in await self._flush(batch, invalid):
+                    yield mismatch
+                batch, invalid = [], []
+
+        for mismatch in await self._flush(batch, invalid):
+            yield mismatch
+
+    async def _flush(
+            self, batch: list[tuple[int, ExpectedBalance]], invalid: list[ReconcileMismatch]
+    ) -> list[ReconcileMismatch]:
+        """
+        Compare a batch and merge its mismatches with its invalid lines by line number
+        Args:
+            batch (list[tuple[int, ExpectedBalance]]): Line numbers and expected balances
+            invalid (list[ReconcileMismatch]): Unparsable lines of the same range
+        """
+        mismatches = await self._compare(batch) if batch else []
+        return sorted(mismatches + invalid, key=lambda mismatch: mismatch.line)
+
+    async def _compare(self, batch: list[tuple[int, ExpectedBalance]]) -> list[ReconcileMismatch]:
+        """
+        Look up a batch of wallets and collect the mismatching ones
+        Args:
+            batch (list[tuple[int, ExpectedBalance]]): Line numbers and expected balances
+        """
+        wallet_ids = list({expected.wallet_id for _, expected in batch})
+        async with self.session.begin():
+            if settings.WALLET_LEDGER_ENABLED:
+                wallets = await LedgerService(self.session).get_balances(wallet_ids)
+                actual = {wallet_id: wallet.balance for wallet_id, wallet in wallets.items()}
+            else:
+                result = await self.session.execute(
+                    select(Wallet.uuid, Wallet.balance).where(Wallet.uuid.in_(wallet_ids))
+                )
+                actual = {row.uuid: row.balance for row in result}
+
+        mismatches = []
+        for number, expected in batch:
+            balance = actual.get(expected.wallet_id)
+            if balance is None:
+                detail = "Wallet not found"
+            elif balance != expected.balance:
+                detail = "Balance mismatch"
+            else:
+                continue
+            mismatches.append(ReconcileMismatch(
+                line=number,
+                wallet_id=expected.wallet_id,
+                expected=expected.balance,
+                actual=balance,
+                detail=detail,
+            ))
+        logger.debug("Reconciled %s wallets, %s mismatches", len(batch), len(mismatches))
+        return mismatches
+
+    async def _balances(self, rows: Sequence[Row]) -> list[Wallet]:
+        """
+        Build wallets from (uuid, balance) rows, balances are materialized in ledger mode
+        Args:
+            rows (Sequence[Row]): Rows read from the wallets table
+        """
+        if settings.WALLET_LEDGER_ENABLED:
+            materialized = await LedgerService(self.session).get_balances([row.uuid for row in rows])
+            return [materialized[row.uuid] for row in rows if row.uuid in materialized]
+        return [Wallet(uuid=row.uuid, balance=row.balance) for row in rows]
@@ -0,0 +1,139 @@
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import IdempotencyKey, Wallet
+from app.exceptions import IdempotencyKeyMismatchException
+from app.schemas.wallet_schemas import OperationModel
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class IdempotencyRecord:
+    """
+    Stored outcome of an operation, enough to replay the original response
+    """
+    wallet_id: UUID
+    operation_type: str
+    amount: Decimal
+    target_wallet_id: UUID | None
+    balance: Decimal
+
+
+idempotency_cache: TTLCache[str, IdempotencyRecord] = TTLCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl=settings.IDEMPOTENCY_CACHE_TTL_SECONDS,
+)
+
+
+class IdempotencyStore:
+    """
+    Idempotency keys persisted in the idempotency_keys table with an in-memory cache in front
+        A replay served from the cache costs no database round trip, one served
+        from the table costs a primary key lookup, neither takes the wallet row lock.
+    Attributes:
+        session AsyncSession: Asynchronous SQLAlchemy session for database operations.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def replay(self, key: str, wallet_id: UUID, operation: OperationModel) -> Wallet | None:
+        """
+        Return the result stored under the key, if the operation was already committed
+        Args:
+            key (str): Idempotency key sent by the client
+            wallet_id (UUID): UUID of the wallet of the current request
+            operation (OperationModel): Operation of the current request
+        Returns:
+            Wallet | None: Transient wallet with the original balance, None for a new key
+        Raises:
+            IdempotencyKeyMismatchException: The key was used for a different request
+        """
+        record = idempotency_cache.get(key)
+        if record is None:
+            result = await self.session.execute(
+                select(
+                    IdempotencyKey.wallet_uuid,
+                    IdempotencyKey.operation_type,
+                    IdempotencyKey.amount,
+                    IdempotencyKey.target_wallet_uuid,
+                    IdempotencyKey.balance,
+                ).where(IdempotencyKey.key == key)
+            )
+            row = result.one_or_none()
+            # Release the connection, the operation itself opens its own transaction
+            await self.session.rollback()
+            if row is None:
+                return None
+            record = IdempotencyRecord(
+                wallet_id=row.wallet_uuid,
+                operation_type=row.operation_type,
+                amount=row.amount,
+                target_wallet_id=row.target_wallet_uuid,
+                balance=row.balance,
+            )
+            idempotency_cache.set(key, record)
+
+        if (
+            record.wallet_id != wallet_id
+            or record.operation_type != operation.operation_type.value
+            or record.amount != operation.amount
+            or record.target_wallet_id != operation.target_wallet_id
+        ):
+            logger.warning("Idempotency key %s reused with a different request", key)
+            raise IdempotencyKeyMismatchException()
+
+        logger.debug("Replaying operation stored under idempotency key %s", key)
+        return Wallet(uuid=record.wallet_id, balance=record.balance)
+
+    async def remember(self, key: str, operation: OperationModel, wallet: Wallet) -> bool:
+        """
+        Store the result of an operation, must run in the transaction of the balance change
+        Args:
+            key (str): Idempotency key sent by the client
+            operation (OperationModel): Applied operation
+            wallet (Wallet): Wallet after the operation
+        Returns:
+            bool: False when a concurrent request already committed the same key,
+                the caller must roll back and replay instead
+        """
+        stored = await self.session.scalar(
+            pg_insert(IdempotencyKey)
+            .values(
+                key=key,
+                wallet_uuid=wallet.uuid,
+                operation_type=operation.operation_type.value,
+                amount=operation.amount,
+                target_wallet_uuid=operation.target_wallet_id,
+                balance=wallet.balance,
+            )
+            .on_conflict_do_nothing(index_elements=["key"])
+            .returning(IdempotencyKey.key)
+        )
+        return stored is not None
+
+    @staticmethod
+    def cache(key: str, operation: OperationModel, wallet: Wallet) -> None:
+        """
+        Cache the result after the transaction was committed
+        Args:
+            key (str): Idempotency key sent by the client
+            operation (OperationModel): Applied operation
+            wallet (Wallet): Wallet after the operation
+        """
+        idempotency_cache.set(key, IdempotencyRecord(
+            wallet_id=wallet.uuid,
+            operation_type=operation.operation_type.value,
+            amount=operation.amount,
+            target_wallet_id=operation.target_wallet_id,
+            balance=wallet.balance,
+        ))
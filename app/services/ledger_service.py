@@ -0,0 +1,408 @@
+import asyncio
+import logging
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import func, insert, select, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.db.models import Wallet, WalletSnapshot, WalletTransaction
+from app.db.session import AsyncSessionLocal
+from app.exceptions import OperationExecutionException, WalletNotFoundException
+from app.schemas.wallet_schemas import BatchOperationItem, OperationModel, OperationType
+from app.services.strategies.base import OperationStrategyAbstract
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerService:
+    """
+    Service for the append-only wallet ledger
+        Deposits are written as insert-only ledger entries and only take FOR KEY SHARE on
+        the wallet row, which doesn't conflict with other deposits or withdrawals.
+        Withdrawals lock the row (FOR NO KEY UPDATE) and are validated against the
+        materialized balance. Balances are the latest snapshot plus the sum of newer entries,
+        wallets without a snapshot start from their `wallets.balance` value.
+        Snapshots are written by the LedgerSnapshotter, writes only schedule their wallet.
+    Attributes:
+        session AsyncSession: Asynchronous SQLAlchemy session for database operations.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_balance(self, wallet_id: UUID) -> Wallet:
+        """
+        Materialize the balance of a wallet in one round trip
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        Returns:
+            Wallet: Transient wallet object holding the materialized balance
+        """
+        wallet, _, _ = await self._materialize(wallet_id)
+        return wallet
+
+    async def get_balances(self, wallet_ids: list[UUID]) -> dict[UUID, Wallet]:
+        """
+        Materialize the balances of several wallets in one round trip
+        Args:
+            wallet_ids (list[UUID]): UUIDs of the wallets
+        Returns:
+            dict: Transient wallet objects keyed by uuid, missing wallets are absent
+        """
+        materialized = await self._materialize_many(wallet_ids)
+        return {wallet_id: wallet for wallet_id, (wallet, _, _) in materialized.items()}
+
+    async def apply(
+            self, wallet_id: UUID, operation: OperationModel, strategy: OperationStrategyAbstract
+    ) -> Wallet:
+        """
+        Append a ledger entry for the operation, must run inside a transaction
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            operation (OperationModel): Operation model containing type and amount
+            strategy (OperationStrategyAbstract): Strategy validating the operation
+        Returns:
+            Wallet: Transient wallet object holding the balance after the operation
+        """
+        withdraw = operation.operation_type is OperationType.WITHDRAW
+        # Every writer holds a row lock from before its entry id is assigned until commit,
+        # snapshot relies on it to never skip an uncommitted entry
+        locked = await self.session.scalar(
+            select(Wallet.uuid)
+            .where(Wallet.uuid == wallet_id)
+            .with_for_update(key_share=True, read=not withdraw)
+        )
+        if locked is None:
+            raise WalletNotFoundException()
+        if withdraw:
+            wallet, _, _ = await self._materialize(wallet_id)
+        else:
+            # Deposits don't depend on the current balance, only the amount is validated
+            wallet = Wallet(uuid=wallet_id, balance=Decimal(0), version=0)
+
+        before = wallet.balance
+        try:
+            strategy.execute(wallet, operation.amount)
+        except ValueError as exp:
+            logger.error("Operation execution failed %s", exp)
+            raise OperationExecutionException(detail=str(exp))
+
+        if not withdraw:
+            return await self._append_deposit(wallet_id, operation.operation_type, wallet.balance - before)
+
+        # The locked wallet can't be deleted meanwhile, so the foreign key always holds
+        await self.session.execute(
+            insert(WalletTransaction).values(
+                wallet_uuid=wallet_id,
+                operation_type=operation.operation_type.value,
+                amount=wallet.balance - before,
+            )
+        )
+
+        wallet, entries, _ = await self._materialize(wallet_id)
+        if entries >= settings.LEDGER_SNAPSHOT_INTERVAL:
+            ledger_snapshotter.schedule(wallet_id)
+        return wallet
+
+    async def transfer(
+            self, wallet_id: UUID, operation: OperationModel, strategy: OperationStrategyAbstract
+    ) -> list[Wallet]:
+        """
+        Append the debit and credit entries of a transfer, must run inside a transaction
+        Both wallets are locked in uuid order, so opposite transfers can't deadlock.
+        Args:
+            wallet_id (UUID): UUID of the debited wallet
+            operation (OperationModel): Transfer operation with the target wallet and amount
+            strategy (OperationStrategyAbstract): Strategy validating the operation
+        Returns:
+            list: Transient debited and credited wallets holding the balances after the operation
+        """
+        target_id = operation.target_wallet_id
+        if target_id is None:
+            # OperationModel rejects such transfers, only a model built without validation gets here
+            raise OperationExecutionException(detail="target_wallet_id is required for TRANSFER")
+        wallets = await self.lock_balances([wallet_id, target_id])
+        if wallet_id not in wallets or target_id not in wallets:
+            logger.warning("Wallet with %s not found", wallet_id if wallet_id not in wallets else target_id)
+            raise WalletNotFoundException()
+
+        try:
+            strategy.execute(wallets[wallet_id], operation.amount, wallets[target_id])
+        except ValueError as exp:
+            logger.error("Operation execution failed %s", exp)
+            raise OperationExecutionException(detail=str(exp))
+
+        await self.session.execute(
+            insert(WalletTransaction),
+            [
+                {"wallet_uuid": wallet_id, "operation_type": operation.operation_type.value, "amount": -operation.amount},
+                {"wallet_uuid": target_id, "operation_type": operation.operation_type.value, "amount": operation.amount},
+            ],
+        )
+
+        materialized = await self._materialize_many([wallet_id, target_id])
+        for changed_id, (_, entries, _) in materialized.items():
+            if entries >= settings.LEDGER_SNAPSHOT_INTERVAL:
+                ledger_snapshotter.schedule(changed_id)
+        return [materialized[wallet_id][0], materialized[target_id][0]]
+
+    async def lock_balances(self, wallet_ids: list[UUID]) -> dict[UUID, Wallet]:
+        """
+        Lock several wallets in uuid order and materialize their balances
+        Used by batches, missing wallets are simply absent from the result.
+        Args:
+            wallet_ids (list[UUID]): UUIDs of the wallets
+        Returns:
+            dict: Transient wallet objects keyed by uuid
+        """
+        await self.session.execute(
+            select(Wallet.uuid)
+            .where(Wallet.uuid.in_(wallet_ids))
+            .order_by(Wallet.uuid)
+            .with_for_update(key_share=True)
+        )
+        return await self.get_balances(wallet_ids)
+
+    async def append_batch(self, items: list[BatchOperationItem]) -> None:
+        """
+        Append ledger entries for already validated batch operations with one multi-row INSERT
+        Args:
+            items (list[BatchOperationItem]): Operations in request order
+        """
+        entries = []
+        for item in items:
+            if item.operation_type is OperationType.TRANSFER:
+                # A transfer is one debit and one credit entry
+                entries.append({"wallet_uuid": item.wallet_id, "operation_type": "TRANSFER", "amount": -item.amount})
+                entries.append({"wallet_uuid": item.target_wallet_id, "operation_type": "TRANSFER", "amount": item.amount})
+            else:
+                entries.append({
+                    "wallet_uuid": item.wallet_id,
+                    "operation_type": item.operation_type.value,
+                    "amount": -item.amount if item.operation_type is OperationType.WITHDRAW else item.amount,
+                })
+        if not entries:
+            return
+        await self.session.execute(insert(WalletTransaction), entries)
+
+    async def snapshot(self, wallet_id: UUID) -> bool:
+        """
+        Persist a balance snapshot when the wallet has LEDGER_SNAPSHOT_INTERVAL entries
+        or more after the last one and no other transaction is writing to it
+        Entry ids are assigned before commit, so an in-flight writer may own an id lower
+        than the last visible one. Every writer locks the wallet row (deposits FOR KEY SHARE,
+        withdrawals and transfers FOR NO KEY UPDATE) before its entry id is assigned and
+        keeps the lock until commit, so taking FOR UPDATE guarantees none is in flight and
+        a writer arriving later gets a higher id. The foreign key check alone isn't enough,
+        it only locks the row after the id was assigned. SKIP LOCKED never makes a writer
+        wait, a busy wallet is reported and retried later.
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        Returns:
+            bool: False when the wallet is busy and the snapshot must be retried
+        """
+        locked = await self.session.scalar(
+            select(Wallet.uuid)
+            .where(Wallet.uuid == wallet_id)
+            .with_for_update(skip_locked=True)
+        )
+        if locked is None:
+            return False
+
+        wallet, entries, last_id = await self._materialize(wallet_id)
+        if entries < settings.LEDGER_SNAPSHOT_INTERVAL:
+            return True
+        logger.debug("Writing snapshot of wallet %s at entry %s", wallet_id, last_id)
+        await self.session.execute(
+            pg_insert(WalletSnapshot)
+            .values(wallet_uuid=wallet_id, transaction_id=last_id, balance=wallet.balance)
+            .on_conflict_do_nothing(index_elements=["wallet_uuid", "transaction_id"])
+        )
+        return True
+
+    async def _append_deposit(self, wallet_id: UUID, operation_type: OperationType, amount: Decimal) -> Wallet:
+        """
+        Append a deposit entry and read the balance including it in the same statement
+        Subqueries of RETURNING don't see the inserted row, its amount is added to their sum.
+        Entry ids come from one sequence shared by all wallets, so the distance between the
+        new id and the last snapshot bounds the number of newer entries from above. Once it
+        reaches LEDGER_SNAPSHOT_INTERVAL the wallet is scheduled, the snapshotter counts exactly.
+        Args:
+            wallet_id (UUID): UUID of the locked wallet
+            operation_type (OperationType): Type of the operation
+            amount (Decimal): Validated amount of the deposit
+        Returns:
+            Wallet: Transient wallet object holding the balance after the deposit
+        """
+        # Aliased, so the subqueries don't correlate with the inserted table
+        entry = aliased(WalletTransaction)
+        latest = (
+            select(WalletSnapshot.transaction_id, WalletSnapshot.balance)
+            .where(WalletSnapshot.wallet_uuid == wallet_id)
+            .order_by(WalletSnapshot.transaction_id.desc())
+            .limit(1)
+            .subquery()
+        )
+        snapshot_id = select(latest.c.transaction_id).scalar_subquery()
+        base = func.coalesce(
+            select(latest.c.balance).scalar_subquery(),
+            select(Wallet.balance).where(Wallet.uuid == wallet_id).scalar_subquery(),
+        )
+        tail = (
+            select(func.coalesce(func.sum(entry.amount), 0))
+            .where(entry.wallet_uuid == wallet_id, entry.id > func.coalesce(snapshot_id, 0))
+            .scalar_subquery()
+        )
+        # The locked wallet can't be deleted meanwhile, so the foreign key always holds
+        row = (await self.session.execute(
+            insert(WalletTransaction)
+            .values(wallet_uuid=wallet_id, operation_type=operation_type.value, amount=amount)
+            .returning(
+                WalletTransaction.id,
+                snapshot_id.label("snapshot_id"),
+                (base + tail + WalletTransaction.amount).label("balance"),
+            )
+        )).one()
+
+        if row.id - (row.snapshot_id or 0) >= settings.LEDGER_SNAPSHOT_INTERVAL:
+            ledger_snapshotter.schedule(wallet_id)
+        return Wallet(uuid=wallet_id, balance=row.balance, version=row.id)
+
+    async def _materialize(self, wallet_id: UUID) -> tuple[Wallet, int, int | None]:
+        """
+        Read the latest snapshot and the sum of newer ledger entries
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        Returns:
+            tuple: Transient wallet with the balance, number of entries
+                newer than the snapshot and the id of the last entry
+        """
+        materialized = await self._materialize_many([wallet_id])
+        if wallet_id not in materialized:
+            logger.warning("Wallet with %s not found", wallet_id)
+            raise WalletNotFoundException()
+        return materialized[wallet_id]
+
+    async def _materialize_many(self, wallet_ids: list[UUID]) -> dict[UUID, tuple[Wallet, int, int | None]]:
+        """
+        Materialize balances of several wallets in one round trip
+        Args:
+            wallet_ids (list[UUID]): UUIDs of the wallets
+        Returns:
+            dict: Same tuples as _materialize keyed by uuid
+        """
+        snapshot = (
+            select(WalletSnapshot.balance, WalletSnapshot.transaction_id)
+            .where(WalletSnapshot.wallet_uuid == Wallet.uuid)
+            .order_by(WalletSnapshot.transaction_id.desc())
+            .limit(1)
+            .lateral("snapshot")
+        )
+        tail = (
+            select(
+                func.coalesce(func.sum(WalletTransaction.amount), 0).label("amount"),
+                func.count().label("entries"),
+                func.max(WalletTransaction.id).label("last_id"),
+            )
+            .where(
+                WalletTransaction.wallet_uuid == Wallet.uuid,
+                WalletTransaction.id > func.coalesce(snapshot.c.transaction_id, 0),
+            )
+            .lateral("tail")
+        )
+        result = await self.session.execute(
+            select(
+                Wallet.uuid,
+                Wallet.balance,
+                snapshot.c.balance.label("snapshot_balance"),
+                snapshot.c.transaction_id.label("snapshot_transaction_id"),
+                tail.c.amount,
+                tail.c.entries,
+                tail.c.last_id,
+            )
+            .select_from(Wallet)
+            .outerjoin(snapshot, true())
+            .join(tail, true())
+            .where(Wallet.uuid.in_(wallet_ids))
+        )
+
+        materialized = {}
+        for row in result:
+            base = row.balance if row.snapshot_balance is None else row.snapshot_balance
+            # The last ledger entry included in the balance doubles as the wallet version
+            version = row.last_id or row.snapshot_transaction_id or 0
+            materialized[row.uuid] = (
+                Wallet(uuid=row.uuid, balance=base + row.amount, version=version),
+                row.entries,
+                row.last_id,
+            )
+        return materialized
+
+
+class LedgerSnapshotter:
+    """
+    Background task writing the snapshots of the wallets scheduled by ledger writes
+        A snapshot needs the wallet row to itself (see LedgerService.snapshot), which a hot
+        wallet almost never is at the end of one of its own writes. Writers only schedule
+        the wallet, the snapshotter tries every scheduled wallet in its own transaction and
+        keeps the busy ones for the next pass, retry_seconds later. Scheduled wallets are
+        kept per process, a wallet dropped on shutdown is scheduled again by its next write.
+    Attributes:
+        _session_factory (async_sessionmaker): Factory for the snapshot sessions
+        _retry_seconds (float): Delay between passes over the scheduled wallets
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], retry_seconds: float) -> None:
+        self._session_factory = session_factory
+        self._retry_seconds = retry_seconds
+        self._pending: set[UUID] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    def schedule(self, wallet_id: UUID) -> None:
+        """Schedule a snapshot of the wallet, scheduling it again before the next pass is free."""
+        self._pending.add(wallet_id)
+
+    def start(self) -> None:
+        """Start the snapshot loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the snapshot loop, a snapshot being written is rolled back."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self) -> int:
+        """
+        Try to snapshot every scheduled wallet, the busy ones stay scheduled
+        Returns:
+            int: Number of wallets still scheduled
+        """
+        pending, self._pending = self._pending, set()
+        for wallet_id in pending:
+            try:
+                async with self._session_factory() as session, session.begin():
+                    done = await LedgerService(session).snapshot(wallet_id)
+            except Exception as exp:
+                logger.warning("Snapshot of wallet %s failed, retrying in %ss: %s", wallet_id, self._retry_seconds, exp)
+                done = False
+            if not done:
+                self._pending.add(wallet_id)
+        return len(self._pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._retry_seconds)
+            await self.run_once()
+
+
+ledger_snapshotter = LedgerSnapshotter(AsyncSessionLocal, retry_seconds=settings.LEDGER_SNAPSHOT_RETRY_SECONDS)
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.models import OutboxEntry, Wallet
+from app.db.session import AsyncSessionLocal
+from app.schemas.wallet_schemas import OperationType
+from app.services.wallet_metrics import OUTBOX_DELIVERED_TOTAL, OUTBOX_FAILURES_TOTAL
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DELIVERED = OUTBOX_DELIVERED_TOTAL.labels()
+OUTBOX_FAILURES = OUTBOX_FAILURES_TOTAL.labels()
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxMessage:
+    """
+    Committed balance change handed to the sinks
+    """
+    id: int
+    wallet_id: UUID
+    operation_type: str
+    amount: Decimal
+    balance: Decimal
+    created_at: datetime
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "id": self.id,
+            "wallet_id": str(self.wallet_id),
+            "operation_type": self.operation_type,
+            "amount": str(self.amount),
+            "balance": str(self.balance),
+            "created_at": self.created_at.isoformat(),
+        })
+
+
+def balance_changes(operation_type: OperationType, amount: Decimal, wallets: Sequence[Wallet]) -> list[dict]:
+    """
+    Build the outbox rows of one operation
+    Args:
+        operation_type (OperationType): Type of the operation
+        amount (Decimal): Amount of the operation
+        wallets (Sequence[Wallet]): Changed wallet, or debited and credited wallets of a transfer,
+            with their balances right after the operation
+    Returns:
+        list: Values for OutboxEntry rows
+    """
+    changes: tuple[tuple[Wallet, Decimal], ...]
+    if operation_type is OperationType.TRANSFER:
+        source, target = wallets
+        changes = ((source, -amount), (target, amount))
+    else:
+        changes = ((wallets[0], -amount if operation_type is OperationType.WITHDRAW else amount),)
+    return [
+        {
+            "wallet_uuid": wallet.uuid,
+            "operation_type": operation_type.value,
+            "amount": change,
+            "balance": wallet.balance,
+        }
+        for wallet, change in changes
+    ]
+
+
+async def write_outbox(session: AsyncSession, rows: Iterable[dict]) -> None:
+    """
+    Insert outbox rows with one multi-row INSERT, must run inside the write transaction
+    Args:
+        session (AsyncSession): Session of the write transaction
+        rows (Iterable[dict]): Rows built by balance_changes
+    """
+    if not settings.OUTBOX_ENABLED:
+        return
+    rows = list(rows)
+    if rows:
+        await session.execute(insert(OutboxEntry), rows)
+
+
+class OutboxSink(ABC):
+    """
+    Destination of outbox messages
+    Delivery is at least once and unordered, a batch is retried as a whole when any sink
+    raises, so sinks must tolerate messages they have already seen (deduplicate by id).
+    Entries of a wallet may arrive out of order, since a failed batch is retried after
+    later entries, and concurrent dispatchers deliver their batches independently.
+    Order them by id, or use the balance of the highest id seen.
+    """
+
+    @abstractmethod
+    async def deliver(self, messages: list[OutboxMessage]) -> None:
+        """
+        Deliver a batch of messages, raise to have the batch retried later
+        Args:
+            messages (list[OutboxMessage]): Messages sorted by id within the batch
+        """
+
+
+class MemorySink(OutboxSink):
+    """
+    Keeps delivered messages in a list, for tests
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[OutboxMessage] = []
+
+    async def deliver(self, messages: list[OutboxMessage]) -> None:
+        self.messages.extend(messages)
+
+
+class FileSink(OutboxSink):
+    """
+    Appends delivered messages to a local NDJSON file
+    Attributes:
+        path (str): File the messages are appended to
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    async def deliver(self, messages: list[OutboxMessage]) -> None:
+        lines = "".join(message.to_json() + "\n" for message in messages)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+def configured_sinks() -> list[OutboxSink]:
+    """
+    Build the sinks named in OUTBOX_SINKS
+    Raises:
+        ValueError: On an unknown sink name
+    """
+    sinks: list[OutboxSink] = []
+    for name in settings.OUTBOX_SINKS:
+        if name == "file":
+            sinks.append(FileSink(settings.OUTBOX_FILE_PATH))
+        elif name == "memory":
+            sinks.append(MemorySink())
+        else:
+            raise ValueError(f"Unknown outbox sink {name!r}")
+    return sinks
+
+
+class OutboxDispatcher:
+    """
+    Background task delivering outbox entries to the sinks
+        Entries are claimed oldest first with FOR UPDATE SKIP LOCKED, so dispatchers of
+        several workers split the backlog instead of waiting on each other. The claim
+        commits right away and leases the entries for delivery_timeout, sinks are called
+        without holding row locks or a transaction. Delivered entries are deleted, a failed
+        or timed out batch is kept and retried after retry_seconds, and a batch whose
+        dispatcher died is retried once its lease expires. Delivery is at least once and
+        unordered across batches, see OutboxSink.
+    Attributes:
+        _session_factory (async_sessionmaker): Factory for the dispatcher sessions
+        _sinks (Sequence[OutboxSink]): Destinations of every message
+        _batch_size (int): Entries claimed per transaction
+        _poll_interval (float): Seconds to wait when the backlog is drained
+        _retry_seconds (float): Delay before a failed batch is retried
+        _delivery_timeout (float): Seconds a batch is leased and its delivery may take
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            sinks: Sequence[OutboxSink],
+            batch_size: int,
+            poll_interval: float,
+            retry_seconds: float,
+            delivery_timeout: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._sinks = sinks
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._retry_seconds = retry_seconds
+        self._delivery_timeout = delivery_timeout
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the dispatch loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the dispatch loop, a batch being delivered is retried once its lease expires."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def dispatch_batch(self) -> int:
+        """
+        Claim, deliver and delete one batch of entries
+        Returns:
+            int: Number of delivered entries
+        """
+        claimed = (
+            select(OutboxEntry.id)
+            .where(OutboxEntry.available_at <= func.now())
+            .order_by(OutboxEntry.id)
+            .limit(self._batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self._session_factory() as session, session.begin():
+            result = await session.execute(
+                update(OutboxEntry)
+                .where(OutboxEntry.id.in_(claimed))
+                .values(available_at=func.now() + timedelta(seconds=self._delivery_timeout))
+                .returning(
+                    OutboxEntry.id,
+                    OutboxEntry.wallet_uuid,
+                    OutboxEntry.operation_type,
+                    OutboxEntry.amount,
+                    OutboxEntry.balance,
+                    OutboxEntry.created_at,
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            # RETURNING doesn't keep the order of the claim
+            entries = sorted(result, key=lambda entry: entry.id)
+        if not entries:
+            return 0
+
+        ids = [entry.id for entry in entries]
+        messages = [
+            OutboxMessage(
+                id=entry.id,
+                wallet_id=entry.wallet_uuid,
+                operation_type=entry.operation_type,
+                amount=entry.amount,
+                balance=entry.balance,
+                created_at=entry.created_at,
+            )
+            for entry in entries
+        ]
+        try:
+            await asyncio.wait_for(self._deliver(messages), self._delivery_timeout)
+        except Exception as exp:
+            OUTBOX_FAILURES.inc()
+            logger.error(
+                "Outbox delivery of %s entries failed, retrying in %ss: %r", len(ids), self._retry_seconds, exp
+            )
+            async with self._session_factory() as session, session.begin():
+                await session.execute(
+                    update(OutboxEntry)
+                    .where(OutboxEntry.id.in_(ids))
+                    .values(
+                        attempts=OutboxEntry.attempts + 1,
+                        available_at=func.now() + timedelta(seconds=self._retry_seconds),
+                    ),
+                    execution_options={"synchronize_session": False},
+                )
+            return 0
+
+        async with self._session_factory() as session, session.begin():
+            await session.execute(
+                delete(OutboxEntry).where(OutboxEntry.id.in_(ids)),
+                execution_options={"synchronize_session": False},
+            )
+        OUTBOX_DELIVERED.inc(len(ids))
+        logger.debug("Delivered %s outbox entries", len(ids))
+        return len(ids)
+
+    async def _deliver(self, messages: list[OutboxMessage]) -> None:
+        for sink in self._sinks:
+            await sink.deliver(messages)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delivered = await self.dispatch_batch()
+            except Exception as exp:
+                logger.warning("Outbox dispatch failed, retrying in %ss: %s", self._poll_interval, exp)
+                delivered = 0
+            # A full batch means there's more backlog, keep draining without waiting
+            if delivered < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+
+outbox_dispatcher = OutboxDispatcher(
+    AsyncSessionLocal,
+    sinks=configured_sinks(),
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+    retry_seconds=settings.OUTBOX_RETRY_SECONDS,
+    delivery_timeout=settings.OUTBOX_DELIVERY_TIMEOUT_SECONDS,
+)
@@ -1,7 +1,10 @@
 from decimal import Decimal
+from uuid import UUID
 
 from abc import ABC, abstractmethod
 
+from sqlalchemy import Update
+
 from app.db.models import Wallet
 
 
@@ -10,15 +13,35 @@ class OperationStrategyAbstract(ABC):
     Abstract base class for operation strategies on a Wallet.
 
     Subclasses must implement the execute method to define
-    specific operations involving a Wallet and an amount.
+    specific operations involving a Wallet and an amount,
+    and the statement method which compiles the same operation
+    into a single conditional UPDATE ... RETURNING statement.
+    Operations moving funds between wallets also receive the target wallet,
+    the others ignore it.
     """
     @abstractmethod
-    def execute(self, wallet: Wallet, amount: Decimal) -> None:
+    def execute(self, wallet: Wallet, amount: Decimal, target: Wallet | None = None) -> None:
         """
         Execute the operation on the given wallet with the specified amount.
         Args:
             wallet (Wallet): The wallet instance on which the operation is performed.
             amount (float): The amount involved in the operation.
+            target (Wallet | None): The wallet instance credited by the operation, if any.
+        Raises:
+            NotImplementedError: If the subclass does not implement this method.
+        """
+        pass
+
+    @abstractmethod
+    def statement(self, wallet_id: UUID, amount: Decimal, target_wallet_id: UUID | None = None) -> Update:
+        """
+        Build an atomic UPDATE statement applying the operation in the database.
+        The statement returns the updated wallet, or no rows when the wallet
+        does not exist or the operation condition is not satisfied.
+        Args:
+            wallet_id (UUID): UUID of the wallet on which the operation is performed.
+            amount (Decimal): The amount involved in the operation.
+            target_wallet_id (UUID | None): UUID of the wallet credited by the operation, if any.
         Raises:
             NotImplementedError: If the subclass does not implement this method.
         """
@@ -1,4 +1,8 @@
 from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import Update, update
+
 from app.db.models import Wallet
 from app.services.strategies.base import OperationStrategyAbstract
 
@@ -7,13 +11,32 @@ class DepositStrategy(OperationStrategyAbstract):
     """
     Strategy for handling operation deposit on a wallet
     """
-    def execute(self, wallet: Wallet, amount: Decimal) -> None:
+    def execute(self, wallet: Wallet, amount: Decimal, target: Wallet | None = None) -> None:
         """
         Execute a deposit on the given wallet with the specified amount.
         Args:
             wallet (Wallet): The wallet instance on which the operation is performed.
             amount (float): The amount involved in the operation.
+            target (Wallet | None): Unused, a deposit involves a single wallet.
         """
         if amount < 1:
             raise ValueError("Amount must be greater than zero")
         wallet.deposit(amount=amount)
+
+    def statement(self, wallet_id: UUID, amount: Decimal, target_wallet_id: UUID | None = None) -> Update:
+        """
+        Build UPDATE wallets SET balance = balance + :amount, version = version + 1
+        WHERE uuid = :id RETURNING *
+        Args:
+            wallet_id (UUID): UUID of the wallet on which the operation is performed.
+            amount (Decimal): The amount involved in the operation.
+            target_wallet_id (UUID | None): Unused, a deposit involves a single wallet.
+        """
+        if amount < 1:
+            raise ValueError("Amount must be greater than zero")
+        return (
+            update(Wallet)
+            .where(Wallet.uuid == wallet_id)
+            .values(balance=Wallet.balance + amount, version=Wallet.version + 1)
+            .returning(Wallet)
+        )
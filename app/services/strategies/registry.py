@@ -0,0 +1,15 @@
+from types import MappingProxyType
+from typing import Mapping
+
+from app.schemas.wallet_schemas import OperationType
+from app.services.strategies.base import OperationStrategyAbstract
+from app.services.strategies.deposit import DepositStrategy
+from app.services.strategies.transfer import TransferStrategy
+from app.services.strategies.withdraw import WithDrawStrategy
+
+# Strategies are stateless, one read-only instance per operation type is shared by all requests
+STRATEGIES: Mapping[OperationType, OperationStrategyAbstract] = MappingProxyType({
+    OperationType.DEPOSIT: DepositStrategy(),
+    OperationType.WITHDRAW: WithDrawStrategy(),
+    OperationType.TRANSFER: TransferStrategy(),
+})
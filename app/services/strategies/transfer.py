@@ -0,0 +1,78 @@
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import Update, case, func, select, update
+
+from app.db.models import Wallet
+from app.services.strategies.base import OperationStrategyAbstract
+
+
+class TransferStrategy(OperationStrategyAbstract):
+    """
+    Strategy for handling transfer operation from one wallet to another
+    Both wallets are always locked in canonical uuid order, so concurrent
+    transfers in opposite directions can't deadlock.
+    """
+    def execute(self, wallet: Wallet, amount: Decimal, target: Wallet | None = None) -> None:
+        """
+        Execute transfer from the given wallet to the target wallet with the specified amount.
+        Args:
+            wallet (Wallet): The wallet instance debited by the operation.
+            amount (float): The amount involved in the operation.
+            target (Wallet | None): The wallet instance credited by the operation.
+        """
+        if target is None:
+            raise ValueError("Transfer target wallet is required")
+        self._validate(wallet.uuid, amount, target.uuid)
+        wallet.withdraw(amount=amount)
+        target.deposit(amount=amount)
+
+    def statement(self, wallet_id: UUID, amount: Decimal, target_wallet_id: UUID | None = None) -> Update:
+        """
+        Build a single statement locking both wallets in uuid order and moving the amount
+            WITH locked AS (SELECT uuid, balance FROM wallets WHERE uuid IN (:id, :target)
+                            ORDER BY uuid FOR UPDATE)
+            UPDATE wallets SET balance = balance -/+ :amount, version = version + 1 FROM locked
+            WHERE wallets.uuid = locked.uuid AND both wallets are locked
+            AND the debited wallet has balance >= :amount RETURNING *
+        Both rows are returned on success, none when a wallet does not exist
+        or funds are insufficient.
+        Args:
+            wallet_id (UUID): UUID of the wallet debited by the operation.
+            amount (Decimal): The amount involved in the operation.
+            target_wallet_id (UUID | None): UUID of the wallet credited by the operation.
+        """
+        self._validate(wallet_id, amount, target_wallet_id)
+        locked = (
+            select(Wallet.uuid, Wallet.balance)
+            .where(Wallet.uuid.in_([wallet_id, target_wallet_id]))
+            .order_by(Wallet.uuid)
+            .with_for_update()
+            .cte("locked")
+            .prefix_with("MATERIALIZED")
+        )
+        found = select(func.count()).select_from(locked).correlate(None).scalar_subquery()
+        funded = (
+            select(locked.c.uuid)
+            .where(locked.c.uuid == wallet_id, locked.c.balance >= amount)
+            .correlate(None)
+            .exists()
+        )
+        return (
+            update(Wallet)
+            .where(Wallet.uuid.in_([wallet_id, target_wallet_id]), Wallet.uuid == locked.c.uuid, found == 2, funded)
+            .values(
+                balance=Wallet.balance + case((Wallet.uuid == wallet_id, -amount), else_=amount),
+                version=Wallet.version + 1,
+            )
+            .returning(Wallet)
+        )
+
+    @staticmethod
+    def _validate(wallet_id: UUID, amount: Decimal, target_wallet_id: UUID | None) -> None:
+        if amount < 1:
+            raise ValueError("Amount must be greater than zero")
+        if target_wallet_id is None:
+            raise ValueError("Transfer target wallet is required")
+        if target_wallet_id == wallet_id:
+            raise ValueError("Cannot transfer to the same wallet")
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import AsyncIterator, Iterable
+from uuid import UUID
+
+import asyncpg  # type: ignore[import-untyped]
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import Wallet
+from app.exceptions import ServiceBusyException
+from app.metrics import CallbackGauge
+from app.services.wallet_metrics import EVENTS_DROPPED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DROPPED = EVENTS_DROPPED_TOTAL.labels()
+
+# One NOTIFY per written wallet, sent in a single round trip
+NOTIFY_STATEMENT = text(
+    "SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BalanceEvent:
+    """
+    Balance of a wallet as of a committed transaction
+    """
+    wallet_id: UUID
+    balance: Decimal
+    version: int
+
+    def encode(self) -> str:
+        return f"{self.wallet_id} {self.balance} {self.version}"
+
+    @classmethod
+    def decode(cls, payload: str) -> "BalanceEvent":
+        wallet_id, balance, version = payload.split(" ")
+        return cls(wallet_id=UUID(wallet_id), balance=Decimal(balance), version=int(version))
+
+
+async def notify_balances(session: AsyncSession, wallets: Iterable[Wallet]) -> None:
+    """
+    Queue balance events for the written wallets, must run inside the write transaction
+    Postgres delivers notifications on commit only and drops them on rollback,
+    so listeners never see a balance that wasn't committed.
+    Args:
+        session (AsyncSession): Session of the write transaction
+        wallets (Iterable[Wallet]): Wallets as of this transaction
+    """
+    if not settings.WALLET_EVENTS_ENABLED:
+        return
+    payloads = [
+        BalanceEvent(wallet_id=wallet.uuid, balance=wallet.balance, version=wallet.version).encode()
+        for wallet in wallets
+    ]
+    if payloads:
+        await session.execute(NOTIFY_STATEMENT, {"channel": settings.WALLET_EVENTS_CHANNEL, "payloads": payloads})
+
+
+class WalletEventHub:
+    """
+    Fans out balance notifications of one LISTEN connection to every subscriber of the process
+        The connection is opened on the first subscription, outside of the engine pool,
+        and reopened after it's lost. Every subscriber gets a bounded queue, when a slow
+        subscriber's queue is full its oldest event is dropped, events carry the whole
+        balance so only intermediate states are lost. After a reconnect every subscriber
+        receives None, as events may have been missed meanwhile.
+        Not thread-safe, it is meant to be used from the event loop only.
+    Attributes:
+        _dsn (str): asyncpg connection string of the primary database
+        _channel (str): Notification channel
+        _buffer_size (int): Events buffered per subscriber
+        _retry_seconds (float): Delay between reconnection attempts
+    """
+
+    def __init__(self, dsn: str, channel: str, buffer_size: int, retry_seconds: float) -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._buffer_size = buffer_size
+        self._retry_seconds = retry_seconds
+        self._subscribers: dict[UUID, set[asyncio.Queue[BalanceEvent | None]]] = {}
+        self._listening = asyncio.Event()
+        self._listener: asyncio.Task[None] | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @asynccontextmanager
+    async def subscribe(self, wallet_id: UUID) -> AsyncIterator[asyncio.Queue[BalanceEvent | None]]:
+        """
+        Receive the balance events of a wallet for the duration of the block
+        Events committed after this returns are delivered, so the current balance
+        should be read inside the block.
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        Raises:
+            ServiceBusyException: When the listener can't connect in time
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._listening.wait(), settings.DB_POOL_TIMEOUT_SECONDS)
+        except TimeoutError:
+            raise ServiceBusyException(detail="Balance events are unavailable, retry later")
+
+        queue: asyncio.Queue[BalanceEvent | None] = asyncio.Queue(self._buffer_size)
+        self._subscribers.setdefault(wallet_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers[wallet_id]
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[wallet_id]
+
+    async def stop(self) -> None:
+        """Close the LISTEN connection, subscriptions stop receiving events."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        """Keep a LISTEN connection open, reconnecting until cancelled."""
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn)
+            except Exception as exp:
+                logger.warning("Balance events listener can't connect, retrying in %ss: %s", self._retry_seconds, exp)
+                await asyncio.sleep(self._retry_seconds)
+                continue
+
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(self._channel, self._dispatch)
+                if self._subscribers:
+                    # Events committed while disconnected were lost
+                    self._publish(self._subscribers, None)
+                self._listening.set()
+                await lost.wait()
+                logger.warning("Balance events listener lost its connection, reconnecting")
+            except Exception as exp:
+                logger.warning("Balance events listener failed, reconnecting: %s", exp)
+            finally:
+                self._listening.clear()
+                if not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(self._retry_seconds)
+
+    def _dispatch(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = BalanceEvent.decode(payload)
+        except ValueError:
+            logger.error("Invalid balance event %r", payload)
+            return
+        queues = self._subscribers.get(event.wallet_id)
+        if queues:
+            self._publish({event.wallet_id: queues}, event)
+
+    def _publish(self, subscribers: dict[UUID, set[asyncio.Queue]], event: BalanceEvent | None) -> None:
+        for queues in subscribers.values():
+            for queue in queues:
+                if queue.full():
+                    queue.get_nowait()
+                    EVENTS_DROPPED.inc()
+                queue.put_nowait(event)
+
+
+wallet_event_hub = WalletEventHub(
+    make_url(settings.async_database_url).set(drivername="postgresql").render_as_string(hide_password=False),
+    channel=settings.WALLET_EVENTS_CHANNEL,
+    buffer_size=settings.WALLET_EVENTS_BUFFER_SIZE,
+    retry_seconds=settings.WARMUP_RETRY_SECONDS,
+)
+
+CallbackGauge(
+    "wallet_event_subscribers",
+    "Open balance event subscriptions of the process",
+    lambda: {(): wallet_event_hub.subscribers},
+)
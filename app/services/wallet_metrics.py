@@ -0,0 +1,88 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.pool import pool_stats
+from app.db.session import async_engine, async_read_engine
+from app.metrics import CallbackGauge, Counter, Histogram
+
+OPERATION_PHASE_SECONDS = Histogram(
+    "wallet_operation_phase_seconds",
+    "Time spent in each phase of a wallet operation",
+    ("phase",),
+)
+# Bound once, the hot path only calls observe()
+LOCK_SECONDS = OPERATION_PHASE_SECONDS.labels("lock")
+# Conditional UPDATE ... RETURNING, the row lock wait can't be told apart from the update
+STATEMENT_SECONDS = OPERATION_PHASE_SECONDS.labels("statement")
+STRATEGY_SECONDS = OPERATION_PHASE_SECONDS.labels("strategy")
+COMMIT_SECONDS = OPERATION_PHASE_SECONDS.labels("commit")
+
+OPERATIONS_TOTAL = Counter(
+    "wallet_operations_total",
+    "Successfully committed wallet operations",
+    ("operation_type",),
+)
+OPERATION_ERRORS_TOTAL = Counter(
+    "wallet_operation_errors_total",
+    "Failed wallet operations by exception class",
+    ("exception",),
+)
+ADMISSION_REJECTIONS_TOTAL = Counter(
+    "wallet_admission_rejections_total",
+    "Operations shed with 429 before reaching the database",
+    ("reason",),
+)
+OPTIMISTIC_CONFLICTS_TOTAL = Counter(
+    "wallet_optimistic_conflicts_total",
+    "Optimistic writes rolled back because a wallet changed since it was read",
+)
+OUTBOX_DELIVERED_TOTAL = Counter(
+    "wallet_outbox_delivered_total",
+    "Outbox entries delivered to every sink",
+)
+OUTBOX_FAILURES_TOTAL = Counter(
+    "wallet_outbox_failures_total",
+    "Outbox batches whose delivery failed and was rescheduled",
+)
+EVENTS_DROPPED_TOTAL = Counter(
+    "wallet_events_dropped_total",
+    "Balance events dropped because a subscriber's buffer was full",
+)
+
+
+def _engines() -> dict[str, AsyncEngine]:
+    engines = {"primary": async_engine}
+    if async_read_engine is not async_engine:
+        engines["read"] = async_read_engine
+    return engines
+
+
+def _pool_connections() -> dict[tuple[str, ...], float]:
+    samples: dict[tuple[str, ...], float] = {}
+    for name, engine in _engines().items():
+        stats = pool_stats(engine.pool)
+        for state in ("size", "checked_out", "checked_in", "overflow"):
+            samples[(name, state)] = stats[state]
+    return samples
+
+
+def _pool_wait() -> dict[tuple[str, ...], float]:
+    samples: dict[tuple[str, ...], float] = {}
+    for name, engine in _engines().items():
+        stats = pool_stats(engine.pool)
+        for key in ("wait_count", "wait_seconds_total", "wait_seconds_max", "timeouts"):
+            samples[(name, key)] = stats[key]
+    return samples
+
+
+CallbackGauge(
+    "db_pool_connections",
+    "Connections of the database pool by state",
+    _pool_connections,
+    ("engine", "state"),
+)
+CallbackGauge(
+    "db_pool_checkout",
+    "Connection checkout counters of the database pool since it was created",
+    _pool_wait,
+    ("engine", "stat"),
+)
@@ -1,21 +1,83 @@
-import uuid
+import time
 import logging
 from decimal import Decimal
+from typing import AsyncIterator, Iterable, NoReturn
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Numeric, column, func, insert, literal, select, update, values
+from sqlalchemy.exc import DBAPIError, IntegrityError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
+from app.config import settings
 from app.db.models import Wallet
-from app.schemas.wallet_schemas import OperationModel
+from app.logging_config import success_sampler
+from app.schemas.wallet_schemas import (
+    BatchMode,
+    BatchOperationItem,
+    BatchOperationRequest,
+    BatchOperationResponse,
+    BatchOperationResult,
+    OperationModel,
+    OperationType,
+)
+from app.services.balance_cache import BalanceCacheBackend, CachedBalance, ConfiguredCache, balance_cache
+from app.services.idempotency import IdempotencyStore
+from app.services.concurrency import VersionConflict, concurrency_policy
+from app.services.ledger_service import LedgerService
+from app.services.outbox import balance_changes, write_outbox
 from app.services.strategies.base import OperationStrategyAbstract
-from app.services.strategies.deposit import DepositStrategy
-from app.services.strategies.withdraw import WithDrawStrategy
-from app.exceptions import WalletNotFoundException, OperationExecutionException, InvalidOperationException
+from app.services.strategies.registry import STRATEGIES
+from app.services.wallet_events import notify_balances
+from app.services.wallet_metrics import (
+    COMMIT_SECONDS,
+    LOCK_SECONDS,
+    OPERATION_ERRORS_TOTAL,
+    OPERATIONS_TOTAL,
+    STATEMENT_SECONDS,
+    STRATEGY_SECONDS,
+)
+from app.exceptions import (
+    WalletNotFoundException,
+    OperationExecutionException,
+    InvalidOperationException,
+    ServiceBusyException,
+)
 
 logger = logging.getLogger(__name__)
 
+# Postgres SQLSTATE codes raised by lock_timeout and statement_timeout
+LOCK_NOT_AVAILABLE = "55P03"
+QUERY_CANCELED = "57014"
+
+
+def database_error(exp: Exception) -> HTTPException:
+    """
+    Map an unexpected failure to the HTTP error returned to the client
+    Exhausted pool and lock or statement timeouts are transient, clients get 503 with
+    Retry-After so they back off instead of piling up more requests.
+    Args:
+        exp (Exception): Error raised while talking to the database
+    Returns:
+        HTTPException: Error to raise
+    """
+    if isinstance(exp, PoolTimeoutError):
+        return ServiceBusyException()
+    if isinstance(exp, DBAPIError) and getattr(exp.orig, "sqlstate", None) in (LOCK_NOT_AVAILABLE, QUERY_CANCELED):
+        return ServiceBusyException(detail="Wallet is busy, retry later")
+    return HTTPException(status_code=500, detail="Internal Server Error")
+
+
+class DuplicateOperation(Exception):
+    """
+    Raised inside the operation transaction to roll it back when its idempotency key
+    was committed by a concurrent request
+    """
+
+    def __init__(self, key: str) -> None:
+        super().__init__(key)
+        self.key = key
+
 
 class WalletService:
     """
@@ -24,90 +86,598 @@ class WalletService:
         and perform balance operations like (deposit or withdraw)
     Attributes:
         session AsyncSession: Asynchronous SQLAlchemy session for database operations.
-        _strategies (dict): Dictionary of operation strategies keyed by operation type.
+        cache (BalanceCacheBackend | None): Balance cache, updated write-through after commit.
     """
+    __slots__ = ("session", "cache")
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+            self,
+            session: AsyncSession,
+            cache: BalanceCacheBackend | ConfiguredCache | None = ConfiguredCache.DEFAULT,
+    ) -> None:
         """
-        Initialize the service with a database session and set up operation strategies.
+        Initialize the service with a database session.
+        Operation strategies are stateless and shared, see STRATEGIES.
         Args:
             session AsyncSession: Asynchronous session for database access
+            cache (BalanceCacheBackend | ConfiguredCache | None): Balance cache, the configured one
+                by default, None reads and writes without any cache
         """
         self.session = session
-        self._strategies: dict[str, OperationStrategyAbstract] = {
-            "DEPOSIT": DepositStrategy(),
-            "WITHDRAW": WithDrawStrategy(),
-        }
+        self.cache = balance_cache if cache is ConfiguredCache.DEFAULT else cache
 
-    async def get_wallet(self, wallet_id: str) -> Wallet:
+    async def get_wallet(self, wallet_id: UUID) -> Wallet:
         """
         Retrieve a wallet by its UUID
         Locks the record for update to prevent race conditions during balance changes.
         Args:
-            wallet_id (str): UUID of the wallet
+            wallet_id (UUID): UUID of the wallet
         Returns:
             Wallet: Wallet object from the database
         """
-        logger.debug(f"Fetching wallet with ID {wallet_id}")
+        logger.debug("Fetching wallet with ID %s", wallet_id)
         try:
+            started = time.perf_counter()
             result = await self.session.execute(
                 select(Wallet)
                 .where(Wallet.uuid == wallet_id)
                 .with_for_update()
             )
+            LOCK_SECONDS.observe(time.perf_counter() - started)
             wallet = result.scalar_one_or_none()
             if not wallet:
-                logger.warning(f"Wallet with {wallet_id} not found")
+                logger.warning("Wallet with %s not found", wallet_id)
                 raise WalletNotFoundException()
-            logger.debug(f"Wallet found {wallet_id}")
+            logger.debug("Wallet found %s", wallet_id)
             return wallet
         except Exception as e:
-            logger.error(f"Error fetching wallet {wallet_id}: {e}")
+            logger.error("Error fetching wallet %s: %s", wallet_id, e)
             raise
 
-    async def perform_wallet(self, wallet_id: str, operation: OperationModel) -> Wallet:
+    async def read_wallet(self, wallet_id: UUID) -> Wallet:
+        """
+        Retrieve a wallet by its UUID without taking a row lock
+        Plain snapshot read intended for balance queries, it never waits
+        on concurrent deposits or withdrawals.
+        Args:
+            wallet_id (UUID): UUID of the wallet
+        Returns:
+            Wallet: Wallet object from the database
+        """
+        logger.debug("Reading wallet with ID %s", wallet_id)
+        if self.cache is not None:
+            cached = await self.cache.get(wallet_id)
+            if cached is not None:
+                return Wallet(uuid=wallet_id, balance=cached.balance, version=cached.version)
+
+        wallet: Wallet | None
+        try:
+            if settings.WALLET_LEDGER_ENABLED:
+                wallet = await LedgerService(self.session).get_balance(wallet_id)
+            else:
+                result = await self.session.execute(
+                    select(Wallet).where(Wallet.uuid == wallet_id)
+                )
+                wallet = result.scalar_one_or_none()
+        except (DBAPIError, PoolTimeoutError) as exp:
+            logger.error("Error reading wallet %s: %s", wallet_id, exp)
+            raise database_error(exp)
+        if not wallet:
+            logger.warning("Wallet with %s not found", wallet_id)
+            raise WalletNotFoundException()
+
+        if self.cache is not None:
+            await self.cache.set(wallet_id, CachedBalance(balance=wallet.balance, version=wallet.version))
+        return wallet
+
+    async def _cache_written(self, wallets: Iterable[Wallet]) -> None:
+        """
+        Write-through committed balances to the cache
+        Versions keep a slower concurrent reader from overwriting them. Ledger versions
+        are not ordered by commit time, so in ledger mode the entries are dropped instead.
+        Args:
+            wallets (Iterable[Wallet]): Wallets as of the committed transaction
+        """
+        if self.cache is None:
+            return
+        for wallet in wallets:
+            if settings.WALLET_LEDGER_ENABLED:
+                await self.cache.invalidate(wallet.uuid)
+            else:
+                await self.cache.set(wallet.uuid, CachedBalance(balance=wallet.balance, version=wallet.version))
+
+    async def perform_wallet(
+            self, wallet_id: UUID, operation: OperationModel, idempotency_key: str | None = None
+    ) -> Wallet:
         """
-        Perform an operation on wallet like (deposit or withdraw)
-        Uses the strategy pattern to select the execution algorithm
+        Perform an operation on wallet like (deposit, withdraw or transfer)
+        Uses the strategy pattern to select the execution algorithm, every strategy
+        compiles to a single conditional UPDATE ... RETURNING statement, so the row lock
+        is held for one round trip only.
+        With an idempotency key, an already committed operation is replayed
+        instead of being applied twice.
         Args:
-            wallet_id (str): UUID of the wallet
+            wallet_id (UUID): UUID of the wallet
             operation (OperationModel): Operation model containing type and amount
+            idempotency_key (str | None): Client supplied Idempotency-Key
         Returns:
             Wallet: Updated wallet object after the operation
         """
         logger.debug(
-            f"Forming operation {operation.operation_type.value} on wallet {wallet_id} with amount {operation.amount}")
+            "Forming operation %s on wallet %s with amount %s",
+            operation.operation_type.value, wallet_id, operation.amount,
+        )
+        idempotency = IdempotencyStore(self.session)
         try:
+            if idempotency_key:
+                replayed = await idempotency.replay(idempotency_key, wallet_id, operation)
+                if replayed:
+                    return replayed
+
             async with self.session.begin():
-                wallet = await self.get_wallet(wallet_id=wallet_id)
-                strategy = self._strategies.get(operation.operation_type.value)
+                strategy = STRATEGIES.get(operation.operation_type)
 
                 if not strategy:
-                    logger.error(f"Invalid operation type {operation.operation_type.value}")
+                    logger.error("Invalid operation type %s", operation.operation_type.value)
                     raise InvalidOperationException()
 
-                try:
-                    strategy.execute(wallet, operation.amount)
-                    logger.info(
-                        f"Operation {operation.operation_type.value} executed successfully on wallet {wallet_id}")
-                except ValueError as exp:
-                    logger.error(f"Operation execution failed {str(exp)}")
-                    raise OperationExecutionException(detail=str(exp))
+                if operation.operation_type is OperationType.TRANSFER:
+                    written = await self._apply_transfer(wallet_id, operation, strategy)
+                elif settings.WALLET_LEDGER_ENABLED:
+                    written = [await LedgerService(self.session).apply(wallet_id, operation, strategy)]
+                else:
+                    written = [await self._apply_statement(wallet_id, operation, strategy)]
+                wallet = written[0]
+                await notify_balances(self.session, written)
+                await write_outbox(self.session, balance_changes(operation.operation_type, operation.amount, written))
 
-                self.session.add(wallet)
+                if idempotency_key and not await idempotency.remember(idempotency_key, operation, wallet):
+                    raise DuplicateOperation(idempotency_key)
 
-            await self.session.refresh(wallet)
+                if logger.isEnabledFor(logging.INFO) and success_sampler():
+                    logger.info(
+                        "Operation executed successfully",
+                        extra={"wallet_id": wallet_id, "operation_type": operation.operation_type.value},
+                    )
+                commit_started = time.perf_counter()
 
+            COMMIT_SECONDS.observe(time.perf_counter() - commit_started)
+            OPERATIONS_TOTAL.labels(operation.operation_type.value).inc()
+            await self._cache_written(written)
+            if idempotency_key:
+                idempotency.cache(idempotency_key, operation, wallet)
             return wallet
 
+        except DuplicateOperation as duplicate:
+            # A concurrent request with the same key committed first, this one was rolled back
+            logger.info("Operation with idempotency key %s was committed concurrently", duplicate.key)
+            replayed = await idempotency.replay(duplicate.key, wallet_id, operation)
+            if replayed is None:
+                # Only if the committed key was deleted meanwhile, a retry applies the operation anew
+                raise ServiceBusyException()
+            return replayed
+
+        except HTTPException as exp:
+            OPERATION_ERRORS_TOTAL.labels(type(exp).__name__).inc()
+            raise
+        except IntegrityError as exp:
+            OPERATION_ERRORS_TOTAL.labels("IntegrityError").inc()
+            await self.session.rollback()
+            logger.error("Integrity error during executing operation %s", exp.orig)
+            raise HTTPException(status_code=400, detail="Data integrity violation")
+        except Exception as exp:
+            OPERATION_ERRORS_TOTAL.labels(type(exp).__name__).inc()
+            await self.session.rollback()
+            logger.error("Unexpected error during wallet operation %s", exp)
+            raise database_error(exp)
+
+    async def _apply_statement(
+            self, wallet_id: UUID, operation: OperationModel, strategy: OperationStrategyAbstract
+    ) -> Wallet:
+        """
+        Apply the operation with the single UPDATE ... RETURNING statement of its strategy
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            operation (OperationModel): Operation model containing type and amount
+            strategy (OperationStrategyAbstract): Strategy of the operation type
+        Returns:
+            Wallet: Updated wallet object after the operation
+        """
+        started = time.perf_counter()
+        try:
+            statement = strategy.statement(wallet_id, operation.amount)
+        except ValueError as exp:
+            logger.error("Operation execution failed %s", exp)
+            raise OperationExecutionException(detail=str(exp))
+        executed = time.perf_counter()
+        STRATEGY_SECONDS.observe(executed - started)
+
+        # The row lock is acquired and released within this single statement
+        result = await self.session.execute(statement)
+        STATEMENT_SECONDS.observe(time.perf_counter() - executed)
+        wallet = result.scalar_one_or_none()
+
+        if not wallet:
+            await self._raise_for_rejected(wallet_id)
+
+        return wallet
+
+    async def _apply_transfer(
+            self, wallet_id: UUID, operation: OperationModel, strategy: OperationStrategyAbstract
+    ) -> list[Wallet]:
+        """
+        Apply a transfer, both wallets are locked in uuid order and updated in one round trip
+        Args:
+            wallet_id (UUID): UUID of the debited wallet
+            operation (OperationModel): Transfer operation with the target wallet and amount
+            strategy (OperationStrategyAbstract): Transfer strategy
+        Returns:
+            list: Debited and credited wallets after the operation
+        """
+        if settings.WALLET_LEDGER_ENABLED:
+            return await LedgerService(self.session).transfer(wallet_id, operation, strategy)
+
+        target_id = operation.target_wallet_id
+        if target_id is None:
+            # OperationModel rejects such transfers, only a model built without validation gets here
+            raise OperationExecutionException(detail="target_wallet_id is required for TRANSFER")
+        started = time.perf_counter()
+        try:
+            statement = strategy.statement(wallet_id, operation.amount, target_id)
+        except ValueError as exp:
+            logger.error("Operation execution failed %s", exp)
+            raise OperationExecutionException(detail=str(exp))
+        executed = time.perf_counter()
+        STRATEGY_SECONDS.observe(executed - started)
+
+        result = await self.session.execute(statement, execution_options={"synchronize_session": False})
+        STATEMENT_SECONDS.observe(time.perf_counter() - executed)
+        wallets = {wallet.uuid: wallet for wallet in result.scalars()}
+
+        if len(wallets) != 2:
+            await self._raise_for_rejected(wallet_id, target_id)
+
+        return [wallets[wallet_id], wallets[target_id]]
+
+    async def _raise_for_rejected(self, wallet_id: UUID, target_wallet_id: UUID | None = None) -> NoReturn:
+        """
+        Explain why a conditional UPDATE matched no rows
+        Only runs on the failure path: a missing wallet yields 404,
+        existing ones mean the operation condition (sufficient funds) failed.
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            target_wallet_id (UUID | None): UUID of the credited wallet of a transfer, checked first
+        """
+        for checked_id in (target_wallet_id, wallet_id):
+            if checked_id is None:
+                continue
+            exists = await self.session.scalar(
+                select(Wallet.uuid).where(Wallet.uuid == checked_id)
+            )
+            if exists is None:
+                logger.warning("Wallet with %s not found", checked_id)
+                raise WalletNotFoundException()
+        logger.error("Operation execution failed Insufficient funds")
+        raise OperationExecutionException(detail="Insufficient funds")
+
+    async def perform_batch(self, batch: BatchOperationRequest) -> BatchOperationResponse:
+        """
+        Perform a list of operations on one or more wallets in a single transaction
+        Affected rows are locked once in uuid order, so concurrent batches can't deadlock,
+        operations are applied in request order and written back with one set-based
+        UPDATE ... FROM (VALUES ...) statement. In optimistic mode rows are read without
+        locks and the UPDATE only matches rows still at the version that was read,
+        a conflict retries the whole batch.
+        Args:
+            batch (BatchOperationRequest): Operations and commit mode
+        Returns:
+            BatchOperationResponse: Per-item results in request order
+        """
+        wallet_ids = sorted(
+            {item.wallet_id for item in batch.operations}
+            | {item.target_wallet_id for item in batch.operations if item.target_wallet_id is not None}
+        )
+        logger.debug("Forming batch of %s operations on %s wallets", len(batch.operations), len(wallet_ids))
+        try:
+            attempt = 0
+            while True:
+                # Ledger appends don't overwrite balances, ledger batches always lock
+                optimistic = not settings.WALLET_LEDGER_ENABLED and concurrency_policy.optimistic(wallet_ids, attempt)
+                try:
+                    response, written = await self._apply_batch(batch, wallet_ids, optimistic)
+                    break
+                except VersionConflict:
+                    attempt += 1
+                    await concurrency_policy.conflicted(wallet_ids, attempt)
+
+            if response.committed:
+                await self._cache_written(written)
+                logger.info("Batch of %s operations committed", len(batch.operations))
+            return response
+
+        except HTTPException:
+            raise
         except IntegrityError as exp:
             await self.session.rollback()
-            logger.error(f"Integrity error during executing operation {exp.orig}")
+            logger.error("Integrity error during executing batch %s", exp.orig)
             raise HTTPException(status_code=400, detail="Data integrity violation")
         except Exception as exp:
             await self.session.rollback()
-            logger.error(f"Unexpected error during wallet operation {exp}")
-            raise HTTPException(status_code=500, detail="Internal Server Error")
+            logger.error("Unexpected error during batch operation %s", exp)
+            raise database_error(exp)
+
+    async def _apply_batch(
+            self, batch: BatchOperationRequest, wallet_ids: list[UUID], optimistic: bool
+    ) -> tuple[BatchOperationResponse, list[Wallet]]:
+        """
+        Run one attempt of a batch in its own transaction
+        Args:
+            batch (BatchOperationRequest): Operations and commit mode
+            wallet_ids (list[UUID]): Sorted UUIDs of every wallet in the batch
+            optimistic (bool): Read without locks and write with a version check
+        Returns:
+            tuple: Response and the written wallets
+        Raises:
+            VersionConflict: When a wallet changed since it was read in optimistic mode
+        """
+        async with self.session.begin() as transaction:
+            if settings.WALLET_LEDGER_ENABLED:
+                wallets = await LedgerService(self.session).lock_balances(wallet_ids)
+            else:
+                read = (
+                    select(Wallet.uuid, Wallet.balance, Wallet.version)
+                    .where(Wallet.uuid.in_(wallet_ids))
+                    .order_by(Wallet.uuid)
+                )
+                result = await self.session.execute(read if optimistic else read.with_for_update())
+                # Transient copies, never added to the session, so nothing is flushed per row
+                wallets = {
+                    row.uuid: Wallet(uuid=row.uuid, balance=row.balance, version=row.version)
+                    for row in result
+                }
+
+            results = []
+            changes = []
+            for item in batch.operations:
+                item_result = self._apply_batch_item(wallets, item)
+                results.append(item_result)
+                if item_result.success and settings.OUTBOX_ENABLED:
+                    changed = [wallets[item.wallet_id]]
+                    if item.target_wallet_id is not None:
+                        changed.append(wallets[item.target_wallet_id])
+                    # Balances are read right away, later items keep changing the same wallets
+                    changes.extend(balance_changes(item.operation_type, item.amount, changed))
+            rejected = any(not item_result.success for item_result in results)
+
+            if rejected and batch.mode is BatchMode.ATOMIC:
+                await transaction.rollback()
+                logger.info("Atomic batch rolled back, at least one operation was rejected")
+                return BatchOperationResponse(
+                    committed=False,
+                    results=[
+                        item_result if not item_result.success
+                        else BatchOperationResult(
+                            wallet_id=item_result.wallet_id, success=False, detail="Rolled back"
+                        )
+                        for item_result in results
+                    ],
+                ), []
+
+            touched = {
+                wallet_id
+                for item, item_result in zip(batch.operations, results) if item_result.success
+                for wallet_id in (item.wallet_id, item.target_wallet_id) if wallet_id is not None
+            }
+            if settings.WALLET_LEDGER_ENABLED:
+                await LedgerService(self.session).append_batch([
+                    item for item, item_result in zip(batch.operations, results) if item_result.success
+                ])
+            elif touched:
+                rows = values(
+                    column("uuid", Wallet.__table__.c.uuid.type),
+                    column("balance", Wallet.__table__.c.balance.type),
+                    column("version", Wallet.__table__.c.version.type),
+                    name="batch_balances",
+                ).data([
+                    (wallet_id, wallets[wallet_id].balance, wallets[wallet_id].version) for wallet_id in sorted(touched)
+                ])
+                write = (
+                    update(Wallet)
+                    # The IN list lets the planner prune partitions, a join alone doesn't
+                    .where(Wallet.uuid.in_(sorted(touched)), Wallet.uuid == rows.c.uuid)
+                    .values(balance=rows.c.balance, version=Wallet.version + 1)
+                    .returning(Wallet.uuid, Wallet.balance, Wallet.version)
+                )
+                if optimistic:
+                    # Unlocked rows would be locked in the join's order and could deadlock with
+                    # locking writers, they are locked in uuid order first, like everywhere else
+                    locked = (
+                        select(Wallet.uuid)
+                        .where(Wallet.uuid.in_(sorted(touched)))
+                        .order_by(Wallet.uuid)
+                        .with_for_update()
+                        .cte("locked")
+                        .prefix_with("MATERIALIZED")
+                    )
+                    write = write.where(Wallet.uuid == locked.c.uuid, Wallet.version == rows.c.version)
+                result = await self.session.execute(write, execution_options={"synchronize_session": False})
+                wallets = {
+                    row.uuid: Wallet(uuid=row.uuid, balance=row.balance, version=row.version)
+                    for row in result
+                }
+                if len(wallets) != len(touched):
+                    raise VersionConflict()
+            await notify_balances(self.session, (wallets[wallet_id] for wallet_id in sorted(touched)))
+            await write_outbox(self.session, changes)
+
+        return BatchOperationResponse(committed=True, results=results), [wallets[wallet_id] for wallet_id in touched]
+
+    def _apply_batch_item(self, wallets: dict[UUID, Wallet], item: BatchOperationItem) -> BatchOperationResult:
+        """
+        Apply one batch operation to the in-memory copy of its wallet
+        Args:
+            wallets (dict): Locked wallets keyed by uuid
+            item (BatchOperationItem): Operation to apply
+        Returns:
+            BatchOperationResult: Outcome of the operation
+        """
+        wallet = wallets.get(item.wallet_id)
+        if wallet is None:
+            return BatchOperationResult(wallet_id=item.wallet_id, success=False, detail="Wallet Not Found")
+
+        strategy = STRATEGIES.get(item.operation_type)
+        if not strategy:
+            return BatchOperationResult(wallet_id=item.wallet_id, success=False, detail="Invalid Operation Type")
+
+        try:
+            if item.operation_type is OperationType.TRANSFER:
+                target = wallets.get(item.target_wallet_id) if item.target_wallet_id is not None else None
+                if target is None:
+                    return BatchOperationResult(wallet_id=item.wallet_id, success=False, detail="Wallet Not Found")
+                strategy.execute(wallet, item.amount, target)
+            else:
+                strategy.execute(wallet, item.amount)
+        except ValueError as exp:
+            return BatchOperationResult(wallet_id=item.wallet_id, success=False, detail=str(exp))
+
+        return BatchOperationResult(wallet_id=item.wallet_id, success=True, balance=wallet.balance)
+
+    async def perform_wallet_group(
+            self, wallet_id: UUID, operations: list[OperationModel]
+    ) -> list[Wallet | OperationExecutionException]:
+        """
+        Perform several operations on one wallet in a single transaction
+        The wallet row is locked once, operations are applied in order and each
+        one keeps its own outcome, a rejected operation doesn't affect the others.
+        In optimistic mode the row is read without a lock and written back only
+        if its version didn't change meanwhile, otherwise the group is retried.
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            operations (list[OperationModel]): Operations in arrival order
+        Returns:
+            list: Wallet snapshot after each successful operation,
+                or the exception explaining why it was rejected
+        """
+        logger.debug("Forming group of %s operations on wallet %s", len(operations), wallet_id)
+        try:
+            attempt = 0
+            while True:
+                # Ledger appends don't overwrite the balance, there's nothing to version
+                optimistic = not settings.WALLET_LEDGER_ENABLED and concurrency_policy.optimistic([wallet_id], attempt)
+                try:
+                    outcomes = await self._apply_group(wallet_id, operations, optimistic)
+                    break
+                except VersionConflict:
+                    attempt += 1
+                    await concurrency_policy.conflicted([wallet_id], attempt)
+
+            committed = [outcome for outcome in outcomes if isinstance(outcome, Wallet)]
+            if committed:
+                await self._cache_written(committed[-1:])
+            for operation, outcome in zip(operations, outcomes):
+                if isinstance(outcome, HTTPException):
+                    OPERATION_ERRORS_TOTAL.labels(type(outcome).__name__).inc()
+                else:
+                    OPERATIONS_TOTAL.labels(operation.operation_type.value).inc()
+            if logger.isEnabledFor(logging.INFO) and success_sampler():
+                logger.info(
+                    "Group of operations committed",
+                    extra={"wallet_id": wallet_id, "operations": len(operations)},
+                )
+            return outcomes
+
+        except HTTPException as exp:
+            OPERATION_ERRORS_TOTAL.labels(type(exp).__name__).inc()
+            raise
+        except IntegrityError as exp:
+            OPERATION_ERRORS_TOTAL.labels("IntegrityError").inc()
+            await self.session.rollback()
+            logger.error("Integrity error during executing operation %s", exp.orig)
+            raise HTTPException(status_code=400, detail="Data integrity violation")
+        except Exception as exp:
+            OPERATION_ERRORS_TOTAL.labels(type(exp).__name__).inc()
+            await self.session.rollback()
+            logger.error("Unexpected error during wallet operation %s", exp)
+            raise database_error(exp)
+
+    async def _apply_group(
+            self, wallet_id: UUID, operations: list[OperationModel], optimistic: bool
+    ) -> list[Wallet | OperationExecutionException]:
+        """
+        Run one attempt of a group in its own transaction
+        Args:
+            wallet_id (UUID): UUID of the wallet
+            operations (list[OperationModel]): Operations in arrival order
+            optimistic (bool): Read without a lock and write with a version check
+        Returns:
+            list: Outcomes as returned by perform_wallet_group
+        Raises:
+            VersionConflict: When the wallet changed since it was read in optimistic mode
+        """
+        outcomes: list[Wallet | OperationExecutionException] = []
+        async with self.session.begin():
+            if settings.WALLET_LEDGER_ENABLED:
+                # Ledger appends don't contend on the row, apply them one by one
+                ledger = LedgerService(self.session)
+                for operation in operations:
+                    strategy = STRATEGIES.get(operation.operation_type)
+                    if not strategy:
+                        outcomes.append(OperationExecutionException(detail="Invalid Operation Type"))
+                        continue
+                    try:
+                        outcomes.append(await ledger.apply(wallet_id, operation, strategy))
+                    except OperationExecutionException as exp:
+                        outcomes.append(exp)
+            else:
+                if optimistic:
+                    row = (await self.session.execute(
+                        select(Wallet.uuid, Wallet.balance, Wallet.version).where(Wallet.uuid == wallet_id)
+                    )).one_or_none()
+                    if row is None:
+                        logger.warning("Wallet with %s not found", wallet_id)
+                        raise WalletNotFoundException()
+                    # Transient copy, written back by the versioned UPDATE below instead of a flush
+                    wallet = Wallet(uuid=row.uuid, balance=row.balance, version=row.version)
+                else:
+                    wallet = await self.get_wallet(wallet_id=wallet_id)
+                read_version = wallet.version
+
+                started = time.perf_counter()
+                for operation in operations:
+                    strategy = STRATEGIES.get(operation.operation_type)
+                    if not strategy:
+                        outcomes.append(OperationExecutionException(detail="Invalid Operation Type"))
+                        continue
+                    try:
+                        strategy.execute(wallet, operation.amount)
+                    except ValueError as exp:
+                        outcomes.append(OperationExecutionException(detail=str(exp)))
+                        continue
+                    wallet.version += 1
+                    outcomes.append(Wallet(uuid=wallet.uuid, balance=wallet.balance, version=wallet.version))
+                STRATEGY_SECONDS.observe(time.perf_counter() - started)
+
+                if optimistic and wallet.version != read_version:
+                    written = await self.session.scalar(
+                        update(Wallet)
+                        .where(Wallet.uuid == wallet_id, Wallet.version == read_version)
+                        .values(balance=wallet.balance, version=wallet.version)
+                        .returning(Wallet.uuid),
+                        execution_options={"synchronize_session": False},
+                    )
+                    if written is None:
+                        raise VersionConflict()
+            committed = [outcome for outcome in outcomes if isinstance(outcome, Wallet)]
+            await notify_balances(self.session, committed[-1:])
+            await write_outbox(self.session, (
+                change
+                for operation, outcome in zip(operations, outcomes) if isinstance(outcome, Wallet)
+                for change in balance_changes(operation.operation_type, operation.amount, [outcome])
+            ))
+            commit_started = time.perf_counter()
+
+        COMMIT_SECONDS.observe(time.perf_counter() - commit_started)
+        return outcomes
 
     async def create_wallet(self, amount: Decimal) -> Wallet:
         """
@@ -118,9 +688,9 @@ class WalletService:
         Returns:
             Wallet: Just created wallet object
         """
-        wallet_uuid = str(uuid.uuid4())
+        wallet_uuid = uuid4()
         new_wallet = Wallet(uuid=wallet_uuid, balance=amount)
-        logger.info(f"Creating a new wallet with ID {wallet_uuid} and initial balance {amount}")
+        logger.debug("Creating a new wallet with ID %s and initial balance %s", wallet_uuid, amount)
         try:
             self.session.add(new_wallet)
 
@@ -128,12 +698,57 @@ class WalletService:
             await self.session.refresh(new_wallet)
         except IntegrityError as exp:
             await self.session.rollback()
-            logger.error(f"Integrity error during executing operation {exp.orig}")
+            logger.error("Integrity error during executing operation %s", exp.orig)
             raise HTTPException(status_code=400, detail="Data integrity violation")
         except Exception as exp:
             await self.session.rollback()
-            logger.error(f"Unexpected error during wallet operation {exp}")
-            raise HTTPException(status_code=500, detail="Internal Server Error")
+            logger.error("Unexpected error during wallet operation %s", exp)
+            raise database_error(exp)
 
-        logger.info(f"Wallet created successfully with ID {wallet_uuid}")
+        await self._cache_written([new_wallet])
+        if logger.isEnabledFor(logging.INFO) and success_sampler():
+            logger.info("Wallet created successfully", extra={"wallet_id": wallet_uuid})
         return new_wallet
+
+    async def create_wallets_bulk(
+            self, count: int, amount: Decimal, chunk_size: int | None = None
+    ) -> AsyncIterator[list[Wallet]]:
+        """
+        Create many wallets with the same initial balance
+        Every chunk is one INSERT ... SELECT FROM generate_series with UUIDs generated
+        by the database, committed on its own and returned without refreshing rows.
+        Args:
+            count (int): Number of wallets to create
+            amount (Decimal): Initial balance of every wallet (should be non-negative)
+            chunk_size (int | None): Wallets per statement, BULK_CREATE_CHUNK_SIZE by default
+        Returns:
+            AsyncIterator: Transient wallet objects of every committed chunk
+        """
+        chunk_size = chunk_size or settings.BULK_CREATE_CHUNK_SIZE
+        remaining = count
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            rows = select(
+                func.gen_random_uuid(),
+                literal(amount, Numeric(12, 2)),
+            ).select_from(func.generate_series(1, size))
+            try:
+                result = await self.session.execute(
+                    insert(Wallet)
+                    .from_select(["uuid", "balance"], rows)
+                    .returning(Wallet.uuid, Wallet.balance)
+                )
+                created = [Wallet(uuid=row.uuid, balance=row.balance, version=0) for row in result]
+                await self.session.commit()
+            except IntegrityError as exp:
+                await self.session.rollback()
+                logger.error("Integrity error during bulk wallet creation %s", exp.orig)
+                raise HTTPException(status_code=400, detail="Data integrity violation")
+            except Exception as exp:
+                await self.session.rollback()
+                logger.error("Unexpected error during bulk wallet creation %s", exp)
+                raise database_error(exp)
+
+            remaining -= size
+            logger.debug("Created %s wallets, %s remaining", size, remaining)
+            yield created
@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable
 from uuid import uuid4
 
 import pytest
@@ -19,10 +19,24 @@ async def async_client() -> AsyncGenerator[AsyncClient]:
 @pytest.fixture(scope="session")
 async def test_wallet() -> AsyncGenerator[Wallet]:
     async with AsyncSessionLocal() as session:
-        wallet = Wallet(uuid=str(uuid4()), balance=0)
+        wallet = Wallet(uuid=uuid4(), balance=0)
         session.add(wallet)
         await session.commit()
         await session.refresh(wallet)
         yield wallet
         await session.delete(wallet)
         await session.commit()
+
+
+# Creates a wallet with the given amount through the API and returns its id
+WalletFactory = Callable[[float | str], Awaitable[str]]
+
+
+@pytest.fixture
+def create_wallet(async_client: AsyncClient) -> WalletFactory:
+    async def create(amount: float | str) -> str:
+        response = await async_client.post("/api/v1/wallets/", json={"amount": amount})
+        assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+        return response.json()["wallet_id"]
+
+    return create
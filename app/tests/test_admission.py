@@ -0,0 +1,98 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from app.api.v1.routes import wallet as wallet_routes
+from app.config import settings
+from app.services.admission import AdmissionController, TokenBucket
+from app.tests.conftest import WalletFactory
+
+
+def make_controller(burst: int = 2, queue_timeout: float = 1.0) -> AdmissionController:
+    return AdmissionController(
+        rate=1.0, burst=burst, max_clients=10, concurrency=1, queue_size=1, queue_timeout=queue_timeout
+    )
+
+
+def test_token_bucket_burst() -> None:
+    bucket = TokenBucket(rate=1.0, burst=2)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() > 0, "Expected a wait once the burst is spent"
+
+
+def test_client_rate_limited() -> None:
+    controller = make_controller()
+    controller.check_client("client")
+    controller.check_client("client")
+
+    with pytest.raises(HTTPException) as exc_info:
+        controller.check_client("client")
+
+    assert exc_info.value.status_code == 429, f"Expected 429 Too Many Requests, but got {exc_info.value.status_code}"
+    assert exc_info.value.headers is not None and exc_info.value.headers["Retry-After"] == "1"
+    # Buckets are per client
+    controller.check_client("other")
+
+
+@pytest.mark.asyncio
+async def test_wallet_queue_full() -> None:
+    controller = make_controller()
+    wallet_id = uuid4()
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with controller.wallet_slot(wallet_id):
+            await release.wait()
+
+    running = asyncio.create_task(hold())
+    waiting = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        async with controller.wallet_slot(wallet_id):
+            pass
+
+    assert exc_info.value.status_code == 429, f"Expected 429 Too Many Requests, but got {exc_info.value.status_code}"
+    release.set()
+    await asyncio.gather(running, waiting)
+    assert not controller._wallets, "Expected idle wallet slots to be dropped"
+
+
+@pytest.mark.asyncio
+async def test_wallet_queue_timeout() -> None:
+    controller = make_controller(queue_timeout=0.01)
+    wallet_id = uuid4()
+
+    async with controller.wallet_slot(wallet_id):
+        with pytest.raises(HTTPException) as exc_info:
+            async with controller.wallet_slot(wallet_id):
+                pass
+
+    assert exc_info.value.status_code == 429, f"Expected 429 Too Many Requests, but got {exc_info.value.status_code}"
+
+
+@pytest.mark.asyncio
+async def test_operation_rate_limited(
+        async_client: AsyncClient, create_wallet: WalletFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(wallet_routes, "operation_admission", make_controller(burst=1))
+    wallet_uuid = await create_wallet("10.00")
+    url = f"/api/v1/wallets/{wallet_uuid}/operation"
+    payload = {"operation_type": "DEPOSIT", "amount": 10}
+    headers = {"X-Client-Id": "tenant-a"}
+
+    response = await async_client.post(url, json=payload, headers=headers)
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+
+    response = await async_client.post(url, json=payload, headers=headers)
+    assert response.status_code == 429, f"Expected 429 Too Many Requests, but got {response.status_code}"
+    assert "Retry-After" in response.headers
+
+    response = await async_client.post(url, json=payload, headers={"X-Client-Id": "tenant-b"})
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
@@ -0,0 +1,125 @@
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.schemas.wallet_schemas import BatchOperationItem, BatchOperationRequest, OperationModel, OperationType
+from app.services.balance_cache import CachedBalance, InMemoryBalanceCache
+from app.services.wallet_service import WalletService
+from app.tests.conftest import WalletFactory
+
+
+@pytest.mark.asyncio
+async def test_stale_version_does_not_overwrite() -> None:
+    cache = InMemoryBalanceCache(maxsize=10, ttl=60)
+    wallet = uuid4()
+    await cache.set(wallet, CachedBalance(balance=Decimal("20.00"), version=2))
+    await cache.set(wallet, CachedBalance(balance=Decimal("10.00"), version=1))
+
+    cached = await cache.get(wallet)
+    assert cached == CachedBalance(balance=Decimal("20.00"), version=2)
+
+
+@pytest.mark.asyncio
+async def test_expired_and_evicted_entries() -> None:
+    first, second = uuid4(), uuid4()
+    cache = InMemoryBalanceCache(maxsize=1, ttl=0)
+    await cache.set(first, CachedBalance(balance=Decimal("1.00"), version=1))
+    assert await cache.get(first) is None, "Entry must expire"
+
+    cache = InMemoryBalanceCache(maxsize=1, ttl=60)
+    await cache.set(first, CachedBalance(balance=Decimal("1.00"), version=1))
+    await cache.set(second, CachedBalance(balance=Decimal("2.00"), version=1))
+    assert await cache.get(first) is None, "Least recently used entry must be evicted"
+    assert await cache.get(second) is not None
+
+
+@pytest.mark.asyncio
+async def test_invalidate() -> None:
+    cache = InMemoryBalanceCache(maxsize=10, ttl=60)
+    wallet = uuid4()
+    await cache.set(wallet, CachedBalance(balance=Decimal("1.00"), version=1))
+    await cache.invalidate(wallet)
+
+    assert await cache.get(wallet) is None
+
+
+@pytest.fixture
+def cache() -> InMemoryBalanceCache:
+    return InMemoryBalanceCache(maxsize=100, ttl=60)
+
+
+def deposit(amount: str) -> OperationModel:
+    return OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal(amount))
+
+
+async def cached_balance(cache: InMemoryBalanceCache, wallet_id: UUID) -> Decimal | None:
+    cached = await cache.get(wallet_id)
+    return cached.balance if cached is not None else None
+
+
+def test_none_disables_cache(cache: InMemoryBalanceCache) -> None:
+    session = AsyncSessionLocal()
+    assert WalletService(session, cache=None).cache is None, "None must not fall back to the configured cache"
+    assert WalletService(session, cache=cache).cache is cache
+
+
+@pytest.mark.asyncio
+async def test_perform_wallet_writes_through(create_wallet: WalletFactory, cache: InMemoryBalanceCache) -> None:
+    wallet_id = UUID(await create_wallet("10.00"))
+    async with AsyncSessionLocal() as session:
+        wallet = await WalletService(session, cache=cache).perform_wallet(wallet_id, deposit("5.00"))
+
+    assert await cache.get(wallet_id) == CachedBalance(balance=Decimal("15.00"), version=wallet.version)
+
+
+@pytest.mark.asyncio
+async def test_perform_batch_writes_through(create_wallet: WalletFactory, cache: InMemoryBalanceCache) -> None:
+    first, second = UUID(await create_wallet("10.00")), UUID(await create_wallet("10.00"))
+    batch = BatchOperationRequest(operations=[
+        BatchOperationItem(wallet_id=first, operation_type=OperationType.DEPOSIT, amount=Decimal("5.00")),
+        BatchOperationItem(wallet_id=second, operation_type=OperationType.WITHDRAW, amount=Decimal("4.00")),
+    ])
+    async with AsyncSessionLocal() as session:
+        response = await WalletService(session, cache=cache).perform_batch(batch)
+
+    assert response.committed
+    assert await cached_balance(cache, first) == Decimal("15.00")
+    assert await cached_balance(cache, second) == Decimal("6.00")
+
+
+@pytest.mark.asyncio
+async def test_perform_wallet_group_writes_through(create_wallet: WalletFactory, cache: InMemoryBalanceCache) -> None:
+    wallet_id = UUID(await create_wallet("10.00"))
+    async with AsyncSessionLocal() as session:
+        await WalletService(session, cache=cache).perform_wallet_group(wallet_id, [deposit("1.00"), deposit("2.00")])
+
+    assert await cached_balance(cache, wallet_id) == Decimal("13.00"), "Expected the balance after the last operation"
+
+
+@pytest.mark.asyncio
+async def test_read_wallet_served_from_cache(create_wallet: WalletFactory, cache: InMemoryBalanceCache) -> None:
+    wallet_id = UUID(await create_wallet("10.00"))
+    async with AsyncSessionLocal() as session:
+        service = WalletService(session, cache=cache)
+        assert (await service.read_wallet(wallet_id)).balance == Decimal("10.00")
+        assert await cache.get(wallet_id) is not None, "A miss must fill the cache"
+
+        # A cached entry is returned without reading the database
+        await cache.set(wallet_id, CachedBalance(balance=Decimal("99.00"), version=1_000))
+        assert (await service.read_wallet(wallet_id)).balance == Decimal("99.00")
+
+
+@pytest.mark.asyncio
+async def test_ledger_mode_invalidates(
+        create_wallet: WalletFactory, cache: InMemoryBalanceCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "WALLET_LEDGER_ENABLED", True)
+    wallet_id = UUID(await create_wallet("10.00"))
+    await cache.set(wallet_id, CachedBalance(balance=Decimal("10.00"), version=0))
+    async with AsyncSessionLocal() as session:
+        await WalletService(session, cache=cache).perform_wallet(wallet_id, deposit("5.00"))
+
+    assert await cache.get(wallet_id) is None, "Ledger versions aren't ordered by commit, entries must be dropped"
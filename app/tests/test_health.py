@@ -0,0 +1,32 @@
+import pytest
+from httpx import AsyncClient
+from main import app
+
+from app.db.pool import pool_stats
+from app.db.session import async_engine
+from app.db.warmup import warm_up, write_statements
+
+
+@pytest.mark.asyncio
+async def test_liveness(async_client: AsyncClient) -> None:
+    response = await async_client.get("/health/live")
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_warmup(async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(app.state, "ready", False, raising=False)
+    response = await async_client.get("/health/ready")
+    assert response.status_code == 503, f"Expected 503 Service Unavailable, but got {response.status_code}"
+
+    monkeypatch.setattr(app.state, "ready", True)
+    response = await async_client.get("/health/ready")
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_prefills_pool() -> None:
+    await warm_up(async_engine, write_statements(), connections=2)
+
+    assert pool_stats(async_engine.pool)["checked_in"] >= 2, "Expected warmed up connections in the pool"
@@ -0,0 +1,20 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposition(async_client: AsyncClient) -> None:
+    response = await async_client.post("/api/v1/wallets/", json={"amount": 10.00})
+    wallet_uuid = response.json()["wallet_id"]
+    await async_client.post(
+        f"/api/v1/wallets/{wallet_uuid}/operation",
+        json={"amount": 5.00, "operation_type": "DEPOSIT"},
+    )
+
+    response = await async_client.get("/metrics")
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    body = response.text
+    assert 'wallet_operations_total{operation_type="DEPOSIT"}' in body
+    assert 'wallet_operation_phase_seconds_count{phase="statement"}' in body
+    assert 'db_pool_connections{engine="primary",state="checked_out"}' in body
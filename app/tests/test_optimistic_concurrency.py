@@ -0,0 +1,88 @@
+import asyncio
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.db.session import AsyncSessionLocal
+from app.schemas.wallet_schemas import OperationModel, OperationType
+from app.services import wallet_service
+from app.services.concurrency import ConcurrencyPolicy
+from app.services.wallet_service import WalletService
+from app.tests.conftest import WalletFactory
+
+
+def make_policy(mode: str, max_conflicts: int = 3) -> ConcurrencyPolicy:
+    return ConcurrencyPolicy(mode, max_conflicts=max_conflicts, backoff=0.001, hot_size=100, hot_ttl=60)
+
+
+async def get_balance(async_client: AsyncClient, wallet_uuid: str) -> Decimal:
+    response = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    return Decimal(response.json()["balance"])
+
+
+def test_pessimistic_never_optimistic() -> None:
+    assert not make_policy("pessimistic").optimistic([uuid4()], attempt=0)
+
+
+def test_optimistic_falls_back_to_locking() -> None:
+    policy = make_policy("optimistic", max_conflicts=2)
+
+    assert policy.optimistic([uuid4()], attempt=1)
+    assert not policy.optimistic([uuid4()], attempt=2), "Expected locking after max_conflicts conflicts"
+
+
+@pytest.mark.asyncio
+async def test_adaptive_locks_hot_wallets() -> None:
+    policy = make_policy("adaptive")
+    hot, cold = uuid4(), uuid4()
+
+    await policy.conflicted([hot], attempt=1)
+
+    assert not policy.optimistic([hot], attempt=0), "Expected a recently conflicting wallet to be locked"
+    assert policy.optimistic([cold], attempt=0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["optimistic", "adaptive"])
+async def test_concurrent_batches_keep_every_update(
+        async_client: AsyncClient, create_wallet: WalletFactory, monkeypatch: pytest.MonkeyPatch, mode: str
+) -> None:
+    monkeypatch.setattr(wallet_service, "concurrency_policy", make_policy(mode, max_conflicts=5))
+    first = await create_wallet(100.00)
+    second = await create_wallet(100.00)
+
+    responses = await asyncio.gather(*(
+        async_client.post("/api/v1/wallets/operations/batch", json={
+            "mode": "ATOMIC",
+            "operations": [
+                {"wallet_id": first, "operation_type": "DEPOSIT", "amount": 2.00},
+                {"wallet_id": second, "operation_type": "WITHDRAW", "amount": 1.00},
+            ],
+        })
+        for _ in range(20)
+    ))
+
+    assert all(response.status_code == 200 for response in responses), \
+        f"Expected 200 OK, but got {[response.status_code for response in responses]}"
+    assert await get_balance(async_client, first) == Decimal("140.00")
+    assert await get_balance(async_client, second) == Decimal("80.00")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_groups_keep_every_update(
+        async_client: AsyncClient, create_wallet: WalletFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(wallet_service, "concurrency_policy", make_policy("optimistic", max_conflicts=5))
+    wallet_id = await create_wallet(10.00)
+    deposit = OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("1.00"))
+
+    async def perform_group() -> None:
+        async with AsyncSessionLocal() as session:
+            outcomes = await WalletService(session).perform_wallet_group(UUID(wallet_id), [deposit, deposit])
+        assert len(outcomes) == 2
+
+    await asyncio.gather(*(perform_group() for _ in range(10)))
+
+    assert await get_balance(async_client, wallet_id) == Decimal("30.00")
@@ -0,0 +1,157 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, select
+
+from app.config import settings
+from app.db.models import OutboxEntry
+from app.db.session import AsyncSessionLocal
+from app.services.outbox import FileSink, MemorySink, OutboxDispatcher, OutboxMessage, OutboxSink
+from app.tests.conftest import WalletFactory
+
+
+class FailingSink(OutboxSink):
+    async def deliver(self, messages: list[OutboxMessage]) -> None:
+        raise ConnectionError("Sink is down")
+
+
+class HangingSink(OutboxSink):
+    async def deliver(self, messages: list[OutboxMessage]) -> None:
+        await asyncio.Event().wait()
+
+
+class LockProbingSink(MemorySink):
+    """Fails the delivery if the entries being delivered are still locked"""
+
+    async def deliver(self, messages: list[OutboxMessage]) -> None:
+        async with AsyncSessionLocal() as session, session.begin():
+            await session.execute(
+                select(OutboxEntry.id)
+                .where(OutboxEntry.id.in_([message.id for message in messages]))
+                .with_for_update(nowait=True)
+            )
+        await super().deliver(messages)
+
+
+def make_dispatcher(sink: OutboxSink, delivery_timeout: float = 10.0) -> OutboxDispatcher:
+    return OutboxDispatcher(
+        AsyncSessionLocal, [sink], batch_size=100, poll_interval=0.1, retry_seconds=60,
+        delivery_timeout=delivery_timeout,
+    )
+
+
+async def drain(dispatcher: OutboxDispatcher) -> None:
+    while await dispatcher.dispatch_batch():
+        pass
+
+
+@pytest.fixture
+async def outbox_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+    # Start from an empty backlog, entries of other tests are not ours to assert on
+    await drain(make_dispatcher(MemorySink()))
+
+
+@pytest.mark.asyncio
+async def test_operation_delivered(
+        async_client: AsyncClient, create_wallet: WalletFactory, outbox_enabled: None
+) -> None:
+    wallet_uuid = UUID(await create_wallet("10.00"))
+    response = await async_client.post(
+        f"/api/v1/wallets/{wallet_uuid}/operation",
+        json={"operation_type": "DEPOSIT", "amount": 15},
+    )
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+
+    sink = LockProbingSink()
+    await drain(make_dispatcher(sink))
+
+    messages = [message for message in sink.messages if message.wallet_id == wallet_uuid]
+    assert len(messages) == 1, f"Expected 1 outbox message, but got {len(messages)}"
+    assert messages[0].operation_type == "DEPOSIT"
+    assert messages[0].amount == Decimal("15")
+    assert messages[0].balance == Decimal(response.json()["balance"])
+
+
+@pytest.mark.asyncio
+async def test_rejected_operation_not_written(
+        async_client: AsyncClient, create_wallet: WalletFactory, outbox_enabled: None
+) -> None:
+    wallet_uuid = UUID(await create_wallet("10.00"))
+    response = await async_client.post(
+        f"/api/v1/wallets/{wallet_uuid}/operation",
+        json={"operation_type": "WITHDRAW", "amount": 1_000_000},
+    )
+    assert response.status_code == 400, f"Expected 400 Bad Request, but got {response.status_code}"
+
+    sink = MemorySink()
+    await drain(make_dispatcher(sink))
+
+    assert not [message for message in sink.messages if message.wallet_id == wallet_uuid]
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_rescheduled(outbox_enabled: None) -> None:
+    wallet_id = uuid4()
+    async with AsyncSessionLocal() as session, session.begin():
+        session.add(OutboxEntry(wallet_uuid=wallet_id, operation_type="DEPOSIT", amount=1, balance=1))
+
+    try:
+        assert await make_dispatcher(FailingSink()).dispatch_batch() == 0
+
+        async with AsyncSessionLocal() as session:
+            entry = await session.scalar(select(OutboxEntry).where(OutboxEntry.wallet_uuid == wallet_id))
+        assert entry is not None, "Expected the entry to be kept for a retry"
+        assert entry.attempts == 1
+        assert entry.available_at > entry.created_at
+
+        # Not due yet, so another dispatcher doesn't pick it up right away
+        sink = MemorySink()
+        await drain(make_dispatcher(sink))
+        assert not [message for message in sink.messages if message.wallet_id == wallet_id]
+    finally:
+        async with AsyncSessionLocal() as session, session.begin():
+            await session.execute(delete(OutboxEntry).where(OutboxEntry.wallet_uuid == wallet_id))
+
+
+@pytest.mark.asyncio
+async def test_hanging_delivery_is_rescheduled(outbox_enabled: None) -> None:
+    wallet_id = uuid4()
+    async with AsyncSessionLocal() as session, session.begin():
+        session.add(OutboxEntry(wallet_uuid=wallet_id, operation_type="DEPOSIT", amount=1, balance=1))
+
+    try:
+        assert await make_dispatcher(HangingSink(), delivery_timeout=0.1).dispatch_batch() == 0
+
+        async with AsyncSessionLocal() as session:
+            entry = await session.scalar(select(OutboxEntry).where(OutboxEntry.wallet_uuid == wallet_id))
+        assert entry is not None, "Expected the entry to be kept for a retry"
+        assert entry.attempts == 1
+    finally:
+        async with AsyncSessionLocal() as session, session.begin():
+            await session.execute(delete(OutboxEntry).where(OutboxEntry.wallet_uuid == wallet_id))
+
+
+@pytest.mark.asyncio
+async def test_file_sink(tmp_path) -> None:
+    path = tmp_path / "outbox.ndjson"
+    message = OutboxMessage(
+        id=1,
+        wallet_id=uuid4(),
+        operation_type="WITHDRAW",
+        amount=Decimal("-5.00"),
+        balance=Decimal("95.00"),
+        created_at=datetime.now(timezone.utc),
+    )
+
+    await FileSink(str(path)).deliver([message])
+    await FileSink(str(path)).deliver([message])
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2, f"Expected 2 lines, but got {len(lines)}"
+    assert json.loads(lines[0])["balance"] == "95.00"
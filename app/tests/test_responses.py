@@ -0,0 +1,35 @@
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.responses import FastJSONResponse, error_body
+
+
+def test_decimal_encoded_exactly() -> None:
+    response = FastJSONResponse({"balance": Decimal("0.10"), "wallet_id": UUID(int=1)})
+
+    assert response.body == b'{"balance":"0.10","wallet_id":"00000000-0000-0000-0000-000000000001"}'
+
+
+def test_error_body_cached() -> None:
+    assert error_body("Wallet Not Found") == b'{"detail":"Wallet Not Found"}'
+    assert error_body("Wallet Not Found") is error_body("Wallet Not Found"), "Expected the encoded body to be reused"
+
+
+@pytest.mark.asyncio
+async def test_error_response(async_client: AsyncClient) -> None:
+    response = await async_client.get(f"/api/v1/wallets/{uuid4()}/balance")
+
+    assert response.status_code == 404, f"Expected 404 Not Found, but got {response.status_code}"
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"detail": "Wallet Not Found"}
+
+
+@pytest.mark.asyncio
+async def test_unknown_route_error_response(async_client: AsyncClient) -> None:
+    response = await async_client.get("/api/v1/unknown")
+
+    assert response.status_code == 404, f"Expected 404 Not Found, but got {response.status_code}"
+    assert response.json() == {"detail": "Not Found"}
@@ -0,0 +1,34 @@
+import pytest
+
+from app.config import settings
+from app.server import budget_workers
+
+
+@pytest.fixture
+def connection_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 5)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 100)
+    monkeypatch.setattr(settings, "DB_RESERVED_CONNECTIONS", 10)
+    monkeypatch.setattr(settings, "WALLET_EVENTS_ENABLED", False)
+
+
+def test_budget_workers_within_budget(connection_budget: None) -> None:
+    assert budget_workers(4) == 4
+
+
+def test_budget_workers_capped(connection_budget: None) -> None:
+    assert budget_workers(32) == 6, "90 available connections fit 6 workers of 15"
+
+
+def test_budget_workers_no_room(connection_budget: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 20)
+
+    with pytest.raises(SystemExit):
+        budget_workers(1)
+
+
+def test_budget_workers_counts_event_listener(connection_budget: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "WALLET_EVENTS_ENABLED", True)
+
+    assert budget_workers(32) == 5, "90 available connections fit 5 workers of 15 plus a listener"
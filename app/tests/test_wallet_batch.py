@@ -0,0 +1,87 @@
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient, Response
+
+from app.tests.conftest import WalletFactory
+
+
+async def post_batch(async_client: AsyncClient, json_data: dict[str, object]) -> Response:
+    return await async_client.post(
+        "/api/v1/wallets/operations/batch",
+        json=json_data,
+    )
+
+
+async def get_balance(async_client: AsyncClient, wallet_uuid: str) -> str:
+    response = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    return response.json().get("balance")
+
+
+@pytest.mark.asyncio
+async def test_batch_atomic_success(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    first = await create_wallet(10.00)
+    second = await create_wallet(10.00)
+    response = await post_batch(async_client, {
+        "mode": "ATOMIC",
+        "operations": [
+            {"wallet_id": first, "operation_type": "DEPOSIT", "amount": 5.00},
+            {"wallet_id": second, "operation_type": "WITHDRAW", "amount": 3.00},
+            {"wallet_id": first, "operation_type": "WITHDRAW", "amount": 12.00},
+        ],
+    })
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    data = response.json()
+    assert data.get("committed") is True
+    assert [item["balance"] for item in data["results"]] == ["15.00", "7.00", "3.00"]
+    assert await get_balance(async_client, first) == "3.00"
+    assert await get_balance(async_client, second) == "7.00"
+
+
+@pytest.mark.asyncio
+async def test_batch_atomic_rolls_back(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    wallet = await create_wallet(10.00)
+    response = await post_batch(async_client, {
+        "mode": "ATOMIC",
+        "operations": [
+            {"wallet_id": wallet, "operation_type": "DEPOSIT", "amount": 5.00},
+            {"wallet_id": wallet, "operation_type": "WITHDRAW", "amount": 100.00},
+        ],
+    })
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    data = response.json()
+    assert data.get("committed") is False
+    assert data["results"][0]["detail"] == "Rolled back"
+    assert data["results"][1]["detail"] == "Insufficient funds"
+    assert await get_balance(async_client, wallet) == "10.00", "Balance must stay unchanged"
+
+
+@pytest.mark.asyncio
+async def test_batch_best_effort(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    wallet = await create_wallet(10.00)
+    response = await post_batch(async_client, {
+        "mode": "BEST_EFFORT",
+        "operations": [
+            {"wallet_id": wallet, "operation_type": "WITHDRAW", "amount": 100.00},
+            {"wallet_id": str(uuid4()), "operation_type": "DEPOSIT", "amount": 5.00},
+            {"wallet_id": wallet, "operation_type": "DEPOSIT", "amount": 5.00},
+        ],
+    })
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    data = response.json()
+    assert data.get("committed") is True
+    assert [item["success"] for item in data["results"]] == [False, False, True]
+    assert data["results"][1]["detail"] == "Wallet Not Found"
+    assert await get_balance(async_client, wallet) == "15.00"
+
+
+@pytest.mark.asyncio
+async def test_batch_empty(async_client: AsyncClient) -> None:
+    response = await post_batch(async_client, {"operations": []})
+
+    assert (
+        response.status_code == 422
+    ), f"Expected 422 Unprocessable Entity, but got {response.status_code}"
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_create_wallets_bulk_success(async_client: AsyncClient) -> None:
+    response = await async_client.post("/api/v1/wallets/bulk", json={"count": 3, "amount": 25.00})
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    wallets = [json.loads(line) for line in response.text.splitlines()]
+    assert len(wallets) == 3, f"Expected 3 wallets, but got {len(wallets)}"
+    assert len({wallet["wallet_id"] for wallet in wallets}) == 3, "Expected unique wallet ids"
+
+    for wallet in wallets:
+        balance = await async_client.get(f"/api/v1/wallets/{wallet['wallet_id']}/balance")
+        assert balance.status_code == 200, f"Expected 200 OK, but got {balance.status_code}"
+        assert balance.json().get("balance") == "25.00"
+
+
+@pytest.mark.asyncio
+async def test_create_wallets_bulk_invalid_count(async_client: AsyncClient) -> None:
+    response = await async_client.post("/api/v1/wallets/bulk", json={"count": 0, "amount": 25.00})
+
+    assert response.status_code == 422, f"Expected 422 Unprocessable Entity, but got {response.status_code}"
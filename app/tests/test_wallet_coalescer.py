@@ -0,0 +1,114 @@
+import asyncio
+from decimal import Decimal
+from typing import cast
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models import Wallet
+from app.db.session import AsyncSessionLocal
+from app.exceptions import OperationExecutionException
+from app.schemas.wallet_schemas import OperationModel, OperationType
+from app.services.coalescer import WalletOperationCoalescer
+from app.services.wallet_service import WalletService
+from app.tests.conftest import WalletFactory
+
+
+@pytest.mark.asyncio
+async def test_coalesced_operations_keep_order_and_results(create_wallet: WalletFactory) -> None:
+    wallet_uuid = UUID(await create_wallet("10.00"))
+    coalescer = WalletOperationCoalescer(AsyncSessionLocal, window=0.05, max_batch=100, max_queue=100)
+    operations = [
+        OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("5.00")),
+        OperationModel(operation_type=OperationType.WITHDRAW, amount=Decimal("100.00")),
+        OperationModel(operation_type=OperationType.WITHDRAW, amount=Decimal("15.00")),
+    ]
+
+    results = await asyncio.gather(
+        *(coalescer.submit(wallet_uuid, operation) for operation in operations),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], Wallet) and results[0].balance == Decimal("15.00")
+    assert isinstance(results[1], HTTPException)
+    assert results[1].detail == "Insufficient funds"
+    assert isinstance(results[2], Wallet) and results[2].balance == Decimal("0.00")
+
+
+@pytest.mark.asyncio
+async def test_coalesced_group_limited_to_max_batch(
+        create_wallet: WalletFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    wallet_uuid = UUID(await create_wallet("10.00"))
+    coalescer = WalletOperationCoalescer(AsyncSessionLocal, window=10.0, max_batch=2, max_queue=100)
+    operation = OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("5.00"))
+    group_sizes = []
+    perform_wallet_group = WalletService.perform_wallet_group
+
+    async def recording_group(
+            self: WalletService, wallet_id: UUID, operations: list[OperationModel]
+    ) -> list[Wallet | OperationExecutionException]:
+        group_sizes.append(len(operations))
+        return await perform_wallet_group(self, wallet_id, operations)
+
+    monkeypatch.setattr(WalletService, "perform_wallet_group", recording_group)
+
+    # The last three arrive while the first group is being flushed
+    results = await asyncio.gather(*(coalescer.submit(wallet_uuid, operation) for _ in range(5)))
+
+    assert group_sizes == [2, 2, 1], f"Expected groups of at most 2 operations, but got {group_sizes}"
+    assert [result.balance for result in results] == [Decimal(15 + 5 * i) for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_operation_on_missing_wallet() -> None:
+    coalescer = WalletOperationCoalescer(AsyncSessionLocal, window=0.0, max_batch=1, max_queue=1)
+    operation = OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("5.00"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await coalescer.submit(uuid4(), operation)
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_coalesced_queue_full(create_wallet: WalletFactory) -> None:
+    wallet_uuid = UUID(await create_wallet("10.00"))
+    coalescer = WalletOperationCoalescer(AsyncSessionLocal, window=0.05, max_batch=100, max_queue=1)
+    operation = OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("5.00"))
+    queued = asyncio.create_task(coalescer.submit(wallet_uuid, operation))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await coalescer.submit(wallet_uuid, operation)
+
+    assert exc_info.value.status_code == 429, f"Expected 429 Too Many Requests, but got {exc_info.value.status_code}"
+    assert (await queued).balance == Decimal("15.00"), "The queued operation must still be applied"
+
+
+class HangingSession:
+    async def __aenter__(self) -> None:
+        await asyncio.Event().wait()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_fails_pending_operations() -> None:
+    coalescer = WalletOperationCoalescer(
+        cast(async_sessionmaker[AsyncSession], HangingSession), window=0.0, max_batch=1, max_queue=1
+    )
+    operation = OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("5.00"))
+    submitted = asyncio.create_task(coalescer.submit(uuid4(), operation))
+    await asyncio.sleep(0.01)
+
+    for task in list(coalescer._tasks):
+        task.cancel()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await asyncio.wait_for(submitted, 1.0)
+
+    assert exc_info.value.status_code == 500, f"Expected 500 Internal Server Error, but got {exc_info.value.status_code}"
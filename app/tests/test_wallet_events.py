@@ -0,0 +1,118 @@
+import asyncio
+from typing import AsyncGenerator
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.api.v1.routes import wallet as wallet_routes
+from app.db.models import Wallet
+from app.services import wallet_service
+from app.services.balance_cache import CachedBalance, InMemoryBalanceCache
+from app.services.wallet_events import BalanceEvent, WalletEventHub, wallet_event_hub
+from app.tests.conftest import WalletFactory
+
+
+@pytest.fixture
+async def events_enabled(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[None]:
+    monkeypatch.setattr(settings, "WALLET_EVENTS_ENABLED", True)
+    yield
+    await wallet_event_hub.stop()
+
+
+def make_hub(buffer_size: int = 16) -> WalletEventHub:
+    return WalletEventHub(wallet_event_hub._dsn, channel="wallet_balances", buffer_size=buffer_size, retry_seconds=0.1)
+
+
+def test_balance_event_round_trip() -> None:
+    event = BalanceEvent(wallet_id=uuid4(), balance=Decimal("10.50"), version=3)
+
+    assert BalanceEvent.decode(event.encode()) == event
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_keeps_latest_events() -> None:
+    hub = make_hub(buffer_size=2)
+    wallet_id = uuid4()
+    try:
+        async with hub.subscribe(wallet_id) as events:
+            for version in range(1, 4):
+                hub._dispatch(None, 0, "wallet_balances", f"{wallet_id} {version}.00 {version}")
+
+            versions = [event.version for event in (events.get_nowait(), events.get_nowait()) if event is not None]
+            assert versions == [2, 3], "Expected the oldest event to be dropped"
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_operation_publishes_balance(
+        async_client: AsyncClient, create_wallet: WalletFactory, events_enabled: None
+) -> None:
+    wallet_id = UUID(await create_wallet(10.00))
+    hub = make_hub()
+    try:
+        async with hub.subscribe(wallet_id) as events:
+            response = await async_client.post(
+                f"/api/v1/wallets/{wallet_id}/operation",
+                json={"operation_type": "DEPOSIT", "amount": 10},
+            )
+            assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+
+            event = await asyncio.wait_for(events.get(), timeout=5)
+            assert event is not None, "Expected an event, not a reconnect marker"
+            assert event.wallet_id == wallet_id
+            assert event.balance == Decimal(response.json()["balance"])
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_rejected_operation_publishes_nothing(
+        async_client: AsyncClient, create_wallet: WalletFactory, events_enabled: None
+) -> None:
+    wallet_id = UUID(await create_wallet(10.00))
+    hub = make_hub()
+    try:
+        async with hub.subscribe(wallet_id) as events:
+            response = await async_client.post(
+                f"/api/v1/wallets/{wallet_id}/operation",
+                json={"operation_type": "WITHDRAW", "amount": 1_000_000},
+            )
+            assert response.status_code == 400, f"Expected 400 Bad Request, but got {response.status_code}"
+
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(events.get(), timeout=0.5)
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_events_missing_wallet(async_client: AsyncClient, events_enabled: None) -> None:
+    response = await async_client.get(f"/api/v1/wallets/{uuid4()}/events")
+
+    assert response.status_code == 404, f"Expected 404 Not Found, but got {response.status_code}"
+
+
+@pytest.mark.asyncio
+async def test_events_disabled(async_client: AsyncClient, test_wallet: Wallet) -> None:
+    response = await async_client.get(f"/api/v1/wallets/{test_wallet.uuid}/events")
+
+    assert response.status_code == 404, f"Expected 404 Not Found, but got {response.status_code}"
+    assert response.json().get("detail") == "Balance events are disabled"
+
+
+@pytest.mark.asyncio
+async def test_feed_starts_from_uncached_balance(
+        create_wallet: WalletFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    wallet_id = UUID(await create_wallet(10.00))
+    stale = InMemoryBalanceCache(maxsize=10, ttl=60)
+    await stale.set(wallet_id, CachedBalance(balance=Decimal("1.00"), version=1_000))
+    monkeypatch.setattr(wallet_service, "balance_cache", stale)
+
+    event = await wallet_routes.current_balance_event(wallet_id)
+
+    assert event.balance == Decimal("10.00"), "The feed must not start from a cached balance"
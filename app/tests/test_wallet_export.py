@@ -0,0 +1,54 @@
+import json
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.tests.conftest import WalletFactory
+
+
+@pytest.mark.asyncio
+async def test_export_wallets_ndjson(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    wallet_id = await create_wallet(42.00)
+    response = await async_client.get("/api/v1/wallets/export")
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    wallets = [json.loads(line) for line in response.text.splitlines()]
+    wallet_ids = [wallet["wallet_id"] for wallet in wallets]
+    assert wallet_ids == sorted(wallet_ids), "Expected wallets ordered by uuid"
+    assert {"wallet_id": wallet_id, "balance": "42.00"} in wallets
+
+
+@pytest.mark.asyncio
+async def test_export_wallets_csv(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    wallet_id = await create_wallet(42.00)
+    response = await async_client.get("/api/v1/wallets/export", params={"format": "CSV"})
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    lines = response.text.splitlines()
+    assert lines[0] == "wallet_id,balance"
+    assert f"{wallet_id},42.00" in lines
+
+
+@pytest.mark.asyncio
+async def test_reconcile_returns_only_mismatches(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    matching = await create_wallet(10.00)
+    mismatching = await create_wallet(20.00)
+    missing = str(uuid4())
+    body = "\n".join([
+        json.dumps({"wallet_id": matching, "balance": "10.00"}),
+        json.dumps({"wallet_id": mismatching, "balance": "25.00"}),
+        json.dumps({"wallet_id": missing, "balance": "1.00"}),
+        "not json",
+    ])
+    response = await async_client.post("/api/v1/wallets/reconcile", content=body)
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    mismatches = [json.loads(line) for line in response.text.splitlines()]
+    assert [mismatch["line"] for mismatch in mismatches] == [2, 3, 4]
+    assert mismatches[0]["wallet_id"] == mismatching
+    assert mismatches[0]["actual"] == "20.00"
+    assert mismatches[0]["detail"] == "Balance mismatch"
+    assert mismatches[1]["actual"] is None
+    assert mismatches[1]["detail"] == "Wallet not found"
+    assert mismatches[2]["detail"].startswith("Invalid line")
@@ -1,10 +1,12 @@
+from uuid import UUID, uuid4
+
 import pytest
 from httpx import AsyncClient, Response
 
 from app.db.models import Wallet
 
 
-async def get_response(async_client: AsyncClient, uuid: str) -> Response:
+async def get_response(async_client: AsyncClient, uuid: UUID | str) -> Response:
     return await async_client.get(
         f"/api/v1/wallets/{uuid}/balance",
     )
@@ -14,13 +16,22 @@ async def get_response(async_client: AsyncClient, uuid: str) -> Response:
 async def test_get_balance(async_client: AsyncClient, test_wallet: Wallet) -> None:
     response = await get_response(async_client, test_wallet.uuid)
     assert response.status_code == 200
-    assert response.json().get("wallet_id") == test_wallet.uuid
+    assert response.json().get("wallet_id") == str(test_wallet.uuid)
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize("invalid_uuid", ["no_exist_uuid", "1211", ""])
+@pytest.mark.parametrize("invalid_uuid", ["no_exist_uuid", "1211"])
 async def test_invalid_uuid(async_client: AsyncClient, invalid_uuid: str) -> None:
     response = await get_response(async_client, invalid_uuid)
+    assert (
+        response.status_code == 422
+    ), f"Expected 422 Unprocessable Entity, but got {response.status_code}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("missing_uuid", [str(uuid4()), ""])
+async def test_missing_wallet(async_client: AsyncClient, missing_uuid: str) -> None:
+    response = await get_response(async_client, missing_uuid)
     assert (
         response.status_code == 404
     ), f"Expected 404 Not Found, but got {response.status_code}"
@@ -0,0 +1,123 @@
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from httpx import AsyncClient, Response
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.db.models import WalletSnapshot
+from app.db.session import AsyncSessionLocal
+from app.schemas.wallet_schemas import OperationModel, OperationType
+from app.services import ledger_service
+from app.services.ledger_service import LedgerService, LedgerSnapshotter
+from app.services.strategies.registry import STRATEGIES
+
+
+@pytest.fixture
+def ledger_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "WALLET_LEDGER_ENABLED", True)
+    monkeypatch.setattr(settings, "LEDGER_SNAPSHOT_INTERVAL", 2)
+
+
+async def post_operation(async_client: AsyncClient, wallet_uuid: str, json_data: dict[str, object]) -> Response:
+    return await async_client.post(
+        f"/api/v1/wallets/{wallet_uuid}/operation",
+        json=json_data,
+    )
+
+
+@pytest.mark.asyncio
+async def test_ledger_operations(async_client: AsyncClient, ledger_mode: None) -> None:
+    response = await async_client.post("/api/v1/wallets/", json={"amount": 10.00})
+    wallet_uuid = response.json()["wallet_id"]
+
+    for amount in (5.00, 7.00, 3.00):
+        response = await post_operation(async_client, wallet_uuid, {"operation_type": "DEPOSIT", "amount": amount})
+        assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+
+    response = await post_operation(async_client, wallet_uuid, {"operation_type": "WITHDRAW", "amount": 20.00})
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    assert response.json().get("balance") == "5.00", "Balance mismatch"
+
+    response = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    assert response.json().get("balance") == "5.00", "Materialized balance mismatch"
+
+
+@pytest.mark.asyncio
+async def test_ledger_insufficient_funds(async_client: AsyncClient, ledger_mode: None) -> None:
+    response = await async_client.post("/api/v1/wallets/", json={"amount": 10.00})
+    wallet_uuid = response.json()["wallet_id"]
+
+    response = await post_operation(async_client, wallet_uuid, {"operation_type": "WITHDRAW", "amount": 11.00})
+
+    assert (
+        response.status_code == 400
+    ), f"Expected 400 Bad request, but got {response.status_code}"
+    assert response.json().get("detail") == "Insufficient funds"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_skips_uncommitted_lower_entry(async_client: AsyncClient, ledger_mode: None) -> None:
+    response = await async_client.post("/api/v1/wallets/", json={"amount": 10.00})
+    wallet_uuid = UUID(response.json()["wallet_id"])
+    deposit = OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("5.00"))
+    strategy = STRATEGIES[OperationType.DEPOSIT]
+
+    async with AsyncSessionLocal() as pending, AsyncSessionLocal() as committed, AsyncSessionLocal() as snapshot:
+        # The lower entry id stays uncommitted while a higher one is committed
+        await pending.begin()
+        await LedgerService(pending).apply(wallet_uuid, deposit, strategy)
+        async with committed.begin():
+            await LedgerService(committed).apply(wallet_uuid, deposit, strategy)
+
+        async with snapshot.begin():
+            assert not await LedgerService(snapshot).snapshot(wallet_uuid), "Expected the busy wallet to be retried"
+            snapshots = await snapshot.scalar(
+                select(func.count()).select_from(WalletSnapshot).where(WalletSnapshot.wallet_uuid == wallet_uuid)
+            )
+        assert snapshots == 0, "Expected no snapshot while a lower entry is uncommitted"
+
+        await pending.commit()
+
+    response = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    assert response.json().get("balance") == "20.00", "Materialized balance lost a deposit"
+
+
+async def count_snapshots(wallet_uuid: UUID) -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(
+            select(func.count()).select_from(WalletSnapshot).where(WalletSnapshot.wallet_uuid == wallet_uuid)
+        ) or 0
+
+
+@pytest.mark.asyncio
+async def test_snapshotter_retries_busy_wallet(
+        async_client: AsyncClient, ledger_mode: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    snapshotter = LedgerSnapshotter(AsyncSessionLocal, retry_seconds=1.0)
+    monkeypatch.setattr(ledger_service, "ledger_snapshotter", snapshotter)
+    response = await async_client.post("/api/v1/wallets/", json={"amount": 10.00})
+    wallet_uuid = UUID(response.json()["wallet_id"])
+    for _ in range(2):
+        response = await post_operation(async_client, str(wallet_uuid), {"operation_type": "DEPOSIT", "amount": 5.00})
+    assert response.json().get("balance") == "20.00", "Balance mismatch"
+
+    deposit = OperationModel(operation_type=OperationType.DEPOSIT, amount=Decimal("5.00"))
+    async with AsyncSessionLocal() as pending:
+        # A writer in flight keeps the wallet busy
+        await pending.begin()
+        await LedgerService(pending).apply(wallet_uuid, deposit, STRATEGIES[OperationType.DEPOSIT])
+
+        assert await snapshotter.run_once() == 1, "Expected the busy wallet to stay scheduled"
+        assert await count_snapshots(wallet_uuid) == 0, "Expected no snapshot of a busy wallet"
+
+        await pending.commit()
+
+    assert await snapshotter.run_once() == 0, "Expected the idle wallet to be snapshotted"
+    assert await count_snapshots(wallet_uuid) == 1, "Expected a snapshot once the wallet is idle"
+
+    response = await post_operation(async_client, str(wallet_uuid), {"operation_type": "DEPOSIT", "amount": 5.00})
+    assert response.json().get("balance") == "30.00", "Deposit balance mismatch after the snapshot"
+    response = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    assert response.json().get("balance") == "30.00", "Materialized balance mismatch after the snapshot"
@@ -1,5 +1,6 @@
 from decimal import Decimal
 from typing import Union
+from uuid import UUID, uuid4
 
 import pytest
 from httpx import AsyncClient, Response
@@ -10,7 +11,7 @@ TEST_OPERATION_DATA = {"amount": 100.00, "operation_type": "DEPOSIT"}
 
 async def post_operation(
     async_client: AsyncClient,
-    wallet_uuid: str,
+    wallet_uuid: UUID | str,
     json_data: dict[str, object | Union[Decimal, str]],
 ) -> Response:
     return await async_client.post(
@@ -27,18 +28,28 @@ async def test_create_deposit_success(async_client: AsyncClient, test_wallet: Wa
         response.status_code == 200
     ), f"Expected 200 OK, but got {response.status_code}"
     data = response.json()
-    assert data.get("wallet_id") == test_wallet.uuid, "Walled ID mismatch"
+    assert data.get("wallet_id") == str(test_wallet.uuid), "Walled ID mismatch"
     assert data.get("balance") == "100.00", "Balance mismatch"
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize("invalid_uuid", ["invalid-uuid", "1111", ""])
+@pytest.mark.parametrize("invalid_uuid", ["invalid-uuid", "1111"])
 async def test_invalid_uuid(async_client: AsyncClient, invalid_uuid: str) -> None:
     response = await post_operation(async_client, invalid_uuid, TEST_OPERATION_DATA)
 
+    assert (
+        response.status_code == 422
+    ), f"Expected 422 for invalid UUID, but got {response.status_code}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("missing_uuid", [str(uuid4()), ""])
+async def test_missing_wallet(async_client: AsyncClient, missing_uuid: str) -> None:
+    response = await post_operation(async_client, missing_uuid, TEST_OPERATION_DATA)
+
     assert (
         response.status_code == 404
-    ), f"Expected 404 for invalid UUID, but got {response.status_code}"
+    ), f"Expected 404 for missing wallet, but got {response.status_code}"
     detail = response.json().get("detail")
     assert detail in (
         "Wallet Not Found",
@@ -73,3 +84,42 @@ async def test_reduce_balance_to_minus(async_client: AsyncClient, test_wallet: W
     ), f"Expected 400 Bad request, but got {response.status_code}"
     detail = response.json().get("detail")
     assert detail == "Insufficient funds", "Detail must be Insufficient funds"
+
+
+@pytest.mark.asyncio
+async def test_idempotent_retry_applies_once(async_client: AsyncClient) -> None:
+    response = await async_client.post("/api/v1/wallets/", json={"amount": 10.00})
+    wallet_uuid = response.json()["wallet_id"]
+    headers = {"Idempotency-Key": str(uuid4())}
+
+    responses = [
+        await async_client.post(
+            f"/api/v1/wallets/{wallet_uuid}/operation",
+            json=TEST_OPERATION_DATA,
+            headers=headers,
+        )
+        for _ in range(3)
+    ]
+
+    assert all(response.status_code == 200 for response in responses)
+    assert {response.json().get("balance") for response in responses} == {"110.00"}
+    balance = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    assert balance.json().get("balance") == "110.00", "Deposit must be applied once"
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_reused_for_other_request(async_client: AsyncClient) -> None:
+    response = await async_client.post("/api/v1/wallets/", json={"amount": 10.00})
+    wallet_uuid = response.json()["wallet_id"]
+    headers = {"Idempotency-Key": str(uuid4())}
+
+    await async_client.post(f"/api/v1/wallets/{wallet_uuid}/operation", json=TEST_OPERATION_DATA, headers=headers)
+    response = await async_client.post(
+        f"/api/v1/wallets/{wallet_uuid}/operation",
+        json={"amount": 5.00, "operation_type": "WITHDRAW"},
+        headers=headers,
+    )
+
+    assert (
+        response.status_code == 422
+    ), f"Expected 422 Unprocessable Entity, but got {response.status_code}"
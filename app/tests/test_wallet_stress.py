@@ -0,0 +1,263 @@
+"""
+Concurrency stress tests
+
+Thousands of mixed operations are fired concurrently through the ASGI app against the
+test database. Operations are generated from a fixed seed, only their interleaving
+varies between runs, so the checks are invariants that hold for every interleaving:
+    - the final balance equals the initial one plus every successful operation
+    - no response ever reports a negative balance
+    - the only rejection is "Insufficient funds", no deadlock, timeout or server error
+Hot wallet and batch scenarios run under every concurrency mode that changes their write path.
+Throughput is reported as the `throughput_ops_per_second` property of every test.
+
+STRESS_OPERATIONS and STRESS_CONCURRENCY scale the load, `-m "not stress"` skips them.
+"""
+import asyncio
+import os
+import random
+import time
+from decimal import Decimal
+from functools import partial
+from typing import Awaitable, Callable, Sequence
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient, Response
+
+from app.config import settings
+from app.services import wallet_service
+from app.services.concurrency import ConcurrencyPolicy
+from app.tests.conftest import WalletFactory
+
+pytestmark = [pytest.mark.stress, pytest.mark.asyncio]
+
+OPERATIONS = int(os.environ.get("STRESS_OPERATIONS", 2000))
+CONCURRENCY = int(os.environ.get("STRESS_CONCURRENCY", 50))
+SEED = 20261018
+
+
+async def get_balance(async_client: AsyncClient, wallet_uuid: str) -> Decimal:
+    response = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    return Decimal(response.json()["balance"])
+
+
+def random_amount(rng: random.Random) -> Decimal:
+    return Decimal(rng.randint(100, 5000)) / 100
+
+
+async def run_concurrently(
+        requests: Sequence[Callable[[], Awaitable[Response]]],
+        record_property: Callable[[str, object], None],
+) -> list[Response]:
+    """Run the requests with at most CONCURRENCY in flight and record the throughput."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def run(request: Callable[[], Awaitable[Response]]) -> Response:
+        async with semaphore:
+            return await request()
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(run(request) for request in requests))
+    elapsed = time.perf_counter() - started
+    record_property("throughput_ops_per_second", round(len(requests) / elapsed, 1))
+    return responses
+
+
+def assert_no_errors(responses: list[Response]) -> None:
+    errors = [
+        (response.status_code, response.text) for response in responses
+        if response.status_code != 200
+        and not (response.status_code == 400 and response.json()["detail"] == "Insufficient funds")
+    ]
+    assert not errors, f"Expected only successes and insufficient funds, but got {errors[:5]} ({len(errors)} total)"
+    negative = [response.json() for response in responses if response.status_code == 200
+                and Decimal(response.json()["balance"]) < 0]
+    assert not negative, f"Expected no negative balance, but got {negative[:5]}"
+
+
+@pytest.fixture
+def admission_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Shedding load is admission control's job, here every operation must reach the database
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", False)
+
+
+def use_concurrency_mode(monkeypatch: pytest.MonkeyPatch, concurrency: str) -> None:
+    """Switch WALLET_CONCURRENCY_MODE, the policy is built from it at import."""
+    monkeypatch.setattr(settings, "WALLET_CONCURRENCY_MODE", concurrency)
+    monkeypatch.setattr(wallet_service, "concurrency_policy", ConcurrencyPolicy(
+        mode=concurrency,
+        max_conflicts=settings.OPTIMISTIC_MAX_CONFLICTS,
+        backoff=settings.OPTIMISTIC_BACKOFF_MS / 1000,
+        hot_size=settings.OPTIMISTIC_HOT_WALLETS_SIZE,
+        hot_ttl=settings.OPTIMISTIC_HOT_WALLET_TTL_SECONDS,
+    ))
+
+
+@pytest.mark.parametrize(("mode", "concurrency"), [
+    ("direct", "pessimistic"),
+    ("coalesced", "pessimistic"),
+    # Coalesced groups are the single wallet path with optimistic writes
+    ("coalesced", "optimistic"),
+    ("coalesced", "adaptive"),
+    ("ledger", "pessimistic"),
+    ("idempotent", "pessimistic"),
+])
+async def test_hot_wallet_mixed_operations(
+        async_client: AsyncClient,
+        create_wallet: WalletFactory,
+        admission_disabled: None,
+        monkeypatch: pytest.MonkeyPatch,
+        record_property: Callable[[str, object], None],
+        mode: str,
+        concurrency: str,
+) -> None:
+    monkeypatch.setattr(settings, "WALLET_COALESCING_ENABLED", mode == "coalesced")
+    monkeypatch.setattr(settings, "WALLET_LEDGER_ENABLED", mode == "ledger")
+    use_concurrency_mode(monkeypatch, concurrency)
+    initial = Decimal("500.00")
+    wallet_uuid = await create_wallet(str(initial))
+    url = f"/api/v1/wallets/{wallet_uuid}/operation"
+
+    rng = random.Random(SEED)
+    operations = [
+        (rng.choice(("DEPOSIT", "WITHDRAW")), random_amount(rng))
+        for _ in range(OPERATIONS)
+    ]
+
+    def request(operation_type: str, amount: Decimal) -> Callable[[], Awaitable[Response]]:
+        headers = {"Idempotency-Key": str(uuid4())} if mode == "idempotent" else None
+        return partial(
+            async_client.post, url, json={"operation_type": operation_type, "amount": str(amount)}, headers=headers
+        )
+
+    responses = await run_concurrently(
+        [request(operation_type, amount) for operation_type, amount in operations], record_property
+    )
+
+    assert_no_errors(responses)
+    expected = initial + sum(
+        amount if operation_type == "DEPOSIT" else -amount
+        for (operation_type, amount), response in zip(operations, responses)
+        if response.status_code == 200
+    )
+    balance = await get_balance(async_client, wallet_uuid)
+    assert balance == expected, f"Expected balance {expected}, but got {balance}, an update was lost"
+
+
+async def test_transfers_conserve_money(
+        async_client: AsyncClient,
+        create_wallet: WalletFactory,
+        admission_disabled: None,
+        record_property: Callable[[str, object], None],
+) -> None:
+    wallets = [await create_wallet("200.00") for _ in range(5)]
+
+    rng = random.Random(SEED)
+    transfers: list[tuple[str, str, Decimal]] = []
+    for _ in range(OPERATIONS // 2):
+        source, target = rng.sample(wallets, 2)
+        transfers.append((source, target, random_amount(rng)))
+    responses = await run_concurrently(
+        [
+            partial(
+                async_client.post,
+                f"/api/v1/wallets/{source}/operation",
+                json={"operation_type": "TRANSFER", "amount": str(amount), "target_wallet_id": target},
+            )
+            for source, target, amount in transfers
+        ],
+        record_property,
+    )
+
+    # Opposite transfers lock the same two rows, a deadlock would surface as an error here
+    assert_no_errors(responses)
+    balances = {wallet: await get_balance(async_client, wallet) for wallet in wallets}
+    expected = {wallet: Decimal("200.00") for wallet in wallets}
+    for (source, target, amount), response in zip(transfers, responses):
+        if response.status_code == 200:
+            expected[source] -= amount
+            expected[target] += amount
+    assert balances == expected, f"Expected balances {expected}, but got {balances}"
+    assert sum(balances.values()) == Decimal("1000.00"), "Transfers must neither create nor destroy money"
+
+
+@pytest.mark.parametrize("concurrency", ["pessimistic", "optimistic", "adaptive"])
+async def test_overlapping_batches(
+        async_client: AsyncClient,
+        create_wallet: WalletFactory,
+        admission_disabled: None,
+        monkeypatch: pytest.MonkeyPatch,
+        record_property: Callable[[str, object], None],
+        concurrency: str,
+) -> None:
+    use_concurrency_mode(monkeypatch, concurrency)
+    wallets = [await create_wallet("200.00") for _ in range(4)]
+
+    rng = random.Random(SEED)
+    # Every batch touches several of the same few wallets, in a random order
+    batches: list[list[tuple[str, str, str | None, Decimal]]] = []
+    for _ in range(OPERATIONS // 10):
+        batch = []
+        for _ in range(5):
+            first, second = rng.sample(wallets, 2)
+            operation_type = rng.choice(("DEPOSIT", "WITHDRAW", "TRANSFER"))
+            batch.append((operation_type, first, second if operation_type == "TRANSFER" else None, random_amount(rng)))
+        batches.append(batch)
+    responses = await run_concurrently(
+        [
+            partial(async_client.post, "/api/v1/wallets/operations/batch", json={
+                "mode": "ATOMIC",
+                "operations": [
+                    {"wallet_id": source, "operation_type": operation_type, "amount": str(amount)}
+                    | ({"target_wallet_id": target} if target is not None else {})
+                    for operation_type, source, target, amount in batch
+                ],
+            })
+            for batch in batches
+        ],
+        record_property,
+    )
+
+    errors = [(response.status_code, response.text) for response in responses if response.status_code != 200]
+    assert not errors, f"Expected only 200 OK, but got {errors[:5]} ({len(errors)} total)"
+    expected = {wallet: Decimal("200.00") for wallet in wallets}
+    for batch, response in zip(batches, responses):
+        body = response.json()
+        if not body["committed"]:
+            continue
+        assert all(Decimal(result["balance"]) >= 0 for result in body["results"]), \
+            f"Expected no negative balance, but got {body['results']}"
+        for operation_type, source, target, amount in batch:
+            if operation_type == "DEPOSIT":
+                expected[source] += amount
+            else:
+                expected[source] -= amount
+            if target is not None:
+                expected[target] += amount
+    balances = {wallet: await get_balance(async_client, wallet) for wallet in wallets}
+    assert balances == expected, f"Expected balances {expected}, but got {balances}, an update was lost"
+
+
+async def test_duplicate_idempotency_key_applied_once(
+        async_client: AsyncClient,
+        create_wallet: WalletFactory,
+        admission_disabled: None,
+        record_property: Callable[[str, object], None],
+) -> None:
+    wallet_uuid = await create_wallet("10.00")
+    headers = {"Idempotency-Key": str(uuid4())}
+    url = f"/api/v1/wallets/{wallet_uuid}/operation"
+
+    responses = await run_concurrently(
+        [
+            partial(async_client.post, url, json={"operation_type": "DEPOSIT", "amount": "5.00"}, headers=headers)
+            for _ in range(CONCURRENCY * 4)
+        ],
+        record_property,
+    )
+
+    assert_no_errors(responses)
+    assert {response.json()["balance"] for response in responses} == {"15.00"}, \
+        "Every replay must return the result of the single applied operation"
+    assert await get_balance(async_client, wallet_uuid) == Decimal("15.00")
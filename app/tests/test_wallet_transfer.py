@@ -0,0 +1,115 @@
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient, Response
+
+from app.services.idempotency import idempotency_cache
+from app.tests.conftest import WalletFactory
+
+
+async def transfer(async_client: AsyncClient, source: str, target: str, amount: float) -> Response:
+    return await async_client.post(
+        f"/api/v1/wallets/{source}/operation",
+        json={"operation_type": "TRANSFER", "amount": amount, "target_wallet_id": target},
+    )
+
+
+async def get_balance(async_client: AsyncClient, wallet_uuid: str) -> str:
+    response = await async_client.get(f"/api/v1/wallets/{wallet_uuid}/balance")
+    return response.json().get("balance")
+
+
+@pytest.mark.asyncio
+async def test_transfer_success(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    source = await create_wallet(50.00)
+    target = await create_wallet(10.00)
+    response = await transfer(async_client, source, target, 20.00)
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    assert response.json() == {"wallet_id": source, "balance": "30.00"}
+    assert await get_balance(async_client, target) == "30.00"
+
+
+@pytest.mark.asyncio
+async def test_transfer_insufficient_funds(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    source = await create_wallet(5.00)
+    target = await create_wallet(10.00)
+    response = await transfer(async_client, source, target, 20.00)
+
+    assert response.status_code == 400, f"Expected 400 Bad Request, but got {response.status_code}"
+    assert response.json().get("detail") == "Insufficient funds"
+    assert await get_balance(async_client, source) == "5.00"
+    assert await get_balance(async_client, target) == "10.00"
+
+
+@pytest.mark.asyncio
+async def test_transfer_target_not_found(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    source = await create_wallet(50.00)
+    response = await transfer(async_client, source, str(uuid4()), 20.00)
+
+    assert response.status_code == 404, f"Expected 404 Not Found, but got {response.status_code}"
+    assert await get_balance(async_client, source) == "50.00"
+
+
+@pytest.mark.asyncio
+async def test_transfer_to_same_wallet(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    source = await create_wallet(50.00)
+    response = await transfer(async_client, source, source, 20.00)
+
+    assert response.status_code == 400, f"Expected 400 Bad Request, but got {response.status_code}"
+    assert response.json().get("detail") == "Cannot transfer to the same wallet"
+
+
+@pytest.mark.asyncio
+async def test_transfer_requires_target(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    source = await create_wallet(50.00)
+    response = await async_client.post(
+        f"/api/v1/wallets/{source}/operation",
+        json={"operation_type": "TRANSFER", "amount": 20.00},
+    )
+
+    assert response.status_code == 422, f"Expected 422 Unprocessable Entity, but got {response.status_code}"
+
+
+@pytest.mark.asyncio
+async def test_transfer_in_batch(async_client: AsyncClient, create_wallet: WalletFactory) -> None:
+    first = await create_wallet(10.00)
+    second = await create_wallet(10.00)
+    response = await async_client.post("/api/v1/wallets/operations/batch", json={
+        "mode": "ATOMIC",
+        "operations": [
+            {"wallet_id": first, "operation_type": "TRANSFER", "amount": 10.00, "target_wallet_id": second},
+            {"wallet_id": second, "operation_type": "TRANSFER", "amount": 5.00, "target_wallet_id": first},
+        ],
+    })
+
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+    assert response.json().get("committed") is True
+    assert await get_balance(async_client, first) == "5.00"
+    assert await get_balance(async_client, second) == "15.00"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cached", [True, False])
+async def test_transfer_idempotency_key_reused_for_other_target(async_client: AsyncClient, create_wallet: WalletFactory, cached: bool) -> None:
+    source = await create_wallet(50.00)
+    first = await create_wallet(10.00)
+    second = await create_wallet(10.00)
+    headers = {"Idempotency-Key": str(uuid4())}
+    url = f"/api/v1/wallets/{source}/operation"
+
+    response = await async_client.post(
+        url, json={"operation_type": "TRANSFER", "amount": 20.00, "target_wallet_id": first}, headers=headers
+    )
+    assert response.status_code == 200, f"Expected 200 OK, but got {response.status_code}"
+
+    if not cached:
+        # Replay from the stored key, as another worker would
+        idempotency_cache.clear()
+    response = await async_client.post(
+        url, json={"operation_type": "TRANSFER", "amount": 20.00, "target_wallet_id": second}, headers=headers
+    )
+    assert response.status_code == 422, f"Expected 422 Unprocessable Entity, but got {response.status_code}"
+    assert await get_balance(async_client, source) == "30.00"
+    assert await get_balance(async_client, first) == "30.00"
+    assert await get_balance(async_client, second) == "10.00"
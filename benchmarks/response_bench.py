@@ -0,0 +1,51 @@
+"""
+Micro benchmark of the per-request response and service overhead
+
+Compares building a validated WalletResponse (the former path) with the
+model_construct fast path, constructing a WalletService, and encoding error
+bodies fresh versus from the cache, without a database.
+
+Usage:
+    uv run python -m benchmarks.response_bench --number 200000
+"""
+import argparse
+import json
+import timeit
+from decimal import Decimal
+from typing import cast
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.exceptions import WalletNotFoundException
+from app.responses import error_body, json_dumps
+from app.schemas.wallet_schemas import WalletResponse
+from app.services.wallet_service import WalletService
+
+
+def main(number: int) -> dict[str, float]:
+    wallet_id = uuid4()
+    balance = Decimal("1234.56")
+    # Only construction is measured, the service never touches its session
+    session = cast(AsyncSession, None)
+    cases = {
+        "validated_response": lambda: WalletResponse(wallet_id=wallet_id, balance=balance).model_dump_json(),
+        "constructed_response": lambda: WalletResponse.model_construct(
+            wallet_id=wallet_id, balance=balance
+        ).model_dump_json(),
+        "wallet_service": lambda: WalletService(session),
+        "error_body_encoded": lambda: json.dumps({"detail": WalletNotFoundException().detail}).encode(),
+        "error_body_cached": lambda: error_body(WalletNotFoundException().detail),
+        "default_response": lambda: json_dumps({"wallet_id": wallet_id, "balance": balance}),
+    }
+    return {
+        name: round(timeit.timeit(case, number=number) / number * 1_000_000, 3)
+        for name, case in cases.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request overhead micro benchmark")
+    parser.add_argument("--number", type=int, default=100_000, help="Iterations per case")
+    args = parser.parse_args()
+    print(json.dumps({"microseconds_per_call": main(args.number)}, indent=2))
@@ -0,0 +1,268 @@
+"""
+Load testing harness for the wallet API
+
+Drives the ASGI app in-process (httpx ASGITransport) or a running server over HTTP
+with a configurable traffic mix and prints a JSON report.
+
+Usage:
+    uv run python -m benchmarks.wallet_bench --requests 20000 --concurrency 64
+    uv run python -m benchmarks.wallet_bench --url http://localhost:8000 --read-ratio 0.9 --zipf 1.2
+
+Both modes need a local Postgres with migrations applied. Lock wait time and pool
+statistics are only available in-process, where the database engine can be observed.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+
+# Statements that may wait on a wallet row lock, their duration is
+# reported as lock wait (it includes the execution of the statement itself)
+ROW_LOCK_STATEMENTS = ("UPDATE", "FOR UPDATE", "FOR NO KEY UPDATE")
+REQUEST_TIMEOUT_SECONDS = 60.0
+
+
+@dataclass
+class BenchConfig:
+    """
+    Traffic mix of a benchmark run
+    """
+    url: str | None
+    wallets: int
+    requests: int
+    concurrency: int
+    read_ratio: float
+    withdraw_ratio: float
+    zipf: float
+    initial_balance: float
+    amount: float
+    seed: int
+
+
+@dataclass
+class BenchStats:
+    """
+    Raw measurements collected during a run
+    """
+    latencies: dict[str, list[float]] = field(default_factory=lambda: {"read": [], "write": []})
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    lock_waits: list[float] = field(default_factory=list)
+
+
+def percentiles(samples: list[float]) -> dict[str, float] | None:
+    """
+    Summarize samples in milliseconds with nearest-rank percentiles
+    Args:
+        samples (list[float]): Durations in seconds
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def rank(percent: float) -> float:
+        index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def zipf_weights(size: int, exponent: float) -> list[float]:
+    """
+    Cumulative weights of a Zipf distribution over `size` wallets, 0 means uniform
+    Args:
+        size (int): Number of wallets
+        exponent (float): Skew, higher values concentrate traffic on the first wallets
+    """
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, size + 1)))
+
+
+def observe_row_locks(stats: BenchStats) -> None:
+    """
+    Time every statement that may wait on a row lock, in-process only
+    Args:
+        stats (BenchStats): Stats receiving the durations
+    """
+    from sqlalchemy import event
+
+    from app.db.session import async_engine
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("bench_started", []).append(time.perf_counter())
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["bench_started"].pop()
+        if any(marker in statement for marker in ROW_LOCK_STATEMENTS):
+            stats.lock_waits.append(time.perf_counter() - started)
+
+
+async def create_wallets(client: AsyncClient, config: BenchConfig) -> list[str]:
+    """
+    Create the wallets used by the run
+    Args:
+        client (AsyncClient): Client bound to the app
+        config (BenchConfig): Run configuration
+    """
+    wallet_ids = []
+    for _ in range(config.wallets):
+        response = await client.post("/api/v1/wallets/", json={"amount": config.initial_balance})
+        response.raise_for_status()
+        wallet_ids.append(response.json()["wallet_id"])
+    return wallet_ids
+
+
+async def run_load(client: AsyncClient, config: BenchConfig, wallet_ids: list[str], stats: BenchStats) -> float:
+    """
+    Send the configured number of requests with a fixed number of concurrent workers
+    Args:
+        client (AsyncClient): Client bound to the app
+        config (BenchConfig): Run configuration
+        wallet_ids (list[str]): Wallets to target, the first ones are the hottest
+        stats (BenchStats): Stats receiving the measurements
+    Returns:
+        float: Wall clock duration of the run in seconds
+    """
+    rng = random.Random(config.seed)
+    cum_weights = zipf_weights(len(wallet_ids), config.zipf)
+    plan: list[tuple[str, str, dict[str, object] | None]] = []
+    for _ in range(config.requests):
+        wallet_id = rng.choices(wallet_ids, cum_weights=cum_weights)[0]
+        if rng.random() < config.read_ratio:
+            plan.append(("read", wallet_id, None))
+        else:
+            operation_type = "WITHDRAW" if rng.random() < config.withdraw_ratio else "DEPOSIT"
+            plan.append(("write", wallet_id, {"operation_type": operation_type, "amount": config.amount}))
+    requests = iter(plan)
+
+    async def worker() -> None:
+        for kind, wallet_id, body in requests:
+            started = time.perf_counter()
+            try:
+                if kind == "read":
+                    response = await client.get(f"/api/v1/wallets/{wallet_id}/balance")
+                else:
+                    response = await client.post(f"/api/v1/wallets/{wallet_id}/operation", json=body)
+            except Exception as exp:
+                stats.errors[type(exp).__name__] += 1
+                continue
+            stats.latencies[kind].append(time.perf_counter() - started)
+            stats.statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+    return time.perf_counter() - started
+
+
+def build_report(config: BenchConfig, stats: BenchStats, duration: float, pool: dict | None) -> dict[str, Any]:
+    """
+    Build the JSON report of a run
+    Args:
+        config (BenchConfig): Run configuration
+        stats (BenchStats): Collected measurements
+        duration (float): Duration of the load phase in seconds
+        pool (dict | None): Pool statistics, in-process only
+    """
+    completed = sum(stats.statuses.values())
+    failed = sum(count for status, count in stats.statuses.items() if status >= 500) + sum(stats.errors.values())
+    rejected = sum(count for status, count in stats.statuses.items() if 400 <= status < 500)
+    return {
+        "config": config.__dict__,
+        "mode": "http" if config.url else "asgi",
+        "duration_seconds": round(duration, 3),
+        "requests": completed + sum(stats.errors.values()),
+        "rps": round(completed / duration, 2) if duration else None,
+        "latency_ms": {
+            "all": percentiles(stats.latencies["read"] + stats.latencies["write"]),
+            "read": percentiles(stats.latencies["read"]),
+            "write": percentiles(stats.latencies["write"]),
+        },
+        "status_codes": {str(status): count for status, count in sorted(stats.statuses.items())},
+        "client_errors": dict(stats.errors),
+        "error_rate": round(failed / max(config.requests, 1), 5),
+        "rejection_rate": round(rejected / max(config.requests, 1), 5),
+        "lock_wait_ms": percentiles(stats.lock_waits) if not config.url else None,
+        "pool": pool,
+    }
+
+
+async def main(config: BenchConfig) -> dict[str, Any]:
+    stats = BenchStats()
+    pool = None
+
+    if config.url:
+        client = AsyncClient(base_url=config.url, timeout=REQUEST_TIMEOUT_SECONDS)
+    else:
+        from main import app
+
+        observe_row_locks(stats)
+        client = AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://testserver", timeout=REQUEST_TIMEOUT_SECONDS
+        )
+
+    async with client:
+        wallet_ids = await create_wallets(client, config)
+        stats.lock_waits.clear()
+        duration = await run_load(client, config, wallet_ids, stats)
+
+    if not config.url:
+        from app.db.pool import pool_stats
+        from app.db.session import async_engine
+
+        pool = pool_stats(async_engine.pool)
+        await async_engine.dispose()
+
+    return build_report(config, stats, duration, pool)
+
+
+def parse_args() -> tuple[BenchConfig, str | None]:
+    parser = argparse.ArgumentParser(description="Load test the wallet API")
+    parser.add_argument("--url", default=None, help="Base URL of a running server, in-process ASGI when omitted")
+    parser.add_argument("--wallets", type=int, default=100, help="Number of wallets to create")
+    parser.add_argument("--requests", type=int, default=10_000, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent in-flight requests")
+    parser.add_argument("--read-ratio", type=float, default=0.8, help="Share of balance reads")
+    parser.add_argument("--withdraw-ratio", type=float, default=0.3, help="Share of withdrawals among writes")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Hot wallet skew, 0 for uniform traffic")
+    parser.add_argument("--initial-balance", type=float, default=1_000_000.00, help="Balance of created wallets")
+    parser.add_argument("--amount", type=float, default=1.00, help="Amount of every operation")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the traffic generator")
+    parser.add_argument("--output", default=None, help="Write the report to this file as well")
+    args = parser.parse_args()
+    config = BenchConfig(
+        url=args.url,
+        wallets=args.wallets,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        read_ratio=args.read_ratio,
+        withdraw_ratio=args.withdraw_ratio,
+        zipf=args.zipf,
+        initial_balance=args.initial_balance,
+        amount=args.amount,
+        seed=args.seed,
+    )
+    return config, args.output
+
+
+if __name__ == "__main__":
+    bench_config, output = parse_args()
+    report = json.dumps(asyncio.run(main(bench_config)), indent=2)
+    print(report)
+    if output:
+        with open(output, "w") as file:
+            file.write(report)
@@ -22,4 +22,4 @@ echo ">>> Start server <<<"
 echo "======================================="
 echo
 
-uv run uvicorn main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+uv run python -m app.server
\ No newline at end of file
@@ -1,11 +1,95 @@
-import uvicorn
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Response
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api.v1.routes.wallet import router as wallet_router
+from app.config import settings
+from app.db.session import async_engine, async_read_engine
+from app.db.warmup import read_statements, warm_up, write_statements
+from app.logging_config import setup_logging
+from app.metrics import REGISTRY
+from app.responses import FastJSONResponse, http_exception_handler
+from app.server import main as run_server
+from app.services.ledger_service import ledger_snapshotter
+from app.services.outbox import outbox_dispatcher
+from app.services.wallet_events import wallet_event_hub
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_until_ready(app: FastAPI) -> None:
+    """Warms up the pools, retrying until the database is reachable, then marks the app ready."""
+    while True:
+        try:
+            await warm_up(async_engine, write_statements())
+            if async_read_engine is not async_engine:
+                await warm_up(async_read_engine, read_statements())
+        except Exception as exp:
+            logger.warning("Warm-up failed, retrying in %ss: %s", settings.WARMUP_RETRY_SECONDS, exp)
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+            continue
+        app.state.ready = True
+        return
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Starts the background log listener, the worker's own pools and background tasks, stops them on shutdown."""
+    log_listener = setup_logging()
+    # Connections inherited from a parent process (preloading servers fork after import)
+    # are left to the parent, this worker starts with fresh pools
+    for engine in {async_engine, async_read_engine}:
+        await engine.dispose(close=False)
+    app.state.ready = False
+    warmup = asyncio.create_task(warm_up_until_ready(app))
+    if settings.OUTBOX_ENABLED:
+        outbox_dispatcher.start()
+    if settings.WALLET_LEDGER_ENABLED:
+        ledger_snapshotter.start()
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        warmup.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup
+        await wallet_event_hub.stop()
+        await outbox_dispatcher.stop()
+        await ledger_snapshotter.stop()
+        for engine in {async_engine, async_read_engine}:
+            await engine.dispose()
+        log_listener.stop()
+
 
-app = FastAPI(title="Wallet API")
+app = FastAPI(title="Wallet API", lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 
 app.include_router(wallet_router)
 
+
+@app.get("/health/live", include_in_schema=False)
+async def liveness() -> dict[str, str]:
+    """Reports that the process is serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", include_in_schema=False)
+async def readiness() -> FastJSONResponse:
+    """Reports ready only once the pools are warmed up, so rolling deploys don't route to cold workers."""
+    if getattr(app.state, "ready", False):
+        return FastJSONResponse({"status": "ready"})
+    return FastJSONResponse({"status": "warming up"}, status_code=503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Exposes the application metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    run_server()